@@ -0,0 +1,1270 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.0;
+
+import "@openzeppelin/contracts/access/Ownable.sol";
+import "@openzeppelin/contracts/security/ReentrancyGuard.sol";
+import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
+import "@openzeppelin/contracts/token/ERC20/utils/SafeERC20.sol";
+import "@openzeppelin/contracts/token/ERC721/IERC721.sol";
+import "@openzeppelin/contracts/token/ERC721/extensions/IERC721Enumerable.sol";
+import "@openzeppelin/contracts/utils/cryptography/ECDSA.sol";
+import "@openzeppelin/contracts/utils/cryptography/MerkleProof.sol";
+import "@openzeppelin/contracts/utils/cryptography/draft-EIP712.sol";
+import "@openzeppelin/contracts/utils/introspection/ERC165Checker.sol";
+import "@openzeppelin/contracts/utils/math/SafeCast.sol";
+import "../interfaces/IAthanasia.sol";
+import "../interfaces/IAthanasiaOtc.sol";
+import "../interfaces/IHectorStaking.sol";
+
+/**
+ * @dev Implementation of the IAthanasia interface for the Hector Finance (HEC) underlying token.
+ *
+ * Athanasia enables NFT collection owners to lock in a portion of the mint sale price in form of a secondary underlying token.
+ *
+ * Typically during an NFT mint, configured value is deposited into this smart contract and an OTC purchase of the
+ * underlying token. This is done to avoid price spikes during minting.
+ * Alternatively, one may also choose to directly deposit the underlying tokens.
+ *
+ * The best fit tokens are those that can be staked to earn rewards. The reward part can then be withdrawn by the NFT owner.
+ *
+ * The HEC, sHEC and staking contract addresses are provided by the deriving contract: {AthanasiaHector} keeps them
+ * in immutables, {AthanasiaHectorClone} in storage set by its initializer.
+ */
+abstract contract AthanasiaHectorBase is IAthanasia, Ownable, ReentrancyGuard, EIP712 {
+    using SafeERC20 for IERC20;
+    using SafeCast for uint256;
+
+    // Hector contract for selling over-the-counter HEC/sHEC token.
+    address public hectorOtcContract;
+
+    // Address of the V2 AthanasiaHector contract.
+    address public v2contract;
+
+    // If set, deposits, claims and upgrades emit one batch event instead of one event per NFT.
+    bool public compactEvents;
+
+    // HEC held by this contract to pay claims without unstaking, and the amount it is refilled to by the next unstake.
+    uint128 public hecFloat;
+    uint128 public hecFloatTarget;
+
+    /**
+     * @dev Emitted when a new staking index is appended to `stakingIndexHistory`. Checkpoints recorded by
+     * `Deposit` and `Claim` events refer to the most recent index recorded at or before them.
+     */
+    event StakingIndexRecorded(uint256 indexed epoch, uint256 stakingIndex);
+
+    bytes32 private constant CLAIM_TYPEHASH =
+        keccak256("Claim(address owner,address collection,uint256[] tokenIds,uint256 nonce,uint256 deadline)");
+
+    // Number of signed claims consumed for each NFT owner, see {claimFor}.
+    mapping(address => uint256) public nonces;
+
+    // Number of tokens in 1 HEC / sHEC
+    uint256 public immutable ONE_HECTOR = 10**9;
+
+    // Packed into two storage slots: (depositAmount, otcPurchaseToken) and
+    // (otcPrice, stakingIndexOnDeposit, depositsDone, migrating, eligibleByProof, deferredOtc, migrationEnabled).
+    // Values are range checked with SafeCast when written.
+    struct CollectionInfo {
+        // The amount of HEC which will be deposited for each NFT minted.
+        // This is the total amount purchased for each NFT via OTC contract.
+        // In case of registerDeposit, this denotes the total deposit amount for the entire collection
+        uint96 depositAmount;
+        // ERC20 token which will be used to purchase HEC in the OTC contract.
+        address otcPurchaseToken;
+        // OTC price for purchase of 1 HEC.
+        uint96 otcPrice;
+        // If deposit on register is used, this value will be set to the current index at the time of deposit.
+        uint96 stakingIndexOnDeposit;
+        // Number of deposits done. Counter increases for each NFT deposited.
+        uint32 depositsDone;
+        // Set once the migration of the collection to V2 has started, see {migrateCollection}.
+        bool migrating;
+        // Set if the NFTs covered by the deposit on register are proven against `eligibilityRoots`, rather than
+        // being the first `depositsDone` ones.
+        bool eligibleByProof;
+        // Set if `depositWithOtc` only collects the payment into `pendingOtc`, see {settleOtc}.
+        bool deferredOtc;
+        // Set by the collection owner to allow {migrateCollection}.
+        bool migrationEnabled;
+    }
+
+    // Contains all registered collections.
+    mapping(address => CollectionInfo) public collections;
+
+    // Eligible NFTs of the collections registered with {registerCollectionAndDepositWithRoot}, in two storage slots.
+    struct EligibilityRoot {
+        bytes32 root;
+        // Epoch of the staking index of the collection deposit, recorded as the checkpoint of proven NFTs.
+        uint32 depositEpoch;
+        // Number of NFTs that may still be proven eligible.
+        uint32 unproven;
+    }
+
+    mapping(address => EligibilityRoot) public eligibilityRoots;
+
+    // Staking index of the epoch reserved for deposits whose OTC purchase is pending, see {settleOtc}.
+    // Tokens checkpointed at it have nothing claimable, and can not be upgraded or migrated.
+    uint256 private constant PENDING_OTC_INDEX = type(uint256).max;
+
+    // Deferred OTC purchase of a collection, in two storage slots.
+    struct PendingOtc {
+        // Underlying tokens of the pending deposits, and the part of them purchased so far.
+        uint128 amountToPurchase;
+        uint128 amountPurchased;
+        // OTC tokens (or FTM) collected and not spent yet.
+        uint128 paid;
+        // Epoch shared by the checkpoints of the pending deposits, set to the staking index of their settlement.
+        uint32 epoch;
+        // OTC tokens (or FTM) collected in total, which the refunds of a cancellation are shared by, see {cancelOtc}.
+        uint96 collected;
+    }
+
+    mapping(address => PendingOtc) public pendingOtc;
+
+    // OTC tokens (or FTM) paid by each payer into the pending purchase of an epoch, see {withdrawOtcRefund}.
+    mapping(uint256 => mapping(address => uint256)) public otcPayments;
+
+    // Cancelled pending purchase, by the epoch of its deposits, in two storage slots.
+    struct CancelledOtc {
+        address collection;
+        // Total of `otcPayments` of the epoch.
+        uint96 collected;
+        // OTC tokens (or FTM) left and underlying tokens bought when cancelled, refunded pro rata to the payers.
+        uint128 paid;
+        uint128 purchased;
+    }
+
+    mapping(uint256 => CancelledOtc) public cancelledOtc;
+
+    // Rounding surplus of the payments of settled purchases, by collection, see {sweepOtcSurplus}.
+    mapping(address => uint256) public otcSurplus;
+
+    // sHEC purchased for the pending OTC deposits of all collections, not counted in `_totalStats` until settled,
+    // or until refunded if cancelled.
+    uint256 internal _pendingOtcPurchased;
+
+    // Scale of the index-weighted principal, see {CollectionStats}.
+    uint256 private constant WEIGHT_SCALE = 10**18;
+
+    // Running totals of a collection, or of all collections, kept in two storage slots.
+    struct CollectionStats {
+        // sHEC deposited for the tokens not upgraded.
+        uint128 principal;
+        // Rewards withdrawn by claims, as HEC or sHEC.
+        uint128 hecClaimed;
+        // Sum of `depositAmount * WEIGHT_SCALE / index` over the tokens not upgraded, where `index` is the staking index
+        // of their deposit or last withdrawal. The tokens' sHEC at the current index is `weightedPrincipal * index / WEIGHT_SCALE`.
+        uint224 weightedPrincipal;
+        // Tokens upgraded or migrated to V2.
+        uint32 tokensUpgraded;
+    }
+
+    mapping(address => CollectionStats) internal _collectionStats;
+    CollectionStats internal _totalStats;
+
+    // Append-only history of the distinct staking indexes recorded as checkpoints.
+    // Epoch `e` refers to `stakingIndexHistory[e - 1]`, epoch 0 means no checkpoint.
+    uint256[] public stakingIndexHistory;
+
+    // Tracks the staking index epoch for each NFT in each collection at last withdrawal,
+    // as 8 uint32 epochs per word keyed by `tokenId >> 3`.
+    mapping(address => mapping(uint256 => uint256)) internal checkpointWords;
+
+    // Tracks which NFTs in each collection were upgraded to V2, as a bitmap of 256 tokens per word keyed by `tokenId >> 8`.
+    mapping(address => mapping(uint256 => uint256)) internal upgradeStatusWords;
+
+    // In-memory cache of the packed per-token words touched by a batch. Each word is read once when the batch
+    // reaches it, and a modified checkpoint word is written back once when the batch moves past it.
+    struct TokenCursor {
+        uint256 checkpointWordIndex;
+        uint256 checkpointWord;
+        bool checkpointDirty;
+        uint256 upgradedWordIndex;
+        uint256 upgradedWord;
+        // Last epoch resolved through stakingIndexHistory, and its staking index.
+        uint256 epoch;
+        uint256 epochIndex;
+        // Epoch of the current staking index, zero until recorded.
+        uint256 currentEpoch;
+        // Weight of the checkpoints moved by the batch and their number, see {CollectionStats}.
+        uint256 weightRemoved;
+        uint256 checkpointsMoved;
+    }
+
+    constructor() EIP712("AthanasiaHector", "1") {}
+
+    /**
+     * @dev ERC20 token address for $HEC token.
+     */
+    function _hecToken() internal view virtual returns (IERC20);
+
+    /**
+     * @dev ERC20 token address for $sHEC token.
+     */
+    function _shecToken() internal view virtual returns (IERC20);
+
+    /**
+     * @dev Hector Staking contract address.
+     */
+    function _hecStakingContract() internal view virtual returns (IHectorStaking);
+
+    /**
+     * @dev See {IAthanasia-initialize}.
+     */
+    function initialize(address _otcContract) external onlyOwner {
+        require(_otcContract != address(0), "initialize: OTC contract");
+        hectorOtcContract = _otcContract;
+        _shecToken().approve(address(_hecStakingContract()), ~uint256(0));
+    }
+
+    /**
+     * @dev See {IAthanasia-registerCollectionWithOtc}.
+     */
+    function registerCollectionWithOtc(address _collection, address _otcToken, uint256 _otcPrice, uint256 _depositAmount) external {
+        require(msg.sender == _collection || msg.sender == Ownable(_collection).owner(), "Athanasia: Only collection owner may register the collection");
+        require(_depositAmount > 0, "Athanasia: Invalid deposit amount");
+        require(_otcPrice > 0, "Athanasia: Invalid OTC price");
+
+        // Make sure the OTC was allowed by Hector team
+        require(IAthanasiaOtc(hectorOtcContract).validateCollection(_collection, _otcToken, _otcPrice), "Athanasia: Collection not registered with OTC contract");
+
+        CollectionInfo storage info = collections[_collection];
+
+        require(info.depositsDone == 0, "Athanasia: Update not possible after deposit have been made");
+
+        info.depositAmount = _depositAmount.toUint96();
+        info.otcPurchaseToken = _otcToken;
+        info.otcPrice = _otcPrice.toUint96();
+
+        // Approve HEctor OTC contract so it can transfer OTC tokens over and give us sHEC
+        if (_otcToken != address(0)) {  // if null address, use FTM
+            IERC20(_otcToken).approve(hectorOtcContract, ~uint256(0));
+        }
+    }
+
+    /**
+     * @dev See {IAthanasia-registerCollection}.
+     */
+    function registerCollection(address _collection, uint256 _depositAmount) external {
+        require(msg.sender == _collection || msg.sender == Ownable(_collection).owner(), "Athanasia: Only collection owner may register the collection");
+        require(_depositAmount > 0, "Athanasia: Invalid deposit amount");
+
+        CollectionInfo storage info = collections[_collection];
+
+        require(info.depositsDone == 0, "Athanasia: Update not possible after deposit have been made");
+        info.depositAmount = _depositAmount.toUint96();
+    }
+
+    /**
+     * @dev See {IAthanasia-registerCollectionAndDeposit}.
+     */
+    function registerCollectionAndDeposit(address _collection, uint256 _depositAmount, uint256 _collectionSize) external {
+        require(msg.sender == _collection || msg.sender == Ownable(_collection).owner(), "Athanasia: Only collection owner may register the collection");
+        require(_depositAmount > 0, "Athanasia: Invalid deposit amount");
+        require(_collectionSize > 0, "Athanasia: Invalid collection size");
+        require(collections[_collection].depositAmount == 0, "Athanasia: Collection already registered");
+
+        _registerDeposit(_collection, _depositAmount, _collectionSize, _hecStakingContract().index());
+
+        _shecToken().safeTransferFrom(msg.sender, address(this), _depositAmount * _collectionSize);
+    }
+
+    /**
+     * @dev See {IAthanasia-registerCollectionAndDepositWithOtc}.
+     */
+    function registerCollectionAndDepositWithOtc(address _collection, uint256 _depositAmount, uint256 _collectionSize, address _otcToken, uint256 _otcPrice) external payable {
+        require(msg.sender == _collection || msg.sender == Ownable(_collection).owner(), "Athanasia: Only collection owner may register the collection");
+        require(_depositAmount > 0, "Athanasia: Invalid deposit amount");
+        require(_collectionSize > 0, "Athanasia: Invalid collection size");
+        require(collections[_collection].depositAmount == 0, "Athanasia: Collection already registered");
+
+        require(IAthanasiaOtc(hectorOtcContract).validateCollection(_collection, _otcToken, _otcPrice), "Athanasia: Collection not registered with OTC contract");
+
+        CollectionInfo storage info = _registerDeposit(_collection, _depositAmount, _collectionSize, _hecStakingContract().index());
+        info.otcPurchaseToken = _otcToken;
+        info.otcPrice = _otcPrice.toUint96();
+
+        uint256 totalAmountForOtc = _collectionSize * _otcPrice * _depositAmount / ONE_HECTOR;
+        if (_otcToken != address(0)) {
+            IERC20(_otcToken).safeTransferFrom(msg.sender, address(this), totalAmountForOtc);
+            IERC20(_otcToken).approve(hectorOtcContract, ~uint256(0));
+            IAthanasiaOtc(hectorOtcContract).otc(_collection, _collectionSize * _depositAmount, totalAmountForOtc);
+        } else {
+            require(msg.value >= totalAmountForOtc, "Athanasia: Insufficient FTM funds for OTC");
+            IAthanasiaOtc(hectorOtcContract).otc{value: totalAmountForOtc}(_collection, _collectionSize * _depositAmount, totalAmountForOtc);
+        }
+    }
+
+    /**
+     * @dev See {IAthanasia-registerCollectionAndDepositWithRoot}.
+     */
+    function registerCollectionAndDepositWithRoot(address _collection, uint256 _depositAmount, uint256 _tokenCount, bytes32 _eligibilityRoot) external {
+        require(msg.sender == _collection || msg.sender == Ownable(_collection).owner(), "Athanasia: Only collection owner may register the collection");
+        require(_depositAmount > 0, "Athanasia: Invalid deposit amount");
+        require(_tokenCount > 0, "Athanasia: Invalid collection size");
+        require(_eligibilityRoot != bytes32(0), "Athanasia: Invalid eligibility root");
+        require(collections[_collection].depositAmount == 0, "Athanasia: Collection already registered");
+
+        uint256 currentIndex = _hecStakingContract().index();
+        _registerDeposit(_collection, _depositAmount, _tokenCount, currentIndex).eligibleByProof = true;
+        eligibilityRoots[_collection] = EligibilityRoot(_eligibilityRoot, _recordStakingIndex(currentIndex).toUint32(), _tokenCount.toUint32());
+
+        _shecToken().safeTransferFrom(msg.sender, address(this), _depositAmount * _tokenCount);
+    }
+
+    /**
+     * @dev Records the deposit of `_depositAmount` for each of `_count` tokens of an unregistered collection at
+     * `_currentIndex`. The record is filled field by field, as an eight field literal leaves too few stack slots for
+     * the callers' arguments.
+     */
+    function _registerDeposit(address _collection, uint256 _depositAmount, uint256 _count, uint256 _currentIndex)
+        internal returns (CollectionInfo storage info)
+    {
+        info = collections[_collection];
+        info.depositAmount = _depositAmount.toUint96();
+        info.stakingIndexOnDeposit = _currentIndex.toUint96();
+        info.depositsDone = _count.toUint32();
+        emit CollectionDeposit(msg.sender, _collection, _count, _depositAmount);
+        _recordDeposits(_collection, _depositAmount, _count, _currentIndex);
+    }
+
+    /**
+     * @dev See {IAthanasia-proveEligibility}.
+     */
+    function proveEligibility(address _collection, uint256[] memory _tokenIds, bytes32[][] memory _proofs) external {
+        _proveEligibility(_collection, _tokenIds, _proofs);
+    }
+
+    /**
+     * @dev Writes the deposit checkpoint of the `_tokenIds` not yet proven eligible or deposited, once per
+     * checkpoint word, after verifying their proofs.
+     */
+    function _proveEligibility(address _collection, uint256[] memory _tokenIds, bytes32[][] memory _proofs) internal {
+        require(_tokenIds.length == _proofs.length, "Athanasia: Length mismatch");
+        require(collections[_collection].eligibleByProof, "Athanasia: Collection not registered with eligibility root");
+        EligibilityRoot memory eligibility = eligibilityRoots[_collection];
+        mapping(uint256 => uint256) storage checkpoints = checkpointWords[_collection];
+        TokenCursor memory cursor = _newCursor();
+        uint256[] memory proven = new uint256[](_tokenIds.length);
+        uint256 count = 0;
+        for (uint256 i = 0; i < _tokenIds.length; ++i) {
+            uint256 tokenId = _tokenIds[i];
+            if (_readCheckpoint(checkpoints, cursor, tokenId) != 0) {
+                // Already proven, or deposited for with {deposit}.
+                continue;
+            }
+            require(MerkleProof.verify(_proofs[i], eligibility.root, keccak256(abi.encodePacked(tokenId))), "Athanasia: Invalid eligibility proof");
+            _writeCheckpoint(cursor, tokenId, eligibility.depositEpoch);
+            proven[count++] = tokenId;
+        }
+        _flushCheckpoints(checkpoints, cursor);
+
+        if (count > 0) {
+            require(count <= eligibility.unproven, "Athanasia: More tokens proven than deposited");
+            eligibilityRoots[_collection].unproven = uint32(eligibility.unproven - count);
+            // Trim to the proven tokens.
+            assembly {
+                mstore(proven, count)
+            }
+            emit EligibilityProven(_collection, proven, stakingIndexHistory[eligibility.depositEpoch - 1]);
+        }
+    }
+
+    /**
+     * @dev See {IAthanasia-collectionStats}.
+     */
+    function collectionStats(address _collection) external view
+        returns (uint256 principal, uint256 hecClaimed, uint256 tokensUpgraded, uint256 weightedPrincipal, uint256 outstandingRewards)
+    {
+        CollectionStats memory stats = _collection == address(0) ? _totalStats : _collectionStats[_collection];
+        uint256 backing = uint256(stats.weightedPrincipal) * _hecStakingContract().index() / WEIGHT_SCALE;
+        outstandingRewards = backing > stats.principal ? backing - stats.principal : 0;
+        return (stats.principal, stats.hecClaimed, stats.tokensUpgraded, stats.weightedPrincipal, outstandingRewards);
+    }
+
+    /**
+     * @dev Weight of a token's deposit in {CollectionStats-weightedPrincipal} at staking index `_index`.
+     */
+    function _weight(uint256 _depositAmount, uint256 _index) internal pure returns (uint256) {
+        return _depositAmount * WEIGHT_SCALE / _index;
+    }
+
+    function _recordDeposits(address _collection, uint256 _depositAmount, uint256 _count, uint256 _index) internal {
+        uint256 weight = _count * _weight(_depositAmount, _index);
+        _addDeposits(_collectionStats[_collection], _count * _depositAmount, weight);
+        _addDeposits(_totalStats, _count * _depositAmount, weight);
+    }
+
+    function _addDeposits(CollectionStats storage _stats, uint256 _principal, uint256 _weight) private {
+        _stats.principal = (_stats.principal + _principal).toUint128();
+        _stats.weightedPrincipal = (_stats.weightedPrincipal + _weight).toUint224();
+    }
+
+    function _recordClaims(address _collection, uint256 _claimed, uint256 _weightRemoved, uint256 _weightAdded) internal {
+        _addClaims(_collectionStats[_collection], _claimed, _weightRemoved, _weightAdded);
+        _addClaims(_totalStats, _claimed, _weightRemoved, _weightAdded);
+    }
+
+    function _addClaims(CollectionStats storage _stats, uint256 _claimed, uint256 _weightRemoved, uint256 _weightAdded) private {
+        _stats.hecClaimed = (_stats.hecClaimed + _claimed).toUint128();
+        _stats.weightedPrincipal = (_stats.weightedPrincipal + _weightAdded - _weightRemoved).toUint224();
+    }
+
+    function _recordRemovals(address _collection, uint256 _principal, uint256 _weight, uint256 _tokens) internal {
+        _removeDeposits(_collectionStats[_collection], _principal, _weight, _tokens);
+        _removeDeposits(_totalStats, _principal, _weight, _tokens);
+    }
+
+    function _removeDeposits(CollectionStats storage _stats, uint256 _principal, uint256 _weight, uint256 _tokens) private {
+        _stats.principal = (_stats.principal - _principal).toUint128();
+        _stats.weightedPrincipal = (_stats.weightedPrincipal - _weight).toUint224();
+        _stats.tokensUpgraded = (_stats.tokensUpgraded + _tokens).toUint32();
+    }
+
+    function _claimableBalance(address _collection, uint256 _tokenId) internal view returns (uint256 withdrawable) {
+        // Check that the collection exists
+        CollectionInfo memory collection = collections[_collection];
+        if (collection.depositAmount == 0) {
+            // Collection not registered
+            return 0;
+        }
+
+        // Token upgraded
+        if (upgradeStatus(_collection, _tokenId)) {
+            return 0;
+        }
+
+        (withdrawable, ) = _claimable(collection, _tokenId, stakingIndexes(_collection, _tokenId), _hecStakingContract().index());
+    }
+
+    /**
+     * @dev Computes the reward of a single token of a registered collection, given the staking index recorded
+     * for the token at its last withdrawal (or zero if none) and the current staking index.
+     *
+     * Also returns the staking index the reward accrues from, which is zero if nothing was deposited for the token.
+     */
+    function _claimable(CollectionInfo memory _info, uint256 _tokenId, uint256 _indexAtLastWithdrawal, uint256 _currentIndex)
+        internal pure returns (uint256 withdrawable, uint256 indexAtLastWithdrawal)
+    {
+        if (_indexAtLastWithdrawal == PENDING_OTC_INDEX) {
+            // Deposit waiting for its OTC purchase, see {settleOtc}.
+            return (0, 0);
+        }
+        // For collections where underlying tokens were not deposited during registration,
+        // the deposit must be made explicitly, during which the staking index is recorded.
+        // NFTs proven eligible for the deposit on register are recorded the same way.
+        if (_info.stakingIndexOnDeposit == 0 || _info.eligibleByProof) {
+            if (_indexAtLastWithdrawal == 0) {
+                // No deposits were made
+                return (0, 0);
+            }
+        } else {
+            if (_tokenId > _info.depositsDone || _tokenId == 0) {
+                // Registrator only deposited for first `depositsDone` NFTs.
+                return (0, 0);
+            }
+            if (_indexAtLastWithdrawal == 0) {
+                _indexAtLastWithdrawal = _info.stakingIndexOnDeposit;
+            }
+        }
+
+        if (_indexAtLastWithdrawal >= _currentIndex) {
+            // No rebases happened
+            return (0, _indexAtLastWithdrawal);
+        }
+
+        return ((_currentIndex - _indexAtLastWithdrawal) * _info.depositAmount / _indexAtLastWithdrawal, _indexAtLastWithdrawal);
+    }
+
+    /**
+     * @dev See {IAthanasia-claimableBalance}.
+     */
+    function claimableBalance(address _collection, uint256 _tokenId) external view returns (uint256 withdrawable) {
+        return _claimableBalance(_collection, _tokenId);
+    }
+
+    /**
+     * @dev See {IAthanasia-claimableBalances}.
+     */
+    function claimableBalances(address _collection, uint256[] memory _tokenIds) external view
+        returns (uint256[] memory withdrawable, uint256[] memory indexes, bool[] memory upgraded, uint256 total)
+    {
+        return _claimableBalances(_collection, _tokenIds, _hecStakingContract().index());
+    }
+
+    /**
+     * @dev See {IAthanasia-claimableBalancesInRange}.
+     */
+    function claimableBalancesInRange(address _collection, uint256 _startTokenId, uint256 _endTokenId) external view
+        returns (uint256[] memory withdrawable, uint256[] memory indexes, bool[] memory upgraded, uint256 total)
+    {
+        require(_startTokenId <= _endTokenId, "Athanasia: Invalid token range");
+        uint256[] memory tokenIds = new uint256[](_endTokenId - _startTokenId);
+        for (uint256 i = 0; i < tokenIds.length; ++i) {
+            tokenIds[i] = _startTokenId + i;
+        }
+        return _claimableBalances(_collection, tokenIds, _hecStakingContract().index());
+    }
+
+    /**
+     * @dev See {IAthanasia-claimableBalancesMany}.
+     */
+    function claimableBalancesMany(address[] memory _collections, uint256[][] memory _tokenIds) external view
+        returns (uint256[][] memory withdrawable, uint256[] memory totals, uint256 total)
+    {
+        require(_collections.length == _tokenIds.length, "Athanasia: Length mismatch");
+        uint256 currentIndex = _hecStakingContract().index();
+        withdrawable = new uint256[][](_collections.length);
+        totals = new uint256[](_collections.length);
+        for (uint256 i = 0; i < _collections.length; ++i) {
+            (withdrawable[i], , , totals[i]) = _claimableBalances(_collections[i], _tokenIds[i], currentIndex);
+            total += totals[i];
+        }
+    }
+
+    function _claimableBalances(address _collection, uint256[] memory _tokenIds, uint256 _currentIndex) internal view
+        returns (uint256[] memory withdrawable, uint256[] memory indexes, bool[] memory upgraded, uint256 total)
+    {
+        CollectionInfo memory info = collections[_collection];
+        withdrawable = new uint256[](_tokenIds.length);
+        indexes = new uint256[](_tokenIds.length);
+        upgraded = new bool[](_tokenIds.length);
+        for (uint256 i = 0; i < _tokenIds.length; ++i) {
+            upgraded[i] = upgradeStatus(_collection, _tokenIds[i]);
+            (uint256 amount, uint256 indexAtLastWithdrawal) = _claimable(info, _tokenIds[i], stakingIndexes(_collection, _tokenIds[i]), _currentIndex);
+            indexes[i] = indexAtLastWithdrawal;
+            if (!upgraded[i]) {
+                withdrawable[i] = amount;
+                total += amount;
+            }
+        }
+    }
+
+    /**
+     * @dev Returns the staking index recorded for the NFT `_tokenId` from collection `_collection` at its deposit
+     * or last withdrawal, or zero if none was recorded.
+     */
+    function stakingIndexes(address _collection, uint256 _tokenId) public view returns (uint256) {
+        uint256 epoch = (checkpointWords[_collection][_tokenId >> 3] >> ((_tokenId & 7) * 32)) & 0xffffffff;
+        return epoch == 0 ? 0 : stakingIndexHistory[epoch - 1];
+    }
+
+    /**
+     * @dev Returns the number of staking indexes recorded in `stakingIndexHistory`.
+     */
+    function stakingIndexHistoryLength() external view returns (uint256) {
+        return stakingIndexHistory.length;
+    }
+
+    /**
+     * @dev Returns true if the NFT `_tokenId` from collection `_collection` has been upgraded to V2.
+     */
+    function upgradeStatus(address _collection, uint256 _tokenId) public view returns (bool) {
+        return (upgradeStatusWords[_collection][_tokenId >> 8] & (1 << (_tokenId & 0xff))) != 0;
+    }
+
+    /**
+     * @dev See {IAthanasia-claim}.
+     */
+    function claim(address _collection, uint256[] memory _tokenIds) external {
+        uint256 totalClaimable = _claim(_collection, _tokenIds, msg.sender, _hecStakingContract().index(), false);
+        _withdraw(msg.sender, totalClaimable);
+    }
+
+    /**
+     * @dev See {IAthanasia-claimStaked}.
+     */
+    function claimStaked(address _collection, uint256[] memory _tokenIds) external {
+        uint256 totalClaimable = _claim(_collection, _tokenIds, msg.sender, _hecStakingContract().index(), false);
+        if (totalClaimable > 0) {
+            _shecToken().safeTransfer(msg.sender, totalClaimable);
+        }
+    }
+
+    /**
+     * @dev See {IAthanasia-claimMany}.
+     */
+    function claimMany(address[] memory _collections, uint256[][] memory _tokenIds) external {
+        require(_collections.length == _tokenIds.length, "Athanasia: Length mismatch");
+        uint256 currentIndex = _hecStakingContract().index();
+        uint256 totalClaimable = 0;
+        for (uint256 i = 0; i < _collections.length; ++i) {
+            totalClaimable += _claim(_collections[i], _tokenIds[i], msg.sender, currentIndex, false);
+        }
+        _withdraw(msg.sender, totalClaimable);
+    }
+
+    /**
+     * @dev See {IAthanasia-claimWithProofs}.
+     */
+    function claimWithProofs(address _collection, uint256[] memory _tokenIds, bytes32[][] memory _proofs) external {
+        _proveEligibility(_collection, _tokenIds, _proofs);
+        uint256 totalClaimable = _claim(_collection, _tokenIds, msg.sender, _hecStakingContract().index(), false);
+        _withdraw(msg.sender, totalClaimable);
+    }
+
+    /**
+     * @dev See {IAthanasia-claimAllOwned}.
+     */
+    function claimAllOwned(address _collection, uint256 _offset, uint256 _limit) external {
+        uint256[] memory tokenIds = _ownedTokens(_collection, msg.sender, _offset, _limit);
+        uint256 totalClaimable = _claim(_collection, tokenIds, msg.sender, _hecStakingContract().index(), true);
+        _withdraw(msg.sender, totalClaimable);
+    }
+
+    /**
+     * @dev See {IAthanasia-claimableBalanceOfOwner}.
+     */
+    function claimableBalanceOfOwner(address _collection, address _owner, uint256 _offset, uint256 _limit)
+        external view returns (uint256[] memory tokenIds, uint256 withdrawable)
+    {
+        tokenIds = _ownedTokens(_collection, _owner, _offset, _limit);
+        CollectionInfo memory info = collections[_collection];
+        uint256 currentIndex = _hecStakingContract().index();
+        for (uint256 i = 0; i < tokenIds.length; ++i) {
+            if (!upgradeStatus(_collection, tokenIds[i])) {
+                (uint256 amount, ) = _claimable(info, tokenIds[i], stakingIndexes(_collection, tokenIds[i]), currentIndex);
+                withdrawable += amount;
+            }
+        }
+    }
+
+    /**
+     * @dev See {IAthanasia-claimFor}.
+     *
+     * The sHEC of all claims is unstaked at once, then each owner is sent their share.
+     */
+    function claimFor(SignedClaim[] memory _claims) external nonReentrant {
+        uint256 currentIndex = _hecStakingContract().index();
+        uint256[] memory amounts = new uint256[](_claims.length);
+        uint256 totalClaimable = 0;
+        for (uint256 i = 0; i < _claims.length; ++i) {
+            _useClaimSignature(_claims[i]);
+            amounts[i] = _claim(_claims[i].collection, _claims[i].tokenIds, _claims[i].owner, currentIndex, false);
+            totalClaimable += amounts[i];
+        }
+
+        if (totalClaimable > 0) {
+            _takeFromFloat(totalClaimable);
+            for (uint256 i = 0; i < _claims.length; ++i) {
+                if (amounts[i] > 0) {
+                    _hecToken().safeTransfer(_claims[i].owner, amounts[i]);
+                }
+            }
+        }
+    }
+
+    /**
+     * @dev Checks that `_signedClaim` is signed by its owner over their current nonce, and consumes the nonce.
+     */
+    function _useClaimSignature(SignedClaim memory _signedClaim) internal {
+        require(block.timestamp <= _signedClaim.deadline, "Athanasia: Signature expired");
+        bytes32 structHash = keccak256(abi.encode(
+            CLAIM_TYPEHASH,
+            _signedClaim.owner,
+            _signedClaim.collection,
+            keccak256(abi.encodePacked(_signedClaim.tokenIds)),
+            nonces[_signedClaim.owner]++,
+            _signedClaim.deadline
+        ));
+        address signer = ECDSA.recover(_hashTypedDataV4(structHash), _signedClaim.signature);
+        require(signer == _signedClaim.owner, "Athanasia: Invalid signature");
+    }
+
+    /**
+     * @dev Returns at most `_limit` tokens of `_owner` in `_collection`, starting at owner index `_offset`.
+     */
+    function _ownedTokens(address _collection, address _owner, uint256 _offset, uint256 _limit) internal view returns (uint256[] memory tokenIds) {
+        require(ERC165Checker.supportsInterface(_collection, type(IERC721Enumerable).interfaceId), "Athanasia: Collection not enumerable");
+
+        uint256 balance = IERC721(_collection).balanceOf(_owner);
+        uint256 count = _offset < balance ? balance - _offset : 0;
+        if (count > _limit) {
+            count = _limit;
+        }
+
+        tokenIds = new uint256[](count);
+        for (uint256 i = 0; i < count; ++i) {
+            tokenIds[i] = IERC721Enumerable(_collection).tokenOfOwnerByIndex(_owner, _offset + i);
+        }
+    }
+
+    /**
+     * @dev Moves the checkpoints of `_tokenIds` owned by `_owner` to `_currentIndex` and returns the total HEC
+     * claimable for them. Nothing is transferred, see {_withdraw}.
+     *
+     * The collection record is read once per call. Per token, the work is one ownership check, one checkpoint
+     * read and (if the checkpoint moves) one checkpoint write; checkpoints and upgrade flags of neighbouring
+     * tokens share storage words, which are read and written once per word.
+     * Upgraded tokens revert the claim, unless `_skipUpgraded` is set.
+     */
+    function _claim(address _collection, uint256[] memory _tokenIds, address _owner, uint256 _currentIndex, bool _skipUpgraded)
+        internal returns (uint256 totalClaimable)
+    {
+        CollectionInfo memory info = collections[_collection];
+        TokenCursor memory cursor = _newCursor();
+        bool compact = compactEvents;
+        for (uint256 i = 0; i < _tokenIds.length; ++i) {
+            uint256 tokenId = _tokenIds[i];
+            require(IERC721(_collection).ownerOf(tokenId) == _owner, "Athanasia: Not owner");
+            if (_isUpgraded(upgradeStatusWords[_collection], cursor, tokenId)) {
+                require(_skipUpgraded, "Athanasia: Some already upgraded");
+                continue;
+            }
+
+            uint256 withdrawable = _claimToken(_collection, info, cursor, tokenId, _currentIndex);
+            totalClaimable += withdrawable;
+            if (!compact) {
+                emit Claim(_owner, _collection, tokenId, withdrawable);
+            }
+        }
+        _flushCheckpoints(checkpointWords[_collection], cursor);
+        if (cursor.checkpointsMoved > 0) {
+            _recordClaims(_collection, totalClaimable, cursor.weightRemoved, cursor.checkpointsMoved * _weight(info.depositAmount, _currentIndex));
+        }
+
+        if (compact) {
+            emit ClaimBatch(_owner, _collection, _tokenIds, totalClaimable, _currentIndex);
+        }
+    }
+
+    /**
+     * @dev Returns the reward of a single token and moves its checkpoint to `_currentIndex` in `_cursor`.
+     */
+    function _claimToken(address _collection, CollectionInfo memory _info, TokenCursor memory _cursor, uint256 _tokenId, uint256 _currentIndex)
+        internal returns (uint256 withdrawable)
+    {
+        uint256 indexAtLastWithdrawal;
+        (withdrawable, indexAtLastWithdrawal) = _claimable(_info, _tokenId, _readCheckpoint(checkpointWords[_collection], _cursor, _tokenId), _currentIndex);
+        // Tokens without a deposit keep an empty checkpoint, so claiming them can not make them earn.
+        if (indexAtLastWithdrawal != 0 && indexAtLastWithdrawal != _currentIndex) {
+            if (_cursor.currentEpoch == 0) {
+                _cursor.currentEpoch = _recordStakingIndex(_currentIndex);
+            }
+            _writeCheckpoint(_cursor, _tokenId, _cursor.currentEpoch);
+            _cursor.weightRemoved += _weight(_info.depositAmount, indexAtLastWithdrawal);
+            ++_cursor.checkpointsMoved;
+        }
+    }
+
+    function _newCursor() internal pure returns (TokenCursor memory) {
+        return TokenCursor(type(uint256).max, 0, false, type(uint256).max, 0, 0, 0, 0, 0, 0);
+    }
+
+    /**
+     * @dev Returns the staking index recorded for `_tokenId`, moving `_cursor` to the checkpoint word holding the token.
+     * A modified word is written back when the cursor moves away from it.
+     */
+    function _readCheckpoint(mapping(uint256 => uint256) storage _checkpoints, TokenCursor memory _cursor, uint256 _tokenId) internal returns (uint256) {
+        if (_tokenId >> 3 != _cursor.checkpointWordIndex) {
+            _flushCheckpoints(_checkpoints, _cursor);
+            _cursor.checkpointWordIndex = _tokenId >> 3;
+            _cursor.checkpointWord = _checkpoints[_tokenId >> 3];
+        }
+        uint256 epoch = (_cursor.checkpointWord >> ((_tokenId & 7) * 32)) & 0xffffffff;
+        if (epoch != _cursor.epoch) {
+            _cursor.epoch = epoch;
+            _cursor.epochIndex = epoch == 0 ? 0 : stakingIndexHistory[epoch - 1];
+        }
+        return _cursor.epochIndex;
+    }
+
+    /**
+     * @dev Sets the checkpoint epoch of `_tokenId`, which must be in the word last read by {_readCheckpoint}.
+     */
+    function _writeCheckpoint(TokenCursor memory _cursor, uint256 _tokenId, uint256 _epoch) internal pure {
+        uint256 shift = (_tokenId & 7) * 32;
+        _cursor.checkpointWord = (_cursor.checkpointWord & ~(uint256(0xffffffff) << shift)) | (_epoch << shift);
+        _cursor.checkpointDirty = true;
+    }
+
+    function _flushCheckpoints(mapping(uint256 => uint256) storage _checkpoints, TokenCursor memory _cursor) internal {
+        if (_cursor.checkpointDirty) {
+            _checkpoints[_cursor.checkpointWordIndex] = _cursor.checkpointWord;
+            _cursor.checkpointDirty = false;
+        }
+    }
+
+    function _isUpgraded(mapping(uint256 => uint256) storage _upgradeStatusWords, TokenCursor memory _cursor, uint256 _tokenId) internal view returns (bool) {
+        if (_tokenId >> 8 != _cursor.upgradedWordIndex) {
+            _cursor.upgradedWordIndex = _tokenId >> 8;
+            _cursor.upgradedWord = _upgradeStatusWords[_tokenId >> 8];
+        }
+        return (_cursor.upgradedWord & (1 << (_tokenId & 0xff))) != 0;
+    }
+
+    function _flushUpgraded(mapping(uint256 => uint256) storage _upgradeStatusWords, TokenCursor memory _cursor) internal {
+        if (_cursor.upgradedWordIndex != type(uint256).max) {
+            _upgradeStatusWords[_cursor.upgradedWordIndex] = _cursor.upgradedWord;
+        }
+    }
+
+    /**
+     * @dev Returns the epoch of `_currentIndex`, appending it to the staking index history if it differs from the last entry.
+     */
+    function _recordStakingIndex(uint256 _currentIndex) internal returns (uint256 epoch) {
+        epoch = stakingIndexHistory.length;
+        if (epoch == 0 || stakingIndexHistory[epoch - 1] != _currentIndex) {
+            require(epoch < type(uint32).max, "Athanasia: Staking index history full");
+            stakingIndexHistory.push(_currentIndex);
+            ++epoch;
+            emit StakingIndexRecorded(epoch, _currentIndex);
+        }
+    }
+
+    /**
+     * @dev Sends `_amount` HEC to `_to`, see {_takeFromFloat}.
+     */
+    function _withdraw(address _to, uint256 _amount) internal {
+        if (_amount > 0) {
+            _takeFromFloat(_amount);
+
+            // Send the HEC to the caller
+            _hecToken().safeTransfer(_to, _amount);
+        }
+    }
+
+    /**
+     * @dev Makes `_amount` HEC available for transfer. Claims covered by the HEC float are paid from it, otherwise
+     * the missing amount is unstaked together with enough sHEC to refill the float to `hecFloatTarget`.
+     *
+     * HEC does not rebase, so the refill only takes sHEC beyond what the deposits are owed at the current index
+     * (and what pending OTC purchases hold), e.g. the rewards of claims paid from the float. Without such a
+     * surplus the float is not refilled.
+     */
+    function _takeFromFloat(uint256 _amount) internal {
+        uint256 floatBalance = hecFloat;
+        if (_amount <= floatBalance) {
+            hecFloat = uint128(floatBalance - _amount);
+            return;
+        }
+
+        uint256 shortfall = _amount - floatBalance;
+        uint256 refill = hecFloatTarget;
+        if (refill > 0) {
+            uint256 available = _shecToken().balanceOf(address(this));
+            // Claims are recorded before their withdrawal, so the backing no longer includes the amount claimed.
+            uint256 owed = uint256(_totalStats.weightedPrincipal) * _hecStakingContract().index() / WEIGHT_SCALE
+                + _pendingOtcPurchased + shortfall;
+            uint256 spare = available > owed ? available - owed : 0;
+            if (refill > spare) {
+                refill = spare;
+            }
+        }
+
+        // Unstake the amount being claimed, and the refill of the float.
+        _hecStakingContract().unstake(shortfall + refill, false);
+        hecFloat = uint128(refill);
+    }
+
+    /**
+     * @dev Checkpoints the deposit of `_tokenIds`. Deposits with OTC of a collection with deferred OTC purchases are
+     * checkpointed at the epoch of its pending purchase, and collect their payment into it.
+     */
+    function _updateStakingIndexes(address _collection, uint256[] memory _tokenIds, bool _withOtc) internal returns (CollectionInfo memory info) {
+        // Check that the collection exists
+        info = collections[_collection];
+        require(info.depositAmount > 0, "Athanasia: Collection not registered");
+        require(!info.migrating, "Athanasia: Collection migrating");
+
+        uint256 stakingIndex;
+        uint256 epoch;
+        if (_withOtc && info.deferredOtc) {
+            stakingIndex = PENDING_OTC_INDEX;
+            epoch = _addPendingOtc(_collection, info, _tokenIds.length);
+        } else {
+            stakingIndex = _hecStakingContract().index();
+            epoch = _recordStakingIndex(stakingIndex);
+            _recordDeposits(_collection, info.depositAmount, _tokenIds.length, stakingIndex);
+        }
+        _writeDepositCheckpoints(_collection, _tokenIds, epoch, info.depositAmount, stakingIndex);
+
+        // The deposit counter is written once per batch rather than once per token.
+        collections[_collection].depositsDone = (info.depositsDone + _tokenIds.length).toUint32();
+    }
+
+    function _writeDepositCheckpoints(address _collection, uint256[] memory _tokenIds, uint256 _epoch, uint256 _depositAmount, uint256 _stakingIndex) internal {
+        mapping(uint256 => uint256) storage checkpoints = checkpointWords[_collection];
+        TokenCursor memory cursor = _newCursor();
+        // Pending deposits always emit a batch event, as their checkpoint is not the current staking index.
+        bool compact = compactEvents || _stakingIndex == PENDING_OTC_INDEX;
+        for (uint256 i = 0; i < _tokenIds.length; ++i) {
+            uint256 tokenId = _tokenIds[i];
+            // Token must exist
+            require(IERC721(_collection).ownerOf(tokenId) != address(0), "Athanasia: nonexistent token");
+            // Token must not already be deposited
+            require(_readCheckpoint(checkpoints, cursor, tokenId) == 0, "Athanasia: Token already deposited");
+            _writeCheckpoint(cursor, tokenId, _epoch);
+            if (!compact) {
+                emit Deposit(msg.sender, _collection, tokenId, _depositAmount);
+            }
+        }
+        _flushCheckpoints(checkpoints, cursor);
+
+        if (compact) {
+            emit DepositBatch(msg.sender, _collection, _tokenIds, _depositAmount, _stakingIndex);
+        }
+    }
+
+    /**
+     * @dev See {IAthanasia-deposit}.
+     */
+    function deposit(address _collection, uint256[] memory _tokenIds) external {
+        CollectionInfo memory info = _updateStakingIndexes(_collection, _tokenIds, false);
+        _shecToken().safeTransferFrom(msg.sender, address(this), _tokenIds.length * info.depositAmount);
+    }
+
+    /**
+     * @dev See {IAthanasia-depositWithOtc}.
+     */
+    function depositWithOtc(address _collection, uint256[] memory _tokenIds) external payable nonReentrant {
+        CollectionInfo memory info = _updateStakingIndexes(_collection, _tokenIds, true);
+        if (info.deferredOtc) {
+            // Paid into the pending purchase.
+            return;
+        }
+        uint256 totalAmountForOtc = _tokenIds.length * info.otcPrice * info.depositAmount / ONE_HECTOR;
+
+        if (info.otcPurchaseToken == address(0)) {
+            // OTC done in native FTM
+            require(msg.value >= totalAmountForOtc, "Athanasia: Insufficient FTM funds for OTC");
+            // Call OTC contract to perfomr OTC buy and send the needed FTM value over
+            IAthanasiaOtc(hectorOtcContract).otc{value: totalAmountForOtc}(_collection, _tokenIds.length * info.depositAmount, totalAmountForOtc);
+        }
+        else {
+            // OTC done in custom ERC20 token
+            IERC20(info.otcPurchaseToken).safeTransferFrom(msg.sender, address(this), totalAmountForOtc);
+            // Call OTC contract to perform OTC buy
+            IAthanasiaOtc(hectorOtcContract).otc(_collection, _tokenIds.length * info.depositAmount, totalAmountForOtc);
+        }
+    }
+
+    /**
+     * @dev Collects the payment for `_count` deposits of `_collection` into its pending OTC purchase, and returns the
+     * epoch of their checkpoint. The cost is rounded up, so that the payments collected cover the cost of any
+     * split of their aggregated purchase.
+     */
+    function _addPendingOtc(address _collection, CollectionInfo memory _info, uint256 _count) internal returns (uint256) {
+        uint256 amountToPurchase = _count * _info.depositAmount;
+        uint256 cost = (amountToPurchase * _info.otcPrice + ONE_HECTOR - 1) / ONE_HECTOR;
+        if (_info.otcPurchaseToken == address(0)) {
+            require(msg.value >= cost, "Athanasia: Insufficient FTM funds for OTC");
+        } else {
+            IERC20(_info.otcPurchaseToken).safeTransferFrom(msg.sender, address(this), cost);
+        }
+
+        PendingOtc memory pending = pendingOtc[_collection];
+        if (pending.epoch == 0) {
+            // The epoch's staking index is set by the settlement.
+            require(stakingIndexHistory.length < type(uint32).max, "Athanasia: Staking index history full");
+            stakingIndexHistory.push(PENDING_OTC_INDEX);
+            pending.epoch = uint32(stakingIndexHistory.length);
+        }
+        pending.amountToPurchase = (pending.amountToPurchase + amountToPurchase).toUint128();
+        pending.paid = (pending.paid + cost).toUint128();
+        pending.collected = (pending.collected + cost).toUint96();
+        pendingOtc[_collection] = pending;
+        otcPayments[pending.epoch][msg.sender] += cost;
+        return pending.epoch;
+    }
+
+    /**
+     * @dev See {IAthanasia-settleOtc}.
+     */
+    function settleOtc(address _collection) external nonReentrant {
+        _settleOtc(_collection, type(uint256).max);
+    }
+
+    /**
+     * @dev See {IAthanasia-settleOtc}.
+     */
+    function settleOtc(address _collection, uint256 _maxAmount) external nonReentrant {
+        _settleOtc(_collection, _maxAmount);
+    }
+
+    /**
+     * @dev Purchases up to `_maxAmount` of the pending underlying tokens of `_collection`. Once all of them are
+     * purchased, the pending deposits start earning from the current staking index.
+     */
+    function _settleOtc(address _collection, uint256 _maxAmount) internal {
+        PendingOtc memory pending = pendingOtc[_collection];
+        uint256 amount = pending.amountToPurchase - pending.amountPurchased;
+        if (amount > _maxAmount) {
+            amount = _maxAmount;
+        }
+        require(amount > 0, "Athanasia: No pending OTC deposits");
+        CollectionInfo memory info = collections[_collection];
+        uint256 cost = amount * info.otcPrice / ONE_HECTOR;
+        pending.amountPurchased += uint128(amount);
+        // The sum of the rounded up payments covers any split of the purchase.
+        pending.paid -= uint128(cost);
+
+        uint256 stakingIndex = 0;
+        if (pending.amountPurchased == pending.amountToPurchase) {
+            stakingIndex = _hecStakingContract().index();
+            stakingIndexHistory[pending.epoch - 1] = stakingIndex;
+            emit StakingIndexRecorded(pending.epoch, stakingIndex);
+            _recordDeposits(_collection, info.depositAmount, pending.amountToPurchase / info.depositAmount, stakingIndex);
+            _pendingOtcPurchased -= pending.amountPurchased - amount;
+            otcSurplus[_collection] += pending.paid;
+            pending = PendingOtc(0, 0, 0, 0, 0);
+        } else {
+            _pendingOtcPurchased += amount;
+        }
+        pendingOtc[_collection] = pending;
+        emit OtcSettled(_collection, amount, cost, stakingIndex);
+
+        if (info.otcPurchaseToken == address(0)) {
+            IAthanasiaOtc(hectorOtcContract).otc{value: cost}(_collection, amount, cost);
+        } else {
+            IAthanasiaOtc(hectorOtcContract).otc(_collection, amount, cost);
+        }
+    }
+
+    /**
+     * @dev See {IAthanasia-cancelOtc}.
+     */
+    function cancelOtc(address _collection) external onlyOwner {
+        PendingOtc memory pending = pendingOtc[_collection];
+        require(pending.epoch != 0, "Athanasia: No pending OTC deposits");
+        // The checkpoints of the pending deposits now read as no deposit, so the tokens may be deposited again.
+        // Collections deposited on register can not defer OTC purchases, so no token falls back to their deposit.
+        stakingIndexHistory[pending.epoch - 1] = 0;
+        CollectionInfo storage info = collections[_collection];
+        info.depositsDone = uint32(info.depositsDone - pending.amountToPurchase / info.depositAmount);
+        cancelledOtc[pending.epoch] = CancelledOtc(_collection, pending.collected, pending.paid, pending.amountPurchased);
+        delete pendingOtc[_collection];
+        emit OtcCancelled(_collection, pending.epoch, pending.paid, pending.amountPurchased);
+    }
+
+    /**
+     * @dev See {IAthanasia-withdrawOtcRefund}.
+     */
+    function withdrawOtcRefund(uint256 _epoch) external nonReentrant {
+        CancelledOtc memory cancelled = cancelledOtc[_epoch];
+        uint256 payment = otcPayments[_epoch][msg.sender];
+        require(cancelled.collection != address(0) && payment > 0, "Athanasia: Nothing to refund");
+        delete otcPayments[_epoch][msg.sender];
+
+        uint256 refunded = payment * cancelled.paid / cancelled.collected;
+        uint256 underlyingRefunded = payment * cancelled.purchased / cancelled.collected;
+        _pendingOtcPurchased -= underlyingRefunded;
+        emit OtcRefunded(cancelled.collection, msg.sender, refunded, underlyingRefunded);
+
+        if (underlyingRefunded > 0) {
+            _shecToken().safeTransfer(msg.sender, underlyingRefunded);
+        }
+        _sendOtcTokens(collections[cancelled.collection].otcPurchaseToken, payable(msg.sender), refunded);
+    }
+
+    /**
+     * @dev See {IAthanasia-sweepOtcSurplus}.
+     */
+    function sweepOtcSurplus(address _collection, address payable _to) external onlyOwner nonReentrant {
+        uint256 surplus = otcSurplus[_collection];
+        require(surplus > 0, "Athanasia: No OTC surplus");
+        delete otcSurplus[_collection];
+        emit OtcSurplusSwept(_collection, _to, surplus);
+        _sendOtcTokens(collections[_collection].otcPurchaseToken, _to, surplus);
+    }
+
+    /**
+     * @dev Sends `_amount` of the OTC token `_otcToken` to `_to`, in FTM for the zero address.
+     */
+    function _sendOtcTokens(address _otcToken, address payable _to, uint256 _amount) internal {
+        if (_amount == 0) {
+            return;
+        }
+        if (_otcToken == address(0)) {
+            (bool sent, ) = _to.call{value: _amount}("");
+            require(sent, "Athanasia: FTM transfer failed");
+        } else {
+            IERC20(_otcToken).safeTransfer(_to, _amount);
+        }
+    }
+
+    /**
+     * @dev See {IAthanasia-setDeferredOtc}.
+     */
+    function setDeferredOtc(address _collection, bool _deferred) external {
+        require(msg.sender == _collection || msg.sender == Ownable(_collection).owner(), "Athanasia: Only collection owner may configure OTC deferral");
+        CollectionInfo storage info = collections[_collection];
+        require(info.otcPrice > 0, "Athanasia: Collection not registered with OTC");
+        // A cancelled purchase clears the checkpoints of its tokens, which must not read as the deposit on register.
+        require(info.stakingIndexOnDeposit == 0, "Athanasia: Collection deposited on register");
+        info.deferredOtc = _deferred;
+    }
+
+    /**
+     * @dev See {IAthanasia-setMigrationEnabled}.
+     */
+    function setMigrationEnabled(address _collection, bool _enabled) external {
+        require(msg.sender == _collection || msg.sender == Ownable(_collection).owner(), "Athanasia: Only collection owner may configure migration");
+        CollectionInfo storage info = collections[_collection];
+        require(info.depositAmount > 0, "Athanasia: Collection not registered");
+        require(!info.migrating, "Athanasia: Collection migrating");
+        info.migrationEnabled = _enabled;
+    }
+
+    /**
+     * @dev See {IAthanasia-setUpgradeAddress}.
+     */
+    function setUpgradeAddress(address _contractAddress) external onlyOwner {
+        v2contract = _contractAddress;
+    }
+
+    /**
+     * @dev Switches between one event per NFT and one compact batch event per call.
+     */
+    function setCompactEvents(bool _compactEvents) external onlyOwner {
+        compactEvents = _compactEvents;
+    }
+
+    /**
+     * @dev Sets the amount of HEC kept aside to pay claims without an unstake each, see {_takeFromFloat}.
+     * HEC in the float does not earn staking rewards, so it is only refilled from sHEC the deposits are not owed,
+     * such as sHEC sent to this contract to fund the float.
+     * Lowering the target takes effect as the float is drained by claims.
+     */
+    function setHecFloatTarget(uint256 _hecFloatTarget) external onlyOwner {
+        hecFloatTarget = _hecFloatTarget.toUint128();
+    }
+
+    /**
+     * @dev See {IAthanasia-upgrade}.
+     */
+    function upgrade(address _collection, uint256[] memory _tokenIds) external {
+        require(v2contract != address(0), "Athanasia: Upgrade unavailable");
+        CollectionInfo memory info = collections[_collection];
+        uint256 currentIndex = _hecStakingContract().index();
+        // Checkpoints and flags are read once per word, and flags are written back once the batch moves on to another word.
+        TokenCursor memory cursor = _newCursor();
+        bool compact = compactEvents;
+        // Upgraded tokens that had a deposit, whose checkpoint is at the current index.
+        uint256 deposits = 0;
+        for (uint256 i = 0; i < _tokenIds.length; ++i) {
+            uint256 tokenId = _tokenIds[i];
+            require(IERC721(_collection).ownerOf(tokenId) == msg.sender, "Athanasia: Only NFT owner can upgrade");
+            // NFTs eligible by proof have no deposit until proven, and carry their checkpoint from then on.
+            require((info.stakingIndexOnDeposit == currentIndex && !info.eligibleByProof) || _readCheckpoint(checkpointWords[_collection], cursor, tokenId) == currentIndex, "Athanasia: Must claim before upgrade");
+            if (tokenId >> 8 != cursor.upgradedWordIndex) {
+                _flushUpgraded(upgradeStatusWords[_collection], cursor);
+                cursor.upgradedWordIndex = tokenId >> 8;
+                cursor.upgradedWord = upgradeStatusWords[_collection][tokenId >> 8];
+            }
+            uint256 mask = 1 << (tokenId & 0xff);
+            require(cursor.upgradedWord & mask == 0, "Athanasia: Some already upgraded");
+            cursor.upgradedWord |= mask;
+            if (info.stakingIndexOnDeposit == 0 || info.eligibleByProof || (tokenId != 0 && tokenId <= info.depositsDone)) {
+                ++deposits;
+            }
+            if (!compact) {
+                emit Upgrade(msg.sender, _collection, tokenId);
+            }
+        }
+        _flushUpgraded(upgradeStatusWords[_collection], cursor);
+        if (compact) {
+            emit UpgradeBatch(msg.sender, _collection, _tokenIds);
+        }
+        _recordRemovals(_collection, deposits * info.depositAmount, deposits * _weight(info.depositAmount, currentIndex), _tokenIds.length);
+
+        _shecToken().safeTransfer(v2contract, info.depositAmount * _tokenIds.length);
+
+        require(IAthanasia(v2contract).upgradeTo(msg.sender, _collection, _tokenIds), "Athanasia: Upgrade failed in V2");
+    }
+
+    /**
+     * @dev See {IAthanasia-migrateCollection}.
+     */
+    function migrateCollection(address _collection, uint256 _startTokenId, uint256 _endTokenId) external {
+        require(v2contract != address(0), "Athanasia: Upgrade unavailable");
+        require(msg.sender == owner() || msg.sender == _collection || msg.sender == Ownable(_collection).owner(), "Athanasia: Only owner may migrate the collection");
+        // Token ids are packed with their staking index in the migrated states.
+        require(_startTokenId < _endTokenId && _endTokenId <= type(uint128).max, "Athanasia: Invalid token range");
+        CollectionInfo memory info = collections[_collection];
+        require(info.depositAmount > 0, "Athanasia: Collection not registered");
+        require(info.migrationEnabled, "Athanasia: Migration not enabled for the collection");
+        if (!info.migrating) {
+            collections[_collection].migrating = true;
+        }
+
+        (uint256[] memory states, uint256 amount) = _migrationStates(_collection, info, _startTokenId, _endTokenId);
+        emit CollectionMigrated(_collection, _startTokenId, _endTokenId, states.length);
+
+        if (states.length > 0) {
+            _shecToken().safeTransfer(v2contract, amount);
+            require(IAthanasia(v2contract).migrateFrom(_collection, states), "Athanasia: Migration failed in V2");
+        }
+    }
+
+    /**
+     * @dev Marks the deposited and not yet upgraded tokens from `_startTokenId` to `_endTokenId` (exclusive) as
+     * upgraded, and returns their states as `tokenId << 128 | stakingIndex` along with the sHEC backing them,
+     * i.e. their deposits and unclaimed rewards.
+     */
+    function _migrationStates(address _collection, CollectionInfo memory _info, uint256 _startTokenId, uint256 _endTokenId)
+        internal returns (uint256[] memory states, uint256 amount)
+    {
+        uint256 currentIndex = _hecStakingContract().index();
+        TokenCursor memory cursor = _newCursor();
+        states = new uint256[](_endTokenId - _startTokenId);
+        uint256 count = 0;
+        for (uint256 tokenId = _startTokenId; tokenId < _endTokenId; ++tokenId) {
+            (uint256 indexAtLastWithdrawal, uint256 tokenAmount) = _migrateToken(_collection, _info, cursor, tokenId, currentIndex);
+            if (indexAtLastWithdrawal != 0) {
+                states[count++] = (tokenId << 128) | indexAtLastWithdrawal;
+                amount += tokenAmount;
+            }
+        }
+        _flushUpgraded(upgradeStatusWords[_collection], cursor);
+        _recordRemovals(_collection, count * _info.depositAmount, cursor.weightRemoved, count);
+
+        // Trim the states to the migrated tokens.
+        assembly {
+            mstore(states, count)
+        }
+    }
+
+    /**
+     * @dev Marks `_tokenId` as upgraded in `_cursor` and returns its staking index and the sHEC backing it.
+     * Returns a zero index for a token which is already upgraded or has nothing deposited.
+     */
+    function _migrateToken(address _collection, CollectionInfo memory _info, TokenCursor memory _cursor, uint256 _tokenId, uint256 _currentIndex)
+        internal returns (uint256 indexAtLastWithdrawal, uint256 amount)
+    {
+        if (_tokenId >> 8 != _cursor.upgradedWordIndex) {
+            _flushUpgraded(upgradeStatusWords[_collection], _cursor);
+            _cursor.upgradedWordIndex = _tokenId >> 8;
+            _cursor.upgradedWord = upgradeStatusWords[_collection][_tokenId >> 8];
+        }
+        uint256 mask = 1 << (_tokenId & 0xff);
+        if (_cursor.upgradedWord & mask != 0) {
+            return (0, 0);
+        }
+
+        uint256 withdrawable;
+        (withdrawable, indexAtLastWithdrawal) = _claimable(_info, _tokenId, _readCheckpoint(checkpointWords[_collection], _cursor, _tokenId), _currentIndex);
+        if (indexAtLastWithdrawal != 0) {
+            _cursor.upgradedWord |= mask;
+            _cursor.weightRemoved += _weight(_info.depositAmount, indexAtLastWithdrawal);
+            amount = _info.depositAmount + withdrawable;
+        }
+    }
+
+    /**
+     * @dev See {IAthanasia-migrateFrom}.
+     */
+    function migrateFrom(address _collection, uint256[] memory _states) external returns (bool) {
+        // this is V1
+        return false;
+    }
+
+    /**
+     * @dev See {IAthanasia-upgradeTo}.
+     */
+    function upgradeTo(address _tokenOwner, address _collection, uint256[] memory _tokenIds) external returns (bool) {
+        // this is V1
+        return false;
+    }
+}
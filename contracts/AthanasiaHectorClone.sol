@@ -0,0 +1,49 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.0;
+
+import "@openzeppelin/contracts/proxy/utils/Initializable.sol";
+import "./AthanasiaHectorBase.sol";
+
+/**
+ * @dev Implementation of {AthanasiaHectorBase} behind the EIP-1167 clones of {AthanasiaHectorFactory}.
+ *
+ * Clones do not run a constructor, so the HEC, sHEC and staking contract addresses and the owner are set in storage
+ * by `initializeClone`. The implementation contract itself can not be initialized.
+ */
+contract AthanasiaHectorClone is AthanasiaHectorBase, Initializable {
+    // ERC20 token address for $HEC token
+    IERC20 public hecToken;
+
+    // ERC20 token address for $sHEC token
+    IERC20 public shecToken;
+
+    // Hector Staking contract address
+    IHectorStaking public hecStakingContract;
+
+    constructor() initializer {}
+
+    /**
+     * @dev Sets `hecToken` and `shecToken` token addresses, the `hecStakingContract` address and the owner of a clone.
+     */
+    function initializeClone(address _hecToken, address _sHecToken, address _hecStakingContract, address _owner) external initializer {
+        require(_hecStakingContract != address(0), "staking contract");
+        hecStakingContract = IHectorStaking(_hecStakingContract);
+        require(_hecToken != address(0), "HEC");
+        hecToken = IERC20(_hecToken);
+        require(_sHecToken != address(0), "sHEC");
+        shecToken = IERC20(_sHecToken);
+        _transferOwnership(_owner);
+    }
+
+    function _hecToken() internal view override returns (IERC20) {
+        return hecToken;
+    }
+
+    function _shecToken() internal view override returns (IERC20) {
+        return shecToken;
+    }
+
+    function _hecStakingContract() internal view override returns (IHectorStaking) {
+        return hecStakingContract;
+    }
+}
@@ -0,0 +1,34 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.0;
+
+import "@openzeppelin/contracts/proxy/Clones.sol";
+import "./AthanasiaHectorClone.sol";
+
+/**
+ * @dev Deploys {AthanasiaHectorClone} instances as EIP-1167 minimal proxies of a single implementation, one per
+ * HEC / sHEC / staking contract setup.
+ */
+contract AthanasiaHectorFactory {
+    // Implementation all the clones delegate to.
+    address public immutable implementation;
+
+    /**
+     * @dev Emitted when a new clone is deployed, `owner` being its owner.
+     */
+    event CloneDeployed(address indexed clone, address indexed owner, address hecToken, address shecToken, address hecStakingContract);
+
+    constructor(address _implementation) {
+        require(_implementation != address(0), "implementation");
+        implementation = _implementation;
+    }
+
+    /**
+     * @dev Deploys and initializes a clone for the given token and staking contract addresses, owned by the caller.
+     * As for a standalone deployment, the owner still has to `initialize` it with the OTC contract.
+     */
+    function deployClone(address _hecToken, address _sHecToken, address _hecStakingContract) external returns (address clone) {
+        clone = Clones.clone(implementation);
+        AthanasiaHectorClone(clone).initializeClone(_hecToken, _sHecToken, _hecStakingContract, msg.sender);
+        emit CloneDeployed(clone, msg.sender, _hecToken, _sHecToken, _hecStakingContract);
+    }
+}
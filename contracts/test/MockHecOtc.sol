@@ -32,6 +32,10 @@ contract MockHecOtc is IAthanasiaOtc {
 
     mapping(address => Collection) public collections;
 
+    // Number of `otc` calls and underlying tokens sold per collection.
+    mapping(address => uint256) public purchases;
+    mapping(address => uint256) public purchased;
+
     function registerCollection(address collection, address otcToken, uint256 otcPrice, uint256 totalAmount) external {
         require(!failAlways, "OTC Register");
         collections[collection] = Collection(otcToken, otcPrice, totalAmount);
@@ -56,6 +60,9 @@ contract MockHecOtc is IAthanasiaOtc {
             );
         }
 
+        purchases[collection] += 1;
+        purchased[collection] += amountToPurchase;
+
         // Dont bother minting HEC and staking it, just mint the sHEC for the caller
         IMERC20(shec).mint(msg.sender, amountToPurchase);
     }
@@ -11,6 +11,13 @@ interface IMERC20 is IERC20 {
     function mint(address account_, uint256 amount_) external;
 }
 
+interface IMSHEC is IMERC20 {
+    function index() external view returns (uint256);
+    function setIndex(uint256 index_) external;
+    function gonsForBalance(uint256 amount_) external view returns (uint256);
+    function balanceForGons(uint256 gons_) external view returns (uint256);
+}
+
 // Heavily stripped down and mocked Hector staking contract. For local testing only.
 contract MockHectorStaking is Ownable {
     using SafeMath for uint256;
@@ -19,29 +26,22 @@ contract MockHectorStaking is Ownable {
     address public immutable HEC;
     address public immutable sHEC;
 
-    uint256 internal _index;
-    mapping(address => uint256) public stakedBalances;
+    // Balances in warmup, in sHEC gons so that they rebase with the index.
+    mapping(address => uint256) public warmupGons;
     mapping(address => bool) public warmupActive; // mock warmups, just track warmup amount for address
 
-    address[] public stakers;
-
     constructor(address _HEC, address _sHEC) {
         require(_HEC != address(0));
         HEC = _HEC;
         require(_sHEC != address(0));
         sHEC = _sHEC;
-        _index = 10**9;
     }
 
     function stake(uint256 _amount, address _recipient)
         external
         returns (bool)
     {
-        if (stakedBalances[_recipient] == 0) {
-            stakers.push(_recipient);
-        }
-
-        stakedBalances[_recipient] = stakedBalances[_recipient].add(_amount);
+        warmupGons[_recipient] = warmupGons[_recipient].add(IMSHEC(sHEC).gonsForBalance(_amount));
 
         IERC20(HEC).safeTransferFrom(msg.sender, address(this), _amount);
 
@@ -49,11 +49,15 @@ contract MockHectorStaking is Ownable {
         return true;
     }
 
+    function stakedBalances(address _recipient) public view returns (uint256) {
+        return IMSHEC(sHEC).balanceForGons(warmupGons[_recipient]);
+    }
+
     function claim(address _recipient) public {
         require(!warmupActive[_recipient], "Balance still in warmup period.");
-        IERC20(sHEC).safeTransfer(_recipient, stakedBalances[_recipient]);
+        IERC20(sHEC).safeTransfer(_recipient, stakedBalances(_recipient));
         delete warmupActive[_recipient];
-        delete stakedBalances[_recipient];
+        delete warmupGons[_recipient];
     }
 
     function unstake(uint256 _amount, bool _trigger) external {
@@ -62,7 +66,7 @@ contract MockHectorStaking is Ownable {
     }
 
     function index() public view returns (uint256) {
-        return _index;
+        return IMSHEC(sHEC).index();
     }
 
     function setWarmupState(address _to, bool _state) public {
@@ -70,31 +74,16 @@ contract MockHectorStaking is Ownable {
     }
 
     function setIndex(uint256 _newIndex) public {
-        _index = _newIndex;
+        IMSHEC(sHEC).setIndex(_newIndex);
     }
 
-    // Simulate rebase, mint tokens
+    // Simulate rebase. sHEC balances follow the index, and the HEC backing the sHEC minted is minted to this contract,
+    // which holds the staked HEC.
     function rebase(uint256 factor) public {
         require(factor > 10**9);
-        _index = _index.mul(factor).div(10**9);
-        uint256 hecMinted = 0;
-        for (uint256 i = 0; i < stakers.length; ++i) {
-            // mint SHEC to stakers
-            uint256 currentBalance = IERC20(sHEC).balanceOf(stakers[i]);
-            uint256 newBalance = currentBalance.mul(factor).div(10**9);
-            IMERC20(sHEC).mint(stakers[i], newBalance - currentBalance);
-            hecMinted += newBalance - currentBalance;
-
-            // mint SHEC to those in warmup
-            currentBalance = stakedBalances[stakers[i]];
-            newBalance = currentBalance.mul(factor).div(10**9);
-            stakedBalances[stakers[i]] = newBalance;
-            IMERC20(sHEC).mint(address(this), newBalance - currentBalance);
-            hecMinted += newBalance - currentBalance;
-        }
-
-        // HEC balance we have is the amount of HEC deposited - i.e this one gets the rebase benefit
-        IMERC20(HEC).mint(address(this), hecMinted);
+        uint256 supplyBefore = IERC20(sHEC).totalSupply();
+        IMSHEC(sHEC).setIndex(index().mul(factor).div(10**9));
+        IMERC20(HEC).mint(address(this), IERC20(sHEC).totalSupply().sub(supplyBefore));
     }
 
     function muller(uint256 a, uint256 b) public view returns (uint256) {
@@ -10,4 +10,10 @@ contract MockNFTContract is ERC721Enumerable, Ownable {
     function mint(address _to, uint256 _tokenId) public {
         _safeMint(_to, _tokenId);
     }
+
+    function mintBatch(address _to, uint256 _firstTokenId, uint256 _count) public {
+        for (uint256 i = 0; i < _count; i++) {
+            _safeMint(_to, _firstTokenId + i);
+        }
+    }
 }
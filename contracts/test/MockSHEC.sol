@@ -1,12 +1,82 @@
 // SPDX-License-Identifier: MIT
 pragma solidity ^0.8.0;
 
-import "@openzeppelin/contracts/token/ERC20/ERC20.sol";
+import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
 
-contract MockSHEC is ERC20 {
-    constructor() ERC20("MockSHector", "msHEC") {}
+// Rebasing mock sHEC. Balances are held in gons and derived from the staking index, so a rebase is a single
+// storage write after which every holder has accrued. For local testing only.
+contract MockSHEC is IERC20 {
+    // Gons per sHEC unit at the initial index. Balances are rounded to the nearest unit, which keeps them exact
+    // for amounts transferred at any index.
+    uint256 internal constant GONS = 10**27;
+    uint256 internal constant INITIAL_INDEX = 10**9;
+
+    string public constant name = "MockSHector";
+    string public constant symbol = "msHEC";
+    uint8 public constant decimals = 18;
+
+    uint256 public index = INITIAL_INDEX;
+    uint256 internal _totalGons;
+    mapping(address => uint256) internal _gonBalances;
+    mapping(address => mapping(address => uint256)) public override allowance;
+
+    function gonsForBalance(uint256 amount_) public view returns (uint256) {
+        return amount_ * GONS / index;
+    }
+
+    function balanceForGons(uint256 gons_) public view returns (uint256) {
+        return (gons_ * index + GONS / 2) / GONS;
+    }
+
+    function totalSupply() external view override returns (uint256) {
+        return balanceForGons(_totalGons);
+    }
+
+    function balanceOf(address account_) external view override returns (uint256) {
+        return balanceForGons(_gonBalances[account_]);
+    }
+
+    function setIndex(uint256 index_) external {
+        require(index_ > 0);
+        index = index_;
+    }
 
     function mint(address account_, uint256 amount_) external {
-        _mint(account_, amount_);
+        uint256 gons = gonsForBalance(amount_);
+        _totalGons += gons;
+        _gonBalances[account_] += gons;
+        emit Transfer(address(0), account_, amount_);
+    }
+
+    function transfer(address to_, uint256 amount_) external override returns (bool) {
+        _transfer(msg.sender, to_, amount_);
+        return true;
+    }
+
+    function approve(address spender_, uint256 amount_) external override returns (bool) {
+        allowance[msg.sender][spender_] = amount_;
+        emit Approval(msg.sender, spender_, amount_);
+        return true;
+    }
+
+    function transferFrom(address from_, address to_, uint256 amount_) external override returns (bool) {
+        _transfer(from_, to_, amount_);
+        uint256 allowed = allowance[from_][msg.sender];
+        require(allowed >= amount_, "ERC20: transfer amount exceeds allowance");
+        allowance[from_][msg.sender] = allowed - amount_;
+        return true;
+    }
+
+    function _transfer(address from_, address to_, uint256 amount_) internal {
+        uint256 fromGons = _gonBalances[from_];
+        uint256 gons = gonsForBalance(amount_);
+        if (gons > fromGons && balanceForGons(fromGons) >= amount_) {
+            // The whole balance, which rounds up to the amount.
+            gons = fromGons;
+        }
+        require(gons <= fromGons, "ERC20: transfer amount exceeds balance");
+        _gonBalances[from_] = fromGons - gons;
+        _gonBalances[to_] += gons;
+        emit Transfer(from_, to_, amount_);
     }
 }
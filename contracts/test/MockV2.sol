@@ -2,9 +2,21 @@
 pragma solidity ^0.8.0;
 
 contract MockV2 {
+    // Staking index carried over for each migrated token
+    mapping(address => mapping(uint256 => uint256)) public migratedIndexes;
+    uint256 public migratedCount;
+
     constructor() {}
 
     function upgradeTo(address, address, uint256[] memory) external pure returns (bool) {
         return true;
     }
+
+    function migrateFrom(address _collection, uint256[] memory _states) external returns (bool) {
+        for (uint256 i = 0; i < _states.length; ++i) {
+            migratedIndexes[_collection][_states[i] >> 128] = uint128(_states[i]);
+        }
+        migratedCount += _states.length;
+        return true;
+    }
 }
@@ -13,6 +13,18 @@ pragma solidity ^0.8.0;
  * The best fit tokens are those that can be staked to earn rewards. The reward part can then be withdrawn by the NFT owner.
  */
 interface IAthanasia {
+    /**
+     * @dev Claim authorised off-chain by the NFT `owner`, see `claimFor`. `signature` is the owner's EIP-712
+     * signature of `Claim(address owner,address collection,uint256[] tokenIds,uint256 nonce,uint256 deadline)`.
+     */
+    struct SignedClaim {
+        address owner;
+        address collection;
+        uint256[] tokenIds;
+        uint256 deadline;
+        bytes signature;
+    }
+
     /**
      * @dev Emitted when initial balance is deposited for an NFT.
      */
@@ -23,6 +35,67 @@ interface IAthanasia {
      */
     event Claim(address indexed owner, address indexed collection, uint256 indexed tokenId, uint256 withdrawAmount);
 
+    /**
+     * @dev Emitted when the NFT owner upgrades the NFT to the next contract version.
+     */
+    event Upgrade(address indexed owner, address indexed collection, uint256 indexed tokenId);
+
+    /**
+     * @dev Emitted when the initial balance is deposited for an entire collection at registration.
+     */
+    event CollectionDeposit(address indexed depositor, address indexed collection, uint256 collectionSize, uint256 depositAmount);
+
+    /**
+     * @dev Emitted when NFTs of a collection registered with `registerCollectionAndDepositWithRoot` are proven
+     * eligible. `stakingIndex` is the checkpoint recorded for them, i.e. the staking index of the collection deposit.
+     */
+    event EligibilityProven(address indexed collection, uint256[] tokenIds, uint256 stakingIndex);
+
+    /**
+     * @dev Emitted when `amountPurchased` pending underlying tokens of a collection are bought for `cost` OTC tokens
+     * (or FTM). `stakingIndex` is the checkpoint of the pending deposits once all of them are bought, zero before.
+     */
+    event OtcSettled(address indexed collection, uint256 amountPurchased, uint256 cost, uint256 stakingIndex);
+
+    /**
+     * @dev Emitted when the pending OTC purchase of a collection, whose deposits are checkpointed at `epoch`, is
+     * cancelled. `refundable` OTC tokens (or FTM) and `underlyingRefundable` underlying tokens already bought are
+     * left for the payers to withdraw.
+     */
+    event OtcCancelled(address indexed collection, uint256 epoch, uint256 refundable, uint256 underlyingRefundable);
+
+    /**
+     * @dev Emitted when `payer` withdraws its share of a cancelled OTC purchase of a collection.
+     */
+    event OtcRefunded(address indexed collection, address indexed payer, uint256 refunded, uint256 underlyingRefunded);
+
+    /**
+     * @dev Emitted when the rounding surplus of the settled OTC purchases of a collection is sent to `to`.
+     */
+    event OtcSurplusSwept(address indexed collection, address to, uint256 amount);
+
+    /**
+     * @dev Compact alternative to one `Deposit` event per NFT, emitted once per deposit batch.
+     * `depositAmount` is the amount deposited for each NFT, `stakingIndex` is the checkpoint recorded for all of them.
+     */
+    event DepositBatch(address indexed depositor, address indexed collection, uint256[] tokenIds, uint256 depositAmount, uint256 stakingIndex);
+
+    /**
+     * @dev Compact alternative to one `Claim` event per NFT, emitted once per claimed collection.
+     * `withdrawAmount` is the total for all `tokenIds`, `stakingIndex` is the checkpoint recorded for them.
+     */
+    event ClaimBatch(address indexed owner, address indexed collection, uint256[] tokenIds, uint256 withdrawAmount, uint256 stakingIndex);
+
+    /**
+     * @dev Compact alternative to one `Upgrade` event per NFT, emitted once per upgrade batch.
+     */
+    event UpgradeBatch(address indexed owner, address indexed collection, uint256[] tokenIds);
+
+    /**
+     * @dev Emitted for each chunk of a collection migrated to the next contract version.
+     */
+    event CollectionMigrated(address indexed collection, uint256 startTokenId, uint256 endTokenId, uint256 migratedCount);
+
     /**
      * @dev Initialize this contract with the OTC address of the contract the sells OTC underlying token.
      *
@@ -77,6 +150,32 @@ interface IAthanasia {
      */
     function registerCollectionAndDepositWithOtc(address collection, uint256 depositAmount, uint256 collectionSize, address otcToken, uint256 otcPrice) external payable;
 
+    /**
+     * @dev Same as `registerCollectionAndDeposit`, for collections whose eligible token ids are not `1..collectionSize`.
+     *
+     * The eligible ids are the leaves of a Merkle tree with root `eligibilityRoot`, each leaf being
+     * `keccak256(abi.encodePacked(tokenId))` and pairs hashed in sorted order. Registration stores only the root,
+     * and each NFT starts earning from the registration once proven eligible with `proveEligibility` or
+     * `claimWithProofs`. Until then its claimable balance is reported as zero, and it can not be upgraded or migrated.
+     *
+     * Requirements:
+     *  - same as `registerCollectionAndDeposit`.
+     *  - `tokenCount` is the number of leaves of the tree, and no more NFTs may be proven eligible.
+     *  - caller must have depositAmount * tokenCount of underlying tokens on balance
+     */
+    function registerCollectionAndDepositWithRoot(address collection, uint256 depositAmount, uint256 tokenCount, bytes32 eligibilityRoot) external;
+
+    /**
+     * @dev Records the deposit of the collection registration for each of the `tokenIds`, given `proofs[i]`, the
+     * Merkle proof of `tokenIds[i]`. Tokens already proven or deposited are skipped, and their proof may be empty.
+     * May be called by anyone.
+     *
+     * Requirements:
+     *  - `collection` must be registered with `registerCollectionAndDepositWithRoot`.
+     *  - each proof of a token not yet proven must be valid.
+     */
+    function proveEligibility(address collection, uint256[] memory tokenIds, bytes32[][] memory proofs) external;
+
     /**
      * @dev Returns the number of tokens the owner of the `tokenId` from collection `collection` may withdraw.
      *
@@ -86,6 +185,40 @@ interface IAthanasia {
      */
     function claimableBalance(address collection, uint256 tokenId) external view returns (uint256 withdrawable);
 
+    /**
+     * @dev Batch version of `claimableBalance`. For each of the `tokenIds` returns the number of tokens its owner may
+     * withdraw, the staking index the reward accrues from (zero if nothing was deposited) and whether the token was
+     * upgraded, along with the total withdrawable amount.
+     */
+    function claimableBalances(address collection, uint256[] memory tokenIds) external view
+        returns (uint256[] memory withdrawable, uint256[] memory stakingIndexes, bool[] memory upgraded, uint256 total);
+
+    /**
+     * @dev Same as `claimableBalances`, for all token ids from `startTokenId` (inclusive) to `endTokenId` (exclusive).
+     */
+    function claimableBalancesInRange(address collection, uint256 startTokenId, uint256 endTokenId) external view
+        returns (uint256[] memory withdrawable, uint256[] memory stakingIndexes, bool[] memory upgraded, uint256 total);
+
+    /**
+     * @dev Multi-collection version of `claimableBalances`: `tokenIds[i]` are the tokens of `collections[i]`.
+     * Returns the per-token withdrawable amounts and the total of each collection, along with the grand total.
+     */
+    function claimableBalancesMany(address[] memory collections, uint256[][] memory tokenIds) external view
+        returns (uint256[][] memory withdrawable, uint256[] memory totals, uint256 total);
+
+    /**
+     * @dev Returns running totals of `collection`, or of all collections if `collection` is the zero address:
+     *  - `principal` - the underlying tokens deposited for the NFTs not upgraded.
+     *  - `hecClaimed` - the rewards withdrawn by claims.
+     *  - `tokensUpgraded` - the number of NFTs upgraded or migrated to the next contract version.
+     *  - `weightedPrincipal` - the sum of the deposit of each NFT not upgraded divided by the staking index of its
+     *    deposit or last withdrawal, scaled by 10**18.
+     *  - `outstandingRewards` - the rewards not claimed yet at the current staking index. Per-token amounts are
+     *    rounded down when claimed, so this may exceed their sum by up to one unit per NFT.
+     */
+    function collectionStats(address collection) external view
+        returns (uint256 principal, uint256 hecClaimed, uint256 tokensUpgraded, uint256 weightedPrincipal, uint256 outstandingRewards);
+
     /**
      * @dev Withdraws all the claimable tokens to the sender's wallet.
      *
@@ -96,6 +229,56 @@ interface IAthanasia {
      */
     function claim(address collection, uint256[] memory tokenIds) external;
 
+    /**
+     * @dev Same as `claim`, but withdraws the claimable amount as staked tokens (sHEC) instead of unstaking it.
+     */
+    function claimStaked(address collection, uint256[] memory tokenIds) external;
+
+    /**
+     * @dev Withdraws all the claimable tokens of several collections to the sender's wallet in a single transfer.
+     * `tokenIds[i]` are the tokens of `collections[i]`.
+     *
+     * Requirements:
+     *  - same as `claim`, for each of the collections.
+     */
+    function claimMany(address[] memory collections, uint256[][] memory tokenIds) external;
+
+    /**
+     * @dev Same as `claim`, proving the eligibility of the `tokenIds` not yet proven first, see `proveEligibility`.
+     */
+    function claimWithProofs(address collection, uint256[] memory tokenIds, bytes32[][] memory proofs) external;
+
+    /**
+     * @dev Withdraws all the claimable tokens of the NFTs the sender owns in `collection`, without passing the token ids.
+     *
+     * Owned tokens are discovered on-chain with `tokenOfOwnerByIndex`, in pages of at most `limit` tokens
+     * starting at owner index `offset`. Upgraded tokens are skipped.
+     *
+     * Requirements:
+     *  - `collection` must be registered with Athanasia.
+     *  - `collection` must implement ERC721Enumerable.
+     */
+    function claimAllOwned(address collection, uint256 offset, uint256 limit) external;
+
+    /**
+     * @dev Returns the page of tokens `claimAllOwned` would claim for `owner`, and the total amount it would withdraw.
+     *
+     * Requirements:
+     *  - `collection` must implement ERC721Enumerable.
+     */
+    function claimableBalanceOfOwner(address collection, address owner, uint256 offset, uint256 limit) external view returns (uint256[] memory tokenIds, uint256 withdrawable);
+
+    /**
+     * @dev Performs the `claim` of each of the `claims` on behalf of its signing owner. Each owner receives their
+     * own tokens, while the caller (typically a relayer) pays for a single transaction.
+     *
+     * Requirements:
+     *  - same as `claim`, for each claim's owner.
+     *  - each signature must be made by the claim's owner over their current nonce, which it consumes.
+     *  - `deadline` of each claim must not have passed.
+     */
+    function claimFor(SignedClaim[] memory claims) external;
+
     /**
      * @dev Deposit the inital value for multiple NFTs and perform an OTC purchase of the underlying token.
      *
@@ -107,6 +290,63 @@ interface IAthanasia {
      */
     function depositWithOtc(address collection, uint256[] memory tokenIds) external payable;
 
+    /**
+     * @dev Switches `depositWithOtc` of `collection` between an OTC purchase per call, and collecting the payment
+     * into a pending purchase settled later by `settleOtc`. Deferred payments are rounded up to the next unit of
+     * the OTC token per call, and the surplus is kept for `sweepOtcSurplus` once the purchase is settled.
+     *
+     * Pending deposits start earning once all of them are purchased, from the staking index of that settlement.
+     * Until then their NFTs have nothing to claim, and can not be upgraded or migrated.
+     *
+     * Requirements:
+     *  - caller must be the collection itself, or the owner of the collection (collection must inherit Ownable contract).
+     *  - `collection` must be registered with `registerCollectionWithOtc`, and not deposited on register.
+     */
+    function setDeferredOtc(address collection, bool deferred) external;
+
+    /**
+     * @dev Performs a single OTC purchase of the underlying tokens of all pending deposits of `collection`.
+     * May be called by anyone.
+     *
+     * Requirements:
+     *  - `collection` must have deposits pending purchase.
+     */
+    function settleOtc(address collection) external;
+
+    /**
+     * @dev Same as `settleOtc`, purchasing at most `maxAmount` of the pending underlying tokens. The pending deposits
+     * start earning with the settlement that purchases the last of them.
+     */
+    function settleOtc(address collection, uint256 maxAmount) external;
+
+    /**
+     * @dev Cancels the pending OTC purchase of `collection`, e.g. when the OTC contract rejects it. The pending
+     * deposits are dropped, so their NFTs may be deposited again, and each payer may `withdrawOtcRefund` its share
+     * of the OTC tokens (or FTM) collected and of the underlying tokens already bought.
+     *
+     * Requirements:
+     *  - can only be called by the owner.
+     *  - `collection` must have deposits pending purchase.
+     */
+    function cancelOtc(address collection) external;
+
+    /**
+     * @dev Sends the caller its share of the OTC purchase cancelled for the deposits checkpointed at `epoch`, in
+     * proportion to its payments into it.
+     *
+     * Requirements:
+     *  - the purchase must have been cancelled, and the caller must have paid into it and not withdrawn yet.
+     */
+    function withdrawOtcRefund(uint256 epoch) external;
+
+    /**
+     * @dev Sends the rounding surplus of the settled deferred OTC purchases of `collection` to `to`.
+     *
+     * Requirements:
+     *  - can only be called by the owner.
+     */
+    function sweepOtcSurplus(address collection, address payable to) external;
+
     /**
      * @dev Deposit the initial value for multiple NFTs by depositing the underlying token directly.
      *
@@ -150,4 +390,44 @@ interface IAthanasia {
      *  Athanasia contract for the tokens passed.
      */
     function upgradeTo(address tokenOwner, address collection, uint256[] memory tokenIds) external returns (bool);
+
+    /**
+     * @dev Migrates all deposited NFTs of `collection` from `startTokenId` to `endTokenId` (exclusive) to the next
+     * contract version at once, on behalf of their holders. A whole collection is migrated in a few such chunks.
+     *
+     * Requirements:
+     *  - callable only by the contract owner, the collection itself, or the owner of the collection.
+     *  - upgrade contract must have been set.
+     *  - migration must have been enabled for `collection` with `setMigrationEnabled`.
+     *
+     * Consequences:
+     *  - the deposits and unclaimed rewards of the migrated tokens are transferred to the new smart contract, and
+     *    their state is passed to its `migrateFrom`. Tokens already upgraded are skipped.
+     *  - from the first chunk on, no more deposits are accepted for the collection.
+     *  - migration is not reversible.
+     */
+    function migrateCollection(address collection, uint256 startTokenId, uint256 endTokenId) external;
+
+    /**
+     * @dev Allows or forbids `migrateCollection` of `collection`, which moves the deposits of all its holders.
+     * Migration is forbidden until enabled.
+     *
+     * Requirements:
+     *  - caller must be the collection itself, or the owner of the collection (collection must inherit Ownable contract).
+     *  - `collection` must be registered.
+     *  - migration of `collection` must not have started.
+     */
+    function setMigrationEnabled(address collection, bool enabled) external;
+
+    /**
+     * @dev Onboard a chunk of a collection migrated from the previous contract version.
+     *
+     * Requirements:
+     *  - callable only by previous contract version.
+     *  - needs to be implemented only by the V2+ contracts.
+     *
+     * Each of `states` packs a token id and the staking index its unclaimed reward accrues from, as
+     * `tokenId << 128 | stakingIndex`.
+     */
+    function migrateFrom(address collection, uint256[] memory states) external returns (bool);
 }
@@ -0,0 +1,11 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.0;
+
+/**
+ * @dev Part of the Hector Finance staking contract used by Athanasia.
+ */
+interface IHectorStaking {
+    function unstake(uint256 _amount, bool _trigger) external;
+
+    function index() external view returns (uint256);
+}
@@ -0,0 +1,221 @@
+import csv
+import json
+import os
+
+from brownie import AthanasiaHector, interface, network, web3
+from brownie.exceptions import VirtualMachineError
+from web3.exceptions import TimeExhausted
+
+from scripts.utilities import get_deployer_account
+
+ONE_HECTOR = 10 ** 9
+OPERATIONS = ["claim", "deposit", "depositWithOtc", "upgrade"]
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+# Gas budget of a single transaction, kept well under the block gas limit.
+DEFAULT_MAX_GAS = 8_000_000
+# Number of transactions sent ahead of the oldest unconfirmed one.
+DEFAULT_PIPELINE = 8
+# Size of the chunk whose estimate, together with that of a single token, extrapolates the cost per token.
+PROBE_SIZE = 16
+# Margin added to the estimate of each chunk for its gas limit.
+GAS_BUFFER = 1.1
+# Seconds to wait for a transaction left pending by a previous run.
+RESUME_TIMEOUT = 120
+
+
+def load_token_ids(path):
+    """
+    Reads token ids from the first column of a CSV file, skipping a header row.
+    """
+    with open(path, newline="") as f:
+        return [int(row[0]) for row in csv.reader(f) if row and row[0].strip().isdigit()]
+
+
+def otc_amount(info, token_count):
+    """
+    FTM or TOR paid by `depositWithOtc` for `token_count` tokens of a collection, given its `collections()` record.
+    """
+    deposit_amount, _, otc_price = info[0], info[1], info[2]
+    if len(info) > 7 and info[7]:
+        # Payments collected for a deferred purchase are rounded up.
+        return -(-token_count * otc_price * deposit_amount // ONE_HECTOR)
+    return token_count * otc_price * deposit_amount // ONE_HECTOR
+
+
+class BatchSender:
+    """
+    Sends `operation` (one of `OPERATIONS`) for a list of tokens of `collection` in chunks whose estimated gas stays
+    under `max_gas`. Up to `pipeline` transactions are in flight at once, with nonces assigned locally.
+
+    Progress is saved to `state_path` after every confirmed chunk, along with the transactions still pending.
+    A sender created with the same state file skips the tokens already processed, and waits for the
+    transactions left pending before sending their tokens again.
+    """
+
+    def __init__(self, athanasia, operation, collection, account, max_gas=DEFAULT_MAX_GAS, pipeline=DEFAULT_PIPELINE,
+                 state_path=None):
+        if operation not in OPERATIONS:
+            raise ValueError(f"Unknown operation {operation}, expected one of {', '.join(OPERATIONS)}")
+        self.athanasia = athanasia
+        self.operation = operation
+        self.fn = getattr(athanasia, operation)
+        self.collection = str(collection)
+        self.account = account
+        self.max_gas = max_gas
+        self.pipeline = pipeline
+        self.state_path = state_path
+        self.info = athanasia.collections(self.collection)
+        self.done = set()
+        self.pending = []
+        self.txs = []
+        self._load_state()
+
+    def _load_state(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        with open(self.state_path) as f:
+            state = json.load(f)
+        if state["operation"] != self.operation or state["collection"] != self.collection:
+            raise ValueError(f"{self.state_path} belongs to {state['operation']} of {state['collection']}")
+        self.done = set(state["done"])
+        for pending in state["pending"]:
+            try:
+                receipt = web3.eth.wait_for_transaction_receipt(pending["tx"], timeout=RESUME_TIMEOUT)
+            except TimeExhausted:
+                continue
+            if receipt.status == 1:
+                self.done.update(pending["tokenIds"])
+        self._save_state()
+
+    def _save_state(self):
+        if not self.state_path:
+            return
+        with open(self.state_path, "w") as f:
+            json.dump({
+                "operation": self.operation,
+                "collection": self.collection,
+                "done": sorted(self.done),
+                "pending": [{"tx": tx.txid, "tokenIds": token_ids} for tx, token_ids in self.pending],
+            }, f, indent=2)
+
+    def _params(self, token_ids, **params):
+        params["from"] = self.account
+        if self.operation == "depositWithOtc" and self.info[1] == ZERO_ADDRESS:
+            params["amount"] = otc_amount(self.info, len(token_ids))
+        return params
+
+    def estimate(self, token_ids):
+        """
+        Returns the estimated gas of the operation for `token_ids`, or None if it would fail.
+        """
+        try:
+            return self.fn.estimate_gas(self.collection, token_ids, self._params(token_ids))
+        except (ValueError, VirtualMachineError):
+            return None
+
+    def chunk_size(self, token_ids):
+        """
+        Returns the number of leading `token_ids` to send in one transaction. The size is extrapolated from the
+        estimates of one and `PROBE_SIZE` tokens, and reduced until its own estimate is under `max_gas`.
+        """
+        single = self.estimate(token_ids[:1])
+        if single is None or single > self.max_gas:
+            raise ValueError(f"{self.operation} of token {token_ids[0]} can not be sent")
+        probe = min(len(token_ids), PROBE_SIZE)
+        size = probe
+        if probe > 1:
+            probe_gas = self.estimate(token_ids[:probe])
+            if probe_gas is not None and probe_gas > single:
+                per_token = (probe_gas - single) / (probe - 1)
+                size = min(len(token_ids), int((self.max_gas - single) // per_token) + 1)
+        while size > 1:
+            gas = self.estimate(token_ids[:size])
+            if gas is not None and gas <= self.max_gas:
+                break
+            size = size * 9 // 10
+        return size
+
+    def approve(self, token_count):
+        """
+        Approves the sHEC (`deposit`) or OTC token (`depositWithOtc`) paid for `token_count` tokens, if needed.
+        """
+        if self.operation == "deposit":
+            token = interface.IERC20(self.athanasia.shecToken())
+            amount = token_count * self.info[0]
+        elif self.operation == "depositWithOtc" and self.info[1] != ZERO_ADDRESS:
+            token = interface.IERC20(self.info[1])
+            amount = otc_amount(self.info, token_count)
+        else:
+            return
+        if token.allowance(self.account, self.athanasia) < amount:
+            token.approve(self.athanasia, amount, {"from": self.account})
+
+    def send(self, token_ids):
+        """
+        Sends the operation for the `token_ids` not processed yet, and returns the transactions sent.
+        Raises if a transaction fails, after the transactions in flight are confirmed and saved.
+        """
+        remaining = [token_id for token_id in token_ids if token_id not in self.done]
+        if not remaining:
+            return self.txs
+        self.approve(len(remaining))
+
+        size = self.chunk_size(remaining)
+        chunks = [remaining[i:i + size] for i in range(0, len(remaining), size)]
+        nonce = web3.eth.get_transaction_count(self.account.address, "pending")
+        failed = None
+        while chunks and failed is None:
+            chunk = chunks.pop(0)
+            gas = self.estimate(chunk)
+            if gas is None or gas > self.max_gas:
+                if len(chunk) == 1:
+                    failed = f"{self.operation} of token {chunk[0]} can not be sent"
+                    break
+                # Tokens spread over more storage words than the probe cost more, split the chunk.
+                middle = len(chunk) // 2
+                chunks[:0] = [chunk[:middle], chunk[middle:]]
+                continue
+
+            tx = self.fn(self.collection, chunk, self._params(
+                chunk, nonce=nonce, gas_limit=int(gas * GAS_BUFFER), required_confs=0))
+            nonce += 1
+            self.txs.append(tx)
+            self.pending.append((tx, chunk))
+            self._save_state()
+            if len(self.pending) >= self.pipeline:
+                failed = self._confirm_oldest()
+
+        while self.pending:
+            failed = self._confirm_oldest() or failed
+        if failed:
+            raise RuntimeError(failed)
+        return self.txs
+
+    def _confirm_oldest(self):
+        tx, chunk = self.pending.pop(0)
+        try:
+            tx.wait(1)
+        except VirtualMachineError:
+            pass
+        if tx.status == 1:
+            self.done.update(chunk)
+        self._save_state()
+        if tx.status != 1:
+            return f"{self.operation} of tokens {chunk[0]} to {chunk[-1]} failed in {tx.txid}"
+
+
+def main():
+    print(f"Running on {network.show_active()}")
+    tokens_file = os.environ.get("BATCH_TOKENS_FILE", "tokens.csv")
+    sender = BatchSender(
+        AthanasiaHector[-1],
+        os.environ.get("BATCH_OPERATION", "claim"),
+        os.environ["BATCH_COLLECTION"],
+        get_deployer_account(),
+        max_gas=int(os.environ.get("BATCH_MAX_GAS", DEFAULT_MAX_GAS)),
+        pipeline=int(os.environ.get("BATCH_PIPELINE", DEFAULT_PIPELINE)),
+        state_path=os.environ.get("BATCH_STATE_FILE", f"{tokens_file}.state.json"),
+    )
+    token_ids = load_token_ids(tokens_file)
+    txs = sender.send(token_ids)
+    print(f"Sent {sender.operation} of {len(token_ids)} tokens in {len(txs)} transactions")
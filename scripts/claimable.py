@@ -0,0 +1,74 @@
+import numpy as np
+
+from scripts.multicall import MulticallClient
+
+INT64_MAX = np.iinfo(np.int64).max
+
+
+def _as_array(values, bound=None):
+    """
+    Returns `values` as an int64 array, or as an array of Python ints when they (or `bound`, the largest
+    intermediate value computed from them) do not fit in int64.
+    """
+    values = [int(v) for v in np.atleast_1d(values)]
+    largest = max(values + [bound or 0])
+    if largest > INT64_MAX:
+        return np.array(values, dtype=object)
+    return np.array(values, dtype=np.int64)
+
+
+def claimable_balances(info, token_ids, checkpoints, upgraded, current_indexes):
+    """
+    Off-chain replica of `_claimableBalance` over arrays of tokens.
+
+    `info` is the collection record as returned by `collections()`, `checkpoints` the staking index of each token at
+    its last withdrawal as returned by `stakingIndexes()` (zero if none) and `upgraded` its upgrade flag.
+    Returns the claimable amount of each token at `current_indexes`: a 1-D array for a single staking index, or
+    one row per index when several are given.
+    """
+    deposit_amount = int(info[0])
+    staking_index_on_deposit = int(info[3])
+    deposits_done = int(info[4])
+    eligible_by_proof = len(info) > 6 and bool(info[6])
+
+    single_index = np.ndim(current_indexes) == 0
+    current_indexes = [int(i) for i in np.atleast_1d(current_indexes)]
+    checkpoints = [int(i) for i in np.atleast_1d(checkpoints)]
+    # (currentIndex - indexAtLastWithdrawal) * depositAmount is the largest intermediate value
+    largest_index = max(current_indexes + checkpoints + [staking_index_on_deposit])
+    bound = largest_index * max(deposit_amount, 1)
+    current = _as_array(current_indexes, bound)[:, None]
+    checkpoints = _as_array(checkpoints, bound)
+    token_ids = _as_array(token_ids)
+    upgraded = np.asarray(upgraded, dtype=bool)
+
+    if deposit_amount == 0:
+        # Collection not registered
+        amounts = np.zeros((current.shape[0], token_ids.shape[0]), dtype=current.dtype)
+        return amounts[0] if single_index else amounts
+
+    if staking_index_on_deposit == 0 or eligible_by_proof:
+        # Deposits are made or proven per token, recording its staking index
+        eligible = checkpoints != 0
+        index = checkpoints
+    else:
+        # Registrator only deposited for first `depositsDone` NFTs
+        eligible = (token_ids != 0) & (token_ids <= deposits_done)
+        index = np.where(checkpoints == 0, staking_index_on_deposit, checkpoints).astype(current.dtype)
+    eligible &= ~upgraded
+
+    accrues = eligible & (index < current)
+    divisor = np.where(index == 0, 1, index).astype(current.dtype)
+    amounts = np.where(accrues, (current - index) * deposit_amount // divisor, 0).astype(current.dtype)
+    return amounts[0] if single_index else amounts
+
+
+def load_token_state(athanasia, collection, token_ids, client=None):
+    """
+    Reads the inputs of `claimable_balances` for `token_ids` of `collection` with a Multicall client.
+    """
+    client = client or MulticallClient()
+    info = client.collections(athanasia, [collection])[collection]
+    checkpoints = client.staking_indexes(athanasia, collection, token_ids)
+    upgraded = client.upgrade_statuses(athanasia, collection, token_ids)
+    return info, [checkpoints[t] for t in token_ids], [upgraded[t] for t in token_ids]
@@ -1,4 +1,4 @@
-from brownie import AthanasiaHector
+from brownie import AthanasiaHector, AthanasiaHectorClone, AthanasiaHectorFactory
 from brownie import network, config
 from scripts.utilities import get_deployer_account, get_hector_contracts
 
@@ -17,6 +17,35 @@ def deploy_athanasia():
     return contract
 
 
+def get_athanasia_factory():
+    if len(AthanasiaHectorFactory) == 0:
+        deployer = get_deployer_account()
+        implementation = AthanasiaHectorClone.deploy(
+            {"from": deployer},
+            publish_source=config["networks"][network.show_active()]["verify_code"],
+        )
+        AthanasiaHectorFactory.deploy(
+            implementation.address,
+            {"from": deployer},
+            publish_source=config["networks"][network.show_active()]["verify_code"],
+        )
+    return AthanasiaHectorFactory[-1]
+
+
+def deploy_athanasia_clone():
+    (hec, shec, hecStaking) = get_hector_contracts()
+    deployer = get_deployer_account()
+    tx = get_athanasia_factory().deployClone(
+        hec.address,
+        shec.address,
+        hecStaking.address,
+        {"from": deployer},
+    )
+    contract = AthanasiaHectorClone.at(tx.events["CloneDeployed"]["clone"])
+    print(f"Clone deployed to {contract.address}")
+    return contract
+
+
 def main():
     print(f"Running on {network.show_active()}")
     deploy_athanasia()
@@ -0,0 +1,73 @@
+import json
+import os
+
+from brownie import web3
+
+from scripts.batch_sender import load_token_ids
+
+
+def eligibility_leaf(token_id):
+    """
+    Leaf of `token_id` in an eligibility tree, `keccak256(abi.encodePacked(tokenId))`.
+    """
+    return bytes(web3.solidityKeccak(["uint256"], [token_id]))
+
+
+def _hash_pair(a, b):
+    return bytes(web3.keccak(min(a, b) + max(a, b)))
+
+
+class EligibilityTree:
+    """
+    Merkle tree of the token ids eligible for the deposit of `registerCollectionAndDepositWithRoot`, hashing pairs
+    in sorted order as OpenZeppelin's `MerkleProof` does. A node without a sibling is carried up to the next level.
+    """
+
+    def __init__(self, token_ids):
+        if not token_ids:
+            raise ValueError("An eligibility tree needs at least one token id")
+        self.token_ids = sorted(set(token_ids))
+        self._positions = {token_id: i for i, token_id in enumerate(self.token_ids)}
+        self.levels = [[eligibility_leaf(token_id) for token_id in self.token_ids]]
+        while len(self.levels[-1]) > 1:
+            level = self.levels[-1]
+            self.levels.append([
+                _hash_pair(level[i], level[i + 1]) if i + 1 < len(level) else level[i]
+                for i in range(0, len(level), 2)
+            ])
+
+    @property
+    def root(self):
+        return self.levels[-1][0]
+
+    def proof(self, token_id):
+        """
+        Returns the sibling hashes from the leaf of `token_id` up to the root.
+        """
+        position = self._positions[token_id]
+        proof = []
+        for level in self.levels[:-1]:
+            sibling = position ^ 1
+            if sibling < len(level):
+                proof.append(level[sibling])
+            position //= 2
+        return proof
+
+    def proofs(self, token_ids):
+        """
+        Returns the proofs of `token_ids`, in the layout of the `proofs` argument of `claimWithProofs`.
+        """
+        return [self.proof(token_id) for token_id in token_ids]
+
+
+def main():
+    tokens_file = os.environ.get("ELIGIBILITY_TOKENS_FILE", "tokens.csv")
+    tree = EligibilityTree(load_token_ids(tokens_file))
+    proofs_file = os.environ.get("ELIGIBILITY_PROOFS_FILE", f"{tokens_file}.proofs.json")
+    with open(proofs_file, "w") as f:
+        json.dump({
+            "root": "0x" + tree.root.hex(),
+            "tokenCount": len(tree.token_ids),
+            "proofs": {str(t): ["0x" + node.hex() for node in tree.proof(t)] for t in tree.token_ids},
+        }, f, indent=2)
+    print(f"Eligibility root of {len(tree.token_ids)} tokens: 0x{tree.root.hex()}, proofs written to {proofs_file}")
@@ -0,0 +1,341 @@
+import os
+import sqlite3
+
+from brownie import AthanasiaHector, interface, network, web3
+from eth_utils import event_abi_to_log_topic
+from web3._utils.events import get_event_data
+from web3.exceptions import BlockNotFound
+
+from scripts.claimable import claimable_balances
+
+# Number of blocks read per eth_getLogs call.
+DEFAULT_CHUNK_SIZE = 2000
+# Number of blocks re-read when the last indexed block is no longer on the chain.
+DEFAULT_REORG_DEPTH = 64
+
+# Checkpoint of deposits waiting for their deferred OTC purchase.
+PENDING_OTC_INDEX = 2 ** 256 - 1
+
+ERC721_TRANSFER_TOPIC = web3.keccak(text="Transfer(address,address,uint256)").hex()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS blocks (number INTEGER PRIMARY KEY, hash TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS staking_indexes (
+    epoch INTEGER PRIMARY KEY, staking_index TEXT NOT NULL, block_number INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS collections (
+    collection TEXT NOT NULL, deposit_amount TEXT NOT NULL, staking_index_on_deposit TEXT NOT NULL,
+    deposits_done INTEGER NOT NULL, eligible_by_proof INTEGER NOT NULL, block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    collection TEXT NOT NULL, token_id TEXT NOT NULL, staking_index TEXT NOT NULL,
+    block_number INTEGER NOT NULL, log_index INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS claims (
+    collection TEXT NOT NULL, token_id TEXT NOT NULL, owner TEXT NOT NULL, amount TEXT NOT NULL,
+    block_number INTEGER NOT NULL, log_index INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS upgrades (
+    collection TEXT NOT NULL, token_id TEXT NOT NULL, block_number INTEGER NOT NULL, log_index INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS owners (
+    collection TEXT NOT NULL, token_id TEXT NOT NULL, owner TEXT NOT NULL,
+    block_number INTEGER NOT NULL, log_index INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS collections_key ON collections (collection);
+CREATE INDEX IF NOT EXISTS checkpoints_key ON checkpoints (collection, token_id);
+CREATE INDEX IF NOT EXISTS claims_key ON claims (collection, token_id);
+CREATE INDEX IF NOT EXISTS upgrades_key ON upgrades (collection, token_id);
+CREATE UNIQUE INDEX IF NOT EXISTS owners_key ON owners (collection, token_id, block_number, log_index);
+CREATE INDEX IF NOT EXISTS owners_owner ON owners (owner);
+"""
+
+# Tables rolled back when blocks are re-read after a reorg.
+EVENT_TABLES = ["blocks", "staking_indexes", "collections", "checkpoints", "claims", "upgrades", "owners"]
+
+
+class AthanasiaIndexer:
+    """
+    Incremental index of the per-token state of an AthanasiaHector deployment, persisted to SQLite.
+
+    Logs are read in chunks of `chunk_size` blocks, and the last indexed block is saved after each chunk, so a
+    restarted indexer resumes where it stopped. If the last indexed block is no longer part of the chain, the last
+    `reorg_depth` blocks are dropped from the index and read again.
+
+    Token ids, amounts and staking indexes are uint256 and stored as text.
+    """
+
+    def __init__(self, db_path, athanasia, start_block=0, chunk_size=DEFAULT_CHUNK_SIZE,
+                 reorg_depth=DEFAULT_REORG_DEPTH, collections_start_block=0):
+        self.db = sqlite3.connect(db_path)
+        self.db.executescript(SCHEMA)
+        self.athanasia = athanasia
+        self.start_block = start_block
+        self.chunk_size = chunk_size
+        self.reorg_depth = reorg_depth
+        # First block to read NFT transfers from, for collections that predate the indexed contract.
+        self.collections_start_block = collections_start_block
+        self._events = {
+            web3.toHex(event_abi_to_log_topic(abi)): abi for abi in athanasia.abi if abi["type"] == "event"
+        }
+
+    def last_block(self):
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'last_block'").fetchone()
+        return int(row[0]) if row else self.start_block - 1
+
+    def run(self, to_block=None):
+        """
+        Indexes all blocks up to `to_block` (the current head by default), and returns the last indexed block.
+        """
+        to_block = web3.eth.block_number if to_block is None else to_block
+        self._check_reorg()
+        while self.last_block() < to_block:
+            from_block = self.last_block() + 1
+            self._index_chunk(from_block, min(from_block + self.chunk_size - 1, to_block))
+        return self.last_block()
+
+    def _check_reorg(self):
+        last_block = self.last_block()
+        if last_block < self.start_block:
+            return
+        row = self.db.execute("SELECT hash FROM blocks WHERE number = ?", (last_block,)).fetchone()
+        try:
+            chain_hash = web3.eth.get_block(last_block)["hash"].hex()
+        except BlockNotFound:
+            chain_hash = None
+        if row and row[0] == chain_hash:
+            return
+
+        rewind_to = max(self.start_block, last_block - self.reorg_depth + 1)
+        with self.db:
+            for table in EVENT_TABLES:
+                column = "number" if table == "blocks" else "block_number"
+                self.db.execute(f"DELETE FROM {table} WHERE {column} >= ?", (rewind_to,))
+            self._set_last_block(rewind_to - 1)
+
+    def _set_last_block(self, block_number):
+        self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('last_block', ?)", (str(block_number),))
+
+    def _index_chunk(self, from_block, to_block):
+        known_collections = self._collections()
+        logs = web3.eth.get_logs({"address": self.athanasia.address, "fromBlock": from_block, "toBlock": to_block})
+        with self.db:
+            for log in sorted(logs, key=lambda log: (log["blockNumber"], log["logIndex"])):
+                abi = self._events.get(log["topics"][0].hex())
+                if abi is not None:
+                    self._index_event(get_event_data(web3.codec, abi, log))
+
+            new_collections = self._collections() - known_collections
+            self._index_transfers(known_collections, from_block, to_block)
+            # Tokens of newly seen collections may have changed hands before their registration.
+            self._index_transfers(new_collections, self.collections_start_block, to_block)
+
+            block = web3.eth.get_block(to_block)
+            self.db.execute("INSERT OR REPLACE INTO blocks (number, hash) VALUES (?, ?)", (to_block, block["hash"].hex()))
+            self.db.execute("DELETE FROM blocks WHERE number < ?", (to_block - self.reorg_depth,))
+            self._set_last_block(to_block)
+
+    def _index_event(self, event):
+        name, args = event["event"], event["args"]
+        position = (event["blockNumber"], event["logIndex"])
+        if name == "StakingIndexRecorded":
+            self.db.execute("INSERT OR REPLACE INTO staking_indexes VALUES (?, ?, ?)",
+                            (args["epoch"], str(args["stakingIndex"]), event["blockNumber"]))
+        elif name == "CollectionDeposit":
+            self._add_deposits(args["collection"], args["collectionSize"], args["depositAmount"], position)
+        elif name == "Deposit":
+            self._add_deposits(args["collection"], 1, args["despositAmount"], position)
+            self._checkpoint(args["collection"], args["tokenId"], self._latest_staking_index(), position)
+        elif name == "DepositBatch":
+            self._add_deposits(args["collection"], len(args["tokenIds"]), args["depositAmount"], position)
+            for token_id in args["tokenIds"]:
+                self._checkpoint(args["collection"], token_id, args["stakingIndex"], position)
+        elif name == "OtcSettled":
+            if args["stakingIndex"] != 0:
+                self._resolve_pending_otc(args["collection"], args["stakingIndex"], position)
+        elif name == "OtcCancelled":
+            # The dropped deposits no longer count in `depositsDone`.
+            dropped = self._resolve_pending_otc(args["collection"], 0, position)
+            self._add_deposits(args["collection"], -dropped, None, position)
+        elif name == "EligibilityProven":
+            for token_id in args["tokenIds"]:
+                self._checkpoint(args["collection"], token_id, args["stakingIndex"], position)
+        elif name == "Claim":
+            self.db.execute("INSERT INTO claims VALUES (?, ?, ?, ?, ?, ?)", (
+                args["collection"], str(args["tokenId"]), args["owner"], str(args["withdrawAmount"]), *position))
+            if args["withdrawAmount"] > 0:
+                self._checkpoint(args["collection"], args["tokenId"], self._latest_staking_index(), position)
+            elif self._has_deposit(args["collection"], args["tokenId"]):
+                # A claim of nothing either leaves a checkpoint at the staking index of the block, or moves it there
+                # after recording that index. Either way the later of the two is the index of the block.
+                staking_index = self._deposit_checkpoint(args["collection"], args["tokenId"])
+                if staking_index != PENDING_OTC_INDEX:
+                    self._checkpoint(args["collection"], args["tokenId"],
+                                     max(staking_index, self._latest_staking_index()), position)
+        elif name == "ClaimBatch":
+            for token_id in args["tokenIds"]:
+                if self._has_deposit(args["collection"], token_id) and not self._is_upgraded(args["collection"], token_id) \
+                        and self.checkpoint(args["collection"], token_id) != PENDING_OTC_INDEX:
+                    self._checkpoint(args["collection"], token_id, args["stakingIndex"], position)
+        elif name == "Upgrade":
+            self._upgrade(args["collection"], [args["tokenId"]], position)
+        elif name == "UpgradeBatch":
+            self._upgrade(args["collection"], args["tokenIds"], position)
+        elif name == "CollectionMigrated":
+            self._upgrade(args["collection"], self._deposited_tokens_in_range(
+                args["collection"], args["startTokenId"], args["endTokenId"]), position)
+
+    def _add_deposits(self, collection, count, deposit_amount, position):
+        """
+        Records a new version of the collection record with `count` more deposits, following `depositsDone`.
+
+        The deposit on register and the eligibility by proof are fixed when a collection is first deposited, so they
+        are read at the head of the chain, which does not require an archive node. The deposit amount is the one of
+        the event, as it may change while a collection has no deposits.
+        """
+        info = self.collection_info(collection)
+        if info is None:
+            head = self.athanasia.collections(collection)
+            info = (head[0], None, None, head[3], 0, None, head[6])
+        if deposit_amount is None:
+            deposit_amount = info[0]
+        self.db.execute("INSERT INTO collections VALUES (?, ?, ?, ?, ?, ?, ?)", (
+            collection, str(deposit_amount), str(info[3]), info[4] + count, int(info[6]), *position))
+
+    def _index_transfers(self, collections, from_block, to_block):
+        if not collections:
+            return
+        for start in range(from_block, to_block + 1, self.chunk_size):
+            logs = web3.eth.get_logs({
+                "address": sorted(collections), "fromBlock": start, "toBlock": min(start + self.chunk_size - 1, to_block),
+                "topics": [ERC721_TRANSFER_TOPIC],
+            })
+            self._index_transfer_logs(logs)
+
+    def _index_transfer_logs(self, logs):
+        for log in logs:
+            # ERC721 transfers index the token id, ERC20 transfers (same signature) do not.
+            if len(log["topics"]) != 4:
+                continue
+            owner = web3.toChecksumAddress(log["topics"][2][-20:])
+            # Transfers of a collection seen again after a reorg may be read twice.
+            self.db.execute("INSERT OR IGNORE INTO owners VALUES (?, ?, ?, ?, ?)", (
+                log["address"], str(int(log["topics"][3].hex(), 16)), owner, log["blockNumber"], log["logIndex"]))
+
+    def _checkpoint(self, collection, token_id, staking_index, position):
+        self.db.execute("INSERT INTO checkpoints VALUES (?, ?, ?, ?, ?)",
+                        (collection, str(token_id), str(staking_index), *position))
+
+    def _resolve_pending_otc(self, collection, staking_index, position):
+        """
+        Moves the checkpoints of the pending deposits of `collection` to `staking_index`, and returns their number.
+        """
+        rows = self.db.execute("SELECT DISTINCT token_id FROM checkpoints WHERE collection = ? AND staking_index = ?",
+                               (collection, str(PENDING_OTC_INDEX)))
+        pending = [t for t in (int(row[0]) for row in rows) if self.checkpoint(collection, t) == PENDING_OTC_INDEX]
+        for token_id in pending:
+            self._checkpoint(collection, token_id, staking_index, position)
+        return len(pending)
+
+    def _upgrade(self, collection, token_ids, position):
+        self.db.executemany("INSERT INTO upgrades VALUES (?, ?, ?, ?)",
+                            [(collection, str(token_id), *position) for token_id in token_ids])
+
+    def _latest_staking_index(self):
+        # A settled OTC purchase records the index of an earlier epoch, so the latest index is the one of the last block.
+        row = self.db.execute(
+            "SELECT staking_index FROM staking_indexes ORDER BY block_number DESC, epoch DESC LIMIT 1").fetchone()
+        return int(row[0]) if row else 0
+
+    def _deposit_checkpoint(self, collection, token_id):
+        """
+        Returns the checkpoint of a deposited token, falling back to the index of the deposit made on registration.
+        """
+        staking_index = self.checkpoint(collection, token_id)
+        if staking_index == 0:
+            staking_index = self.collection_info(collection)[3]
+        return staking_index
+
+    def _has_deposit(self, collection, token_id):
+        info = self.collection_info(collection)
+        if info is None:
+            return False
+        if info[3] != 0 and not info[6]:
+            return 0 < token_id <= info[4]
+        return self.checkpoint(collection, token_id) != 0
+
+    def _is_upgraded(self, collection, token_id):
+        return self.db.execute("SELECT 1 FROM upgrades WHERE collection = ? AND token_id = ?",
+                               (collection, str(token_id))).fetchone() is not None
+
+    def _deposited_tokens_in_range(self, collection, start_token_id, end_token_id):
+        info = self.collection_info(collection)
+        if info[3] != 0 and not info[6]:
+            candidates = range(max(start_token_id, 1), min(end_token_id, info[4] + 1))
+        else:
+            rows = self.db.execute("SELECT DISTINCT token_id FROM checkpoints WHERE collection = ?", (collection,))
+            candidates = [t for t in (int(row[0]) for row in rows) if start_token_id <= t < end_token_id]
+        return [t for t in candidates if not self._is_upgraded(collection, t)]
+
+    def _collections(self):
+        return {row[0] for row in self.db.execute("SELECT DISTINCT collection FROM collections")}
+
+    # Query API
+
+    def collection_info(self, collection):
+        """
+        Returns the collection record in the layout of `collections()`, or None for an unknown collection.
+        """
+        row = self.db.execute(
+            "SELECT deposit_amount, staking_index_on_deposit, deposits_done, eligible_by_proof FROM collections "
+            "WHERE collection = ? ORDER BY block_number DESC, log_index DESC LIMIT 1", (collection,)).fetchone()
+        if row is None:
+            return None
+        return (int(row[0]), None, None, int(row[1]), row[2], None, bool(row[3]))
+
+    def checkpoint(self, collection, token_id):
+        """
+        Returns the staking index recorded for `token_id` at its last deposit or withdrawal, zero if none.
+        """
+        row = self.db.execute(
+            "SELECT staking_index FROM checkpoints WHERE collection = ? AND token_id = ? "
+            "ORDER BY block_number DESC, log_index DESC LIMIT 1", (collection, str(token_id))).fetchone()
+        return int(row[0]) if row else 0
+
+    def owned_tokens(self, owner):
+        """
+        Returns the tokens of the indexed collections currently owned by `owner`, per collection.
+        """
+        owner = web3.toChecksumAddress(str(owner))
+        rows = self.db.execute(
+            "SELECT collection, token_id FROM owners o WHERE owner = ? AND NOT EXISTS ("
+            "  SELECT 1 FROM owners later WHERE later.collection = o.collection AND later.token_id = o.token_id"
+            "  AND (later.block_number > o.block_number"
+            "       OR (later.block_number = o.block_number AND later.log_index > o.log_index)))", (owner,))
+        tokens = {}
+        for collection, token_id in rows:
+            tokens.setdefault(collection, []).append(int(token_id))
+        return {collection: sorted(token_ids) for collection, token_ids in tokens.items()}
+
+    def claimable_for_owner(self, owner, current_index=None):
+        """
+        Returns the amount claimable for each token currently owned by `owner`, per collection, computed from the
+        index. `current_index` defaults to the staking index read from the staking contract.
+        """
+        if current_index is None:
+            current_index = interface.IHectorStaking(self.athanasia.hecStakingContract()).index()
+
+        result = {}
+        for collection, token_ids in self.owned_tokens(owner).items():
+            info = self.collection_info(collection)
+            checkpoints = [self.checkpoint(collection, t) for t in token_ids]
+            upgraded = [self._is_upgraded(collection, t) for t in token_ids]
+            amounts = claimable_balances(info, token_ids, checkpoints, upgraded, current_index)
+            result[collection] = {t: int(amount) for t, amount in zip(token_ids, amounts)}
+        return result
+
+
+def main():
+    print(f"Running on {network.show_active()}")
+    indexer = AthanasiaIndexer(
+        os.environ.get("ATHANASIA_INDEX_DB", "athanasia.db"),
+        AthanasiaHector[-1],
+        start_block=int(os.environ.get("ATHANASIA_START_BLOCK", 0)),
+    )
+    print(f"Indexed up to block {indexer.run()}")
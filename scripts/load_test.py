@@ -0,0 +1,189 @@
+import json
+import os
+import random
+import time
+from pathlib import Path
+
+from brownie import MockNFTContract, MockV2, accounts, chain, network
+from brownie.exceptions import VirtualMachineError
+
+from scripts.deploy import deploy_athanasia
+from scripts.utilities import get_deployer_account, get_hector_contracts
+
+ONE_HECTOR = 10 ** 9
+REBASE_FACTOR = 1_003_000_000
+# Token ids minted per mintBatch call.
+MINT_CHUNK = 200
+HOLDER_FUNDING = "0.1 ether"
+REPORT_PATH = Path(__file__).parent.parent / "reports" / "load_test.json"
+
+
+class OperationStats:
+    """
+    Gas, transaction count and wall-clock time of the transactions sent for one entry point.
+    """
+
+    def __init__(self):
+        self.txs = 0
+        self.tokens = 0
+        self.gas_used = 0
+        self.max_gas_used = 0
+        self.seconds = 0.0
+
+    def send(self, fn, *args, tokens, tx_params):
+        start = time.perf_counter()
+        tx = fn(*args, tx_params)
+        self.seconds += time.perf_counter() - start
+        self.txs += 1
+        self.tokens += tokens
+        self.gas_used += tx.gas_used
+        self.max_gas_used = max(self.max_gas_used, tx.gas_used)
+        return tx
+
+    def as_dict(self):
+        return {
+            "txs": self.txs,
+            "tokens": self.tokens,
+            "gas_used": self.gas_used,
+            "gas_per_token": self.gas_used / self.tokens if self.tokens else None,
+            "max_gas_used": self.max_gas_used,
+            "seconds": self.seconds,
+            "txs_per_second": self.txs / self.seconds if self.seconds else None,
+            "tokens_per_second": self.tokens / self.seconds if self.seconds else None,
+        }
+
+
+def _chunks(token_ids, size):
+    return [token_ids[i:i + size] for i in range(0, len(token_ids), size)]
+
+
+def _fits(fn, args, account, gas_limit):
+    try:
+        return fn.estimate_gas(*args, {"from": account}) <= gas_limit
+    except (ValueError, VirtualMachineError):
+        return False
+
+
+def largest_batch(fn, collection, token_ids, account, gas_limit=None):
+    """
+    Returns the largest number of the leading `token_ids` that `fn(collection, token_ids)` processes within
+    `gas_limit` (the block gas limit by default), by bisection over gas estimates.
+    """
+    gas_limit = gas_limit or chain.block_gas_limit
+    low, high = 0, len(token_ids)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if _fits(fn, (collection, token_ids[:middle]), account, gas_limit):
+            low = middle
+        else:
+            high = middle - 1
+    return {"tokens": low, "bounded_by_tokens": low == len(token_ids)}
+
+
+def run_load_test(holders=300, tokens_per_holder=40, rebases=30, claim_probability=0.2, batch_size=100,
+                  whale_tokens=3000, upgrade_fraction=0.1, seed=0):
+    """
+    Mints a collection to `holders` new accounts, holding `tokens_per_holder` tokens on average, and one account
+    holding `whale_tokens` tokens. Holders deposit their tokens in batches of `batch_size`, and after each of
+    `rebases` rebases each holder claims all its tokens with `claim_probability`. Finally `upgrade_fraction` of
+    the holders claim and upgrade their tokens. The whale measures the largest batch of each entry point that
+    fits in a block, and sends its tokens in batches of that size.
+    """
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    deployer = get_deployer_account()
+    (_, shec, hec_staking) = get_hector_contracts()
+    athanasia = deploy_athanasia()
+    nft = MockNFTContract.deploy({"from": deployer})
+    athanasia.registerCollection(nft.address, ONE_HECTOR, {"from": deployer})
+    collection = nft.address
+
+    # Holders own consecutive token ids, in lots of uneven size.
+    owned = {}
+    next_token_id = 1
+    for _ in range(holders):
+        holder = accounts.add()
+        deployer.transfer(holder, HOLDER_FUNDING)
+        count = rng.randint(1, 2 * tokens_per_holder - 1)
+        owned[holder] = list(range(next_token_id, next_token_id + count))
+        next_token_id += count
+    whale = accounts.add()
+    deployer.transfer(whale, HOLDER_FUNDING)
+    owned[whale] = list(range(next_token_id, next_token_id + whale_tokens))
+
+    for holder, token_ids in owned.items():
+        for chunk in _chunks(token_ids, MINT_CHUNK):
+            nft.mintBatch(holder, chunk[0], len(chunk), {"from": deployer})
+        shec.mint(holder, len(token_ids) * ONE_HECTOR, {"from": deployer})
+        shec.approve(athanasia.address, len(token_ids) * ONE_HECTOR, {"from": holder})
+    setup_seconds = time.perf_counter() - started
+
+    stats = {"deposit": OperationStats(), "claim": OperationStats(), "upgrade": OperationStats()}
+    batches = {}
+    whale_batches = {}
+
+    def send(operation, holder, batch):
+        for chunk in _chunks(owned[holder], batch):
+            stats[operation].send(getattr(athanasia, operation), collection, chunk, tokens=len(chunk),
+                                  tx_params={"from": holder})
+
+    # The whale's batches are measured before it sends any, so that every measurement covers all its tokens.
+    batches["deposit"] = largest_batch(athanasia.deposit, collection, owned[whale], whale)
+    whale_batches["deposit"] = max(batches["deposit"]["tokens"], 1)
+    for holder in owned:
+        send("deposit", holder, whale_batches["deposit"] if holder == whale else batch_size)
+
+    for rebase in range(rebases):
+        hec_staking.rebase(REBASE_FACTOR, {"from": deployer})
+        if rebase == 0:
+            batches["claim"] = largest_batch(athanasia.claim, collection, owned[whale], whale)
+            whale_batches["claim"] = max(batches["claim"]["tokens"], 1)
+            send("claim", whale, whale_batches["claim"])
+        for holder in owned:
+            if holder != whale and rng.random() < claim_probability:
+                send("claim", holder, batch_size)
+
+    athanasia.setUpgradeAddress(MockV2.deploy({"from": deployer}).address, {"from": deployer})
+    send("claim", whale, whale_batches["claim"])
+    batches["upgrade"] = largest_batch(athanasia.upgrade, collection, owned[whale], whale)
+    send("upgrade", whale, max(batches["upgrade"]["tokens"], 1))
+    upgrading = [holder for holder in owned if holder != whale]
+    for holder in rng.sample(upgrading, int(len(upgrading) * upgrade_fraction)):
+        send("claim", holder, batch_size)
+        send("upgrade", holder, batch_size)
+
+    return {
+        "config": {
+            "holders": holders,
+            "tokens": next_token_id - 1 + whale_tokens,
+            "tokens_per_holder": tokens_per_holder,
+            "whale_tokens": whale_tokens,
+            "rebases": rebases,
+            "claim_probability": claim_probability,
+            "batch_size": batch_size,
+            "upgrade_fraction": upgrade_fraction,
+        },
+        "block_gas_limit": chain.block_gas_limit,
+        "final_index": hec_staking.index(),
+        "setup_seconds": setup_seconds,
+        "total_seconds": time.perf_counter() - started,
+        "operations": {name: operation.as_dict() for name, operation in stats.items()},
+        "largest_batch": batches,
+    }
+
+
+def main():
+    print(f"Running on {network.show_active()}")
+    report = run_load_test(
+        holders=int(os.environ.get("LOAD_TEST_HOLDERS", 300)),
+        tokens_per_holder=int(os.environ.get("LOAD_TEST_TOKENS_PER_HOLDER", 40)),
+        rebases=int(os.environ.get("LOAD_TEST_REBASES", 30)),
+        claim_probability=float(os.environ.get("LOAD_TEST_CLAIM_PROBABILITY", 0.2)),
+        batch_size=int(os.environ.get("LOAD_TEST_BATCH_SIZE", 100)),
+        whale_tokens=int(os.environ.get("LOAD_TEST_WHALE_TOKENS", 3000)),
+        upgrade_fraction=float(os.environ.get("LOAD_TEST_UPGRADE_FRACTION", 0.1)),
+    )
+    REPORT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(REPORT_PATH, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,93 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from brownie.exceptions import VirtualMachineError
+
+from scripts.utilities import get_multicall
+
+# Number of calls aggregated in one eth_call.
+DEFAULT_CHUNK_SIZE = 500
+# Number of eth_calls in flight at once.
+DEFAULT_MAX_WORKERS = 4
+# Attempts of a chunk before it is split in two.
+DEFAULT_RETRIES = 2
+# Seconds to wait before the second attempt of a chunk, doubled for each further attempt.
+DEFAULT_BACKOFF = 0.5
+
+
+class MulticallClient:
+    """
+    Batched reader of view functions. Calls are aggregated into Multicall2 `tryAggregate` chunks, which are sent
+    concurrently from a bounded thread pool. A chunk that keeps failing (e.g. it hits the node's gas or response
+    size limit, which the node reports as an RPC error) is split in two and retried, down to single calls. A call that
+    reverts reads as None. Transport errors are raised, as splitting the chunk would not help.
+    """
+
+    def __init__(self, multicall=None, chunk_size=DEFAULT_CHUNK_SIZE, max_workers=DEFAULT_MAX_WORKERS,
+                 retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF):
+        self.multicall = multicall or get_multicall()
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.round_trips = 0
+        self._lock = threading.Lock()
+
+    def read(self, calls):
+        """
+        Reads `calls`, a list of (contract function, arguments) pairs, and returns their decoded results in order.
+        """
+        chunks = [calls[i:i + self.chunk_size] for i in range(0, len(calls), self.chunk_size)]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = executor.map(self._read_chunk, chunks)
+        return [result for chunk in results for result in chunk]
+
+    def _read_chunk(self, calls):
+        for attempt in range(self.retries):
+            if attempt > 0:
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+            try:
+                return self._aggregate(calls)
+            except (ValueError, VirtualMachineError):
+                pass
+        if len(calls) == 1:
+            return [None]
+        middle = len(calls) // 2
+        return self._read_chunk(calls[:middle]) + self._read_chunk(calls[middle:])
+
+    def _aggregate(self, calls):
+        with self._lock:
+            self.round_trips += 1
+        results = self.multicall.tryAggregate.call(
+            False, [(fn._address, fn.encode_input(*args)) for fn, args in calls])
+        return [fn.decode_output(data) if success else None for (fn, _), (success, data) in zip(calls, results)]
+
+    def claimable_balances(self, athanasia, collection, token_ids):
+        return self._read_tokens(athanasia.claimableBalance, collection, token_ids)
+
+    def staking_indexes(self, athanasia, collection, token_ids):
+        return self._read_tokens(athanasia.stakingIndexes, collection, token_ids)
+
+    def upgrade_statuses(self, athanasia, collection, token_ids):
+        return self._read_tokens(athanasia.upgradeStatus, collection, token_ids)
+
+    def collections(self, athanasia, collections):
+        return dict(zip(collections, self.read([(athanasia.collections, (c,)) for c in collections])))
+
+    def _read_tokens(self, fn, collection, token_ids):
+        return dict(zip(token_ids, self.read([(fn, (collection, token_id)) for token_id in token_ids])))
+
+    def token_states(self, athanasia, collection, token_ids):
+        """
+        Returns the claimable balance, staking index and upgrade status of each of `token_ids`, read in one pass.
+        """
+        calls = []
+        for token_id in token_ids:
+            calls += [
+                (athanasia.claimableBalance, (collection, token_id)),
+                (athanasia.stakingIndexes, (collection, token_id)),
+                (athanasia.upgradeStatus, (collection, token_id)),
+            ]
+        results = self.read(calls)
+        return {token_id: tuple(results[3 * i:3 * i + 3]) for i, token_id in enumerate(token_ids)}
@@ -0,0 +1,142 @@
+import json
+import os
+
+from brownie import AthanasiaHector, chain, network
+from brownie.exceptions import VirtualMachineError
+from eip712.messages import EIP712Message
+
+from scripts.utilities import get_deployer_account
+
+# Gas budget of a single claimFor transaction, kept well under the block gas limit.
+DEFAULT_MAX_GAS = 8_000_000
+# Time a holder's signature stays valid for, in seconds.
+DEFAULT_SIGNATURE_TTL = 7 * 24 * 60 * 60
+
+
+def claim_message(athanasia, owner, collection, token_ids, nonce, deadline):
+    class Claim(EIP712Message):
+        _name_: "string" = "AthanasiaHector"
+        _version_: "string" = "1"
+        _chainId_: "uint256" = chain.id
+        _verifyingContract_: "address" = athanasia.address
+
+        owner: "address"
+        collection: "address"
+        tokenIds: "uint256[]"
+        nonce: "uint256"
+        deadline: "uint256"
+
+    return Claim(owner=owner, collection=collection, tokenIds=token_ids, nonce=nonce, deadline=deadline)
+
+
+def sign_claim(athanasia, account, collection, token_ids, nonce=None, deadline=None):
+    """
+    Signs a claim of `token_ids` from `collection` with the holder `account`, which must hold its private key.
+    `nonce` defaults to the holder's current nonce, pass the following ones to sign several claims in advance.
+    """
+    if nonce is None:
+        nonce = athanasia.nonces(account.address)
+    if deadline is None:
+        deadline = chain.time() + DEFAULT_SIGNATURE_TTL
+    message = claim_message(athanasia, account.address, collection, list(token_ids), nonce, deadline)
+    return {
+        "owner": account.address,
+        "collection": str(collection),
+        "tokenIds": list(token_ids),
+        "nonce": nonce,
+        "deadline": deadline,
+        "signature": account.sign_message(message).signature.hex(),
+    }
+
+
+def load_claims(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_claims(path, claims):
+    with open(path, "w") as f:
+        json.dump(claims, f, indent=2)
+
+
+def _as_argument(claim):
+    return (claim["owner"], claim["collection"], claim["tokenIds"], claim["deadline"], claim["signature"])
+
+
+def pending_claims(athanasia, claims):
+    """
+    Drops the claims that can no longer be relayed: expired ones, and those whose nonce was already used.
+    Claims of the same holder are ordered by nonce, as they have to be submitted in that order.
+    """
+    now = chain.time()
+    nonces = {}
+    pending = []
+    for claim in sorted(claims, key=lambda c: (c["owner"], c["nonce"])):
+        if claim["owner"] not in nonces:
+            nonces[claim["owner"]] = athanasia.nonces(claim["owner"])
+        if claim["deadline"] >= now and claim["nonce"] >= nonces[claim["owner"]]:
+            pending.append(claim)
+    return pending
+
+
+def next_batch(athanasia, claims, relayer, max_gas=DEFAULT_MAX_GAS):
+    """
+    Returns the longest leading run of `claims` whose claimFor transaction is estimated to use at most `max_gas`,
+    along with the leading claims rejected because they can not be relayed even on their own (e.g. the token was
+    sold since signing, or the claim alone exceeds `max_gas`).
+
+    The run is found by bisecting its length, so a batch of n claims takes about log2(n) estimates.
+    """
+    rejected = []
+    while claims and not _fits(athanasia, claims[:1], relayer, max_gas):
+        rejected.append(claims[0])
+        claims = claims[1:]
+    if not claims:
+        return [], rejected
+
+    # The first `fitting` claims fit, the first `too_long` do not (or there are not that many).
+    fitting, too_long = 1, len(claims) + 1
+    while fitting + 1 < too_long:
+        middle = (fitting + too_long) // 2
+        if _fits(athanasia, claims[:middle], relayer, max_gas):
+            fitting = middle
+        else:
+            too_long = middle
+    return claims[:fitting], rejected
+
+
+def _fits(athanasia, claims, relayer, max_gas):
+    gas = _estimate(athanasia, claims, relayer)
+    return gas is not None and gas <= max_gas
+
+
+def _estimate(athanasia, claims, relayer):
+    try:
+        return athanasia.claimFor.estimate_gas([_as_argument(c) for c in claims], {"from": relayer})
+    except (ValueError, VirtualMachineError):
+        return None
+
+
+def relay(athanasia, claims, relayer, max_gas=DEFAULT_MAX_GAS):
+    """
+    Submits the still valid `claims` in gas-bounded claimFor batches, and returns the transactions.
+    Batches are sent one at a time, so each estimate sees the nonces consumed by the previous batch.
+    """
+    txs = []
+    claims = pending_claims(athanasia, claims)
+    while claims:
+        batch, rejected = next_batch(athanasia, claims, relayer, max_gas)
+        for claim in rejected:
+            print(f"Skipping claim of {claim['owner']} with nonce {claim['nonce']}")
+        if batch:
+            txs.append(athanasia.claimFor([_as_argument(c) for c in batch], {"from": relayer}))
+        claims = claims[len(batch) + len(rejected):]
+    return txs
+
+
+def main():
+    print(f"Running on {network.show_active()}")
+    claims = load_claims(os.environ.get("CLAIMS_FILE", "claims.json"))
+    max_gas = int(os.environ.get("RELAYER_MAX_GAS", DEFAULT_MAX_GAS))
+    txs = relay(AthanasiaHector[-1], claims, get_deployer_account(), max_gas)
+    print(f"Relayed {len(claims)} claims in {len(txs)} transactions")
@@ -0,0 +1,53 @@
+import json
+import os
+from pathlib import Path
+
+from brownie import MockNFTContract, network
+
+from scripts.deploy import deploy_athanasia
+from scripts.simulation import calibrate_gas_model, every, mixed, randomly, simulate
+from scripts.utilities import get_deployer_account, get_hector_contracts, get_user_account
+
+ONE_HECTOR = 10 ** 9
+# Tokens claimed to calibrate the gas model, see `calibrate_gas_model`.
+CALIBRATION_TOKENS = 64
+REPORT_PATH = Path(__file__).parent.parent / "reports" / "simulation.json"
+
+
+def calibrate_on_mocks():
+    """
+    Deploys the contract and a collection on the local mocks and measures claims of it to fit a gas model.
+    """
+    deployer = get_deployer_account()
+    holder = get_user_account()
+    (_, shec, hec_staking) = get_hector_contracts()
+    athanasia = deploy_athanasia()
+    nft = MockNFTContract.deploy({"from": deployer})
+    nft.mintBatch(holder, 1, CALIBRATION_TOKENS, {"from": deployer})
+
+    shec.mint(deployer, CALIBRATION_TOKENS * ONE_HECTOR, {"from": deployer})
+    shec.approve(athanasia.address, CALIBRATION_TOKENS * ONE_HECTOR, {"from": deployer})
+    athanasia.registerCollectionAndDeposit(nft.address, ONE_HECTOR, CALIBRATION_TOKENS, {"from": deployer})
+    return calibrate_gas_model(athanasia, nft.address, hec_staking, holder, range(1, CALIBRATION_TOKENS + 1))
+
+
+def main():
+    print(f"Running on {network.show_active()}")
+    gas_model = calibrate_on_mocks()
+    tokens = int(os.environ.get("SIMULATION_TOKENS", 10_000))
+    rebases = int(os.environ.get("SIMULATION_REBASES", 3 * 365))
+    factor = int(os.environ.get("SIMULATION_REBASE_FACTOR", 1_003_000_000))
+    tokens_per_holder = int(os.environ.get("SIMULATION_TOKENS_PER_HOLDER", 5))
+    max_gas = int(os.environ.get("SIMULATION_MAX_GAS", 8_000_000))
+
+    # A fifth of the holders claims weekly, half of them now and then, and the rest holds.
+    behaviour = mixed((0.2, every(21)), (0.5, randomly(0.01)))
+    owners = [token // tokens_per_holder for token in range(tokens)]
+    result = simulate(ONE_HECTOR, [factor] * rebases, behaviour, token_count=tokens, owners=owners,
+                      gas_model=gas_model, max_gas=max_gas)
+
+    report = {"gas_model": gas_model.as_dict(), "result": result.as_dict()}
+    REPORT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(REPORT_PATH, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,11 @@
+from scripts.simulation.gas import GasModel, calibrate_gas_model
+from scripts.simulation.model import (
+    SimulationResult,
+    every,
+    hold,
+    index_path,
+    mixed,
+    randomly,
+    scheduled,
+    simulate,
+)
@@ -0,0 +1,47 @@
+import numpy as np
+
+
+class GasModel:
+    """
+    Linear gas cost of `claim` transactions: `base` per transaction and `per_token` per claimed token, plus `epoch`
+    once per rebase, paid by the first claim after it as it records the new staking index.
+    """
+
+    def __init__(self, base, per_token, epoch=0):
+        self.base = base
+        self.per_token = per_token
+        self.epoch = epoch
+
+    def claim_gas(self, batch_sizes):
+        """
+        Gas used by claim transactions of `batch_sizes` tokens sent after the same rebase.
+        """
+        batch_sizes = np.asarray(batch_sizes)
+        if len(batch_sizes) == 0:
+            return 0
+        return int(round(self.epoch + self.base * len(batch_sizes) + self.per_token * batch_sizes.sum()))
+
+    def max_batch(self, max_gas):
+        """
+        Largest number of tokens a single claim can carry within `max_gas`.
+        """
+        return max(int((max_gas - self.base - self.epoch) // self.per_token), 1)
+
+    def as_dict(self):
+        return {"base": self.base, "per_token": self.per_token, "epoch": self.epoch}
+
+
+def calibrate_gas_model(athanasia, collection, hec_staking, holder, token_ids, rebase_factor=1_100_000_000):
+    """
+    Fits a `GasModel` to claims measured on the chain. `token_ids` are deposited tokens of `collection` owned by
+    `holder`, at least 18 consecutive ids. After a rebase, the first token is claimed alone (recording the staking
+    index), then the ninth one alone (in another checkpoint word) and the tokens from the seventeenth on together.
+    """
+    token_ids = list(token_ids)
+    hec_staking.rebase(rebase_factor, {"from": holder})
+    first = athanasia.claim(collection, token_ids[:1], {"from": holder}).gas_used
+    single = athanasia.claim(collection, token_ids[8:9], {"from": holder}).gas_used
+    batch = athanasia.claim(collection, token_ids[16:], {"from": holder}).gas_used
+
+    per_token = (batch - single) / (len(token_ids) - 17)
+    return GasModel(single - per_token, per_token, first - single)
@@ -0,0 +1,235 @@
+import numpy as np
+
+# Staking indexes and rebase factors have 9 decimals, like HEC amounts.
+ONE_HECTOR = 10 ** 9
+INT64_MAX = np.iinfo(np.int64).max
+# Number of rebases whose claim decisions are drawn at once.
+DEFAULT_BATCH_STEPS = 256
+
+
+def index_path(start_index, factors):
+    """
+    Returns the staking index at registration followed by its value after each rebase, as computed by
+    `MockHectorStaking.rebase(factor)`: `index * factor // 10**9`.
+    """
+    path = [int(start_index)]
+    for factor in factors:
+        path.append(path[-1] * int(factor) // ONE_HECTOR)
+    return path
+
+
+def hold():
+    """
+    Holders never claim.
+    """
+    def behaviour(first_step, steps, holders, rng):
+        return np.zeros((steps, holders), dtype=bool)
+    return behaviour
+
+
+def every(interval, stagger=True):
+    """
+    Each holder claims every `interval` rebases. Holders are spread evenly over the interval, unless `stagger` is
+    unset, in which case they all claim on the same rebases.
+    """
+    def behaviour(first_step, steps, holders, rng):
+        phase = np.arange(holders) % interval if stagger else np.zeros(holders, dtype=np.int64)
+        step = np.arange(first_step, first_step + steps)[:, None]
+        return (step + phase) % interval == 0
+    return behaviour
+
+
+def randomly(probability):
+    """
+    Each holder claims after any rebase with the given probability.
+    """
+    def behaviour(first_step, steps, holders, rng):
+        return rng.random((steps, holders)) < probability
+    return behaviour
+
+
+def scheduled(schedule):
+    """
+    Holders claim as given by `schedule`, a boolean array of one row per rebase and one column per holder.
+    """
+    schedule = np.asarray(schedule, dtype=bool)
+
+    def behaviour(first_step, steps, holders, rng):
+        return schedule[first_step - 1:first_step - 1 + steps, :holders]
+    return behaviour
+
+
+def mixed(*groups):
+    """
+    Splits the holders into consecutive groups of `(fraction, behaviour)`. Holders left over hold.
+    """
+    def behaviour(first_step, steps, holders, rng):
+        decisions = np.zeros((steps, holders), dtype=bool)
+        start = 0
+        total = 0.0
+        for fraction, group_behaviour in groups:
+            total += fraction
+            end = min(int(round(total * holders)), holders)
+            if end > start:
+                decisions[:, start:end] = group_behaviour(first_step, steps, end - start, rng)
+            start = end
+        return decisions
+    return behaviour
+
+
+class SimulationResult:
+    """
+    Outcome of `simulate`. Arrays have one entry per step, step 0 being the registration and step `t` the state
+    after the `t`-th rebase and the claims that follow it. HEC and sHEC amounts are Python ints.
+    """
+
+    def __init__(self, index, claimed, claim_txs, claimed_tokens, claim_gas, liability, shec_balance, token_claimed):
+        self.index = index
+        self.claimed = claimed
+        self.claim_txs = claim_txs
+        self.claimed_tokens = claimed_tokens
+        self.claim_gas = claim_gas
+        self.liability = liability
+        self.shec_balance = shec_balance
+        self.token_claimed = token_claimed
+
+    @property
+    def total_claimed(self):
+        return int(sum(self.claimed))
+
+    @property
+    def total_gas(self):
+        return int(self.claim_gas.sum())
+
+    @property
+    def required_backing(self):
+        """
+        Largest amount of sHEC the contract owed over the simulation: deposits plus unclaimed rewards.
+        """
+        return int(max(self.liability))
+
+    @property
+    def shortfall(self):
+        """
+        Largest amount by which the liability exceeded the sHEC balance of the contract, zero if it never did.
+        """
+        return int(max(max(liability - balance, 0) for liability, balance in zip(self.liability, self.shec_balance)))
+
+    def as_dict(self):
+        return {
+            "rebases": len(self.index) - 1,
+            "tokens": len(self.token_claimed),
+            "final_index": int(self.index[-1]),
+            "total_claimed": self.total_claimed,
+            "claim_txs": int(self.claim_txs.sum()),
+            "claimed_tokens": int(self.claimed_tokens.sum()),
+            "total_gas": self.total_gas,
+            "required_backing": self.required_backing,
+            "final_liability": int(self.liability[-1]),
+            "final_shec_balance": int(self.shec_balance[-1]),
+            "shortfall": self.shortfall,
+        }
+
+
+def _rewards(index, steps, t, deposit_amount):
+    """
+    Claimable amount at step `t` of a token whose checkpoint is at each of `steps`, as in `_claimable`.
+    """
+    checkpoints = index[steps]
+    return np.where(checkpoints < index[t], (index[t] - checkpoints) * deposit_amount // checkpoints, 0)
+
+
+def simulate(deposit_amount, factors, behaviour, token_count=None, deposit_steps=None, owners=None,
+             start_index=ONE_HECTOR, gas_model=None, max_gas=None, batch_steps=DEFAULT_BATCH_STEPS, seed=0):
+    """
+    Simulates the claims of a collection with `deposit_amount` sHEC deposited per token over the rebases given by
+    `factors` (see `index_path`), with the arithmetic of `AthanasiaHector`.
+
+    Tokens are deposited at registration (`registerCollectionAndDeposit`) or, when `deposit_steps` is given, each
+    after the rebase of that number (`deposit`, 0 meaning registration). `owners` maps each token to a holder,
+    by default each token has its own holder. After every rebase, `behaviour` (see `hold`, `every`, `randomly`,
+    `scheduled` and `mixed`) decides which holders claim, and a claiming holder claims all its deposited tokens,
+    in transactions of at most `gas_model.max_batch(max_gas)` tokens when both are given.
+
+    The contract's sHEC balance grows with the staking index, and claims are paid by unstaking it (no HEC float).
+    """
+    if deposit_steps is None:
+        deposit_steps = np.zeros(token_count, dtype=np.int64)
+    deposit_steps = np.asarray(deposit_steps, dtype=np.int64)
+    token_count = len(deposit_steps)
+    owners = np.arange(token_count) if owners is None else np.asarray(owners, dtype=np.int64)
+    holder_count = int(owners.max()) + 1 if token_count else 0
+    steps = len(factors)
+    rng = np.random.default_rng(seed)
+    max_batch = gas_model.max_batch(max_gas) if gas_model is not None and max_gas is not None else None
+
+    path = index_path(start_index, factors)
+    index = np.array(path, dtype=object)
+    # Rewards fit in int64 unless the index grows by orders of magnitude, intermediate products are Python ints.
+    reward_dtype = np.int64 if deposit_amount * max(path) // min(path) <= INT64_MAX else object
+    token_claimed = np.zeros(token_count, dtype=reward_dtype)
+
+    # Tokens in order of deposit, and where each step's deposits end in that order.
+    deposit_order = np.argsort(deposit_steps, kind="stable")
+    deposit_ends = np.searchsorted(deposit_steps[deposit_order], np.arange(steps + 1), side="right")
+    deposited = np.zeros(token_count, dtype=bool)
+    deposited[deposit_order[:deposit_ends[0]]] = True
+    # Step of the staking index each token last withdrew at, and number of deposited tokens per such step.
+    checkpoint = deposit_steps.copy()
+    held = np.zeros(steps + 1, dtype=np.int64)
+    held[0] = deposited_count = int(deposit_ends[0])
+
+    claimed = np.zeros(steps + 1, dtype=object)
+    claim_txs = np.zeros(steps + 1, dtype=np.int64)
+    claimed_tokens = np.zeros(steps + 1, dtype=np.int64)
+    claim_gas = np.zeros(steps + 1, dtype=np.int64)
+    liability = np.zeros(steps + 1, dtype=object)
+    shec_balance = np.zeros(steps + 1, dtype=object)
+    balance = deposit_amount * deposited_count
+    liability[0] = shec_balance[0] = balance
+
+    for first_step in range(1, steps + 1, batch_steps):
+        decisions = behaviour(first_step, min(batch_steps, steps + 1 - first_step), holder_count, rng)
+        for row, t in enumerate(range(first_step, first_step + len(decisions))):
+            balance = balance * path[t] // path[t - 1]
+
+            new_tokens = deposit_order[deposit_ends[t - 1]:deposit_ends[t]]
+            deposited[new_tokens] = True
+            deposited_count += len(new_tokens)
+            held[t] += len(new_tokens)
+            balance += deposit_amount * len(new_tokens)
+
+            # Unclaimed reward of every deposited token, grouped by checkpoint.
+            checkpoint_steps = np.nonzero(held[:t])[0]
+            rewards = np.zeros(steps + 1, dtype=object)
+            rewards[checkpoint_steps] = _rewards(index, checkpoint_steps, t, deposit_amount)
+            unclaimed = int((held[checkpoint_steps].astype(object) * rewards[checkpoint_steps]).sum())
+
+            claiming = np.nonzero(decisions[row][owners] & deposited)[0]
+            total = 0
+            if len(claiming):
+                counts = np.bincount(checkpoint[claiming], minlength=steps + 1)
+                total = int((counts.astype(object) * rewards).sum())
+                token_claimed[claiming] += rewards[checkpoint[claiming]].astype(reward_dtype)
+                held -= counts
+                held[t] += len(claiming)
+                checkpoint[claiming] = t
+
+                batches = np.bincount(owners[claiming], minlength=holder_count)
+                batches = batches[batches > 0]
+                if max_batch is not None:
+                    # Holders with more tokens than fit in a transaction split them in full batches and a rest.
+                    full, rest = np.divmod(batches, max_batch)
+                    batches = np.concatenate([np.repeat(max_batch, full.sum()), rest[rest > 0]])
+                claim_txs[t] = len(batches)
+                claimed_tokens[t] = len(claiming)
+                if gas_model is not None:
+                    claim_gas[t] = gas_model.claim_gas(batches)
+
+            balance -= total
+            claimed[t] = total
+            liability[t] = deposit_amount * deposited_count + unclaimed - total
+            shec_balance[t] = balance
+
+    return SimulationResult(path, claimed, claim_txs, claimed_tokens, claim_gas, liability, shec_balance,
+                            token_claimed)
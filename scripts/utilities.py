@@ -1,5 +1,5 @@
 from brownie import accounts, config, network
-from brownie import MockHEC, MockSHEC, MockHectorStaking, MockHecOtc, MockNFTContract, MockTOR
+from brownie import MockHEC, MockSHEC, MockHectorStaking, MockHecOtc, MockNFTContract, MockTOR, Multicall2
 
 LOCAL_ENVIRONMENTS = ["development", "ganache", "mainnet-fork"]
 
@@ -36,3 +36,12 @@ def get_hector_contracts():
     if len(MockHectorStaking) == 0:
         hecStaking = MockHectorStaking.deploy(hecToken.address, shecToken.address, {"from": deployer})
     return (MockHEC[-1], MockSHEC[-1], MockHectorStaking[-1])
+
+
+def get_multicall():
+    if network.show_active() not in LOCAL_ENVIRONMENTS:
+        return Multicall2.at(config["networks"][network.show_active()]["multicall2"])
+
+    if len(Multicall2) == 0:
+        Multicall2.deploy({"from": get_deployer_account()})
+    return Multicall2[-1]
@@ -0,0 +1,184 @@
+import pytest
+from brownie import accounts
+from scripts.deploy import deploy_athanasia
+from scripts.utilities import get_deployer_account, get_user_account
+
+ONE_HECTOR = 10 ** 9
+ONE_FTM = 10 ** 18
+ONE_TOR = 10 ** 18
+
+
+@pytest.fixture(scope="module", autouse=True)
+def user(module_isolation):
+    return get_user_account()
+
+
+@pytest.fixture(scope="module", autouse=True)
+def deployer(module_isolation):
+    return get_deployer_account()
+
+
+@pytest.fixture(scope="module", autouse=True)
+def hec(MockHEC, deployer):
+    yield MockHEC.deploy({"from": deployer})
+
+
+@pytest.fixture(scope="module", autouse=True)
+def shec(MockSHEC, deployer):
+    yield MockSHEC.deploy({"from": deployer})
+
+
+@pytest.fixture(scope="module", autouse=True)
+def otc(MockHecOtc, shec, deployer):
+    yield MockHecOtc.deploy(False, shec.address, {"from": deployer})
+
+
+@pytest.fixture(scope="module", autouse=True)
+def tor(MockTOR, deployer):
+    yield MockTOR.deploy({"from": deployer})
+
+
+@pytest.fixture(scope="module", autouse=True)
+def hec_staking(hec, shec, MockHectorStaking, deployer):
+    hs = MockHectorStaking.deploy(
+        hec.address, shec.address, {"from": deployer}
+    )
+    hec.mint(hs.address, 1000 * ONE_HECTOR)
+    hs.setIndex(ONE_HECTOR)
+    yield hs
+
+
+@pytest.fixture(scope="module", autouse=True)
+def nft(MockNFTContract, deployer, user):
+    x = MockNFTContract.deploy({"from": deployer})
+    x.mint(user, 1)
+    x.mint(user, 18)
+    x.mint(user, 9272)
+    x.mint(deployer, 1337)
+    yield x
+
+
+@pytest.fixture(scope="module", autouse=True)
+def athanasia(hec, shec, hec_staking, tor, otc, deployer, user):
+    # Mint 1000 HEC to deployer/user account
+    hec.mint(deployer, 1000 * ONE_HECTOR, {"from": deployer})
+    hec.mint(user, 100 * ONE_HECTOR, {"from": deployer})
+    # Mint 1000 sHEC to HectorStaking account
+    shec.mint(hec_staking.address, 100 * ONE_HECTOR, {"from": deployer})
+    athanasia_contract = deploy_athanasia()
+    # Approve AthanasiaHector to spend the HEC from deployer/user
+    hec.approve(athanasia_contract.address, 1000 * ONE_HECTOR, {"from": deployer})
+    tor.approve(athanasia_contract.address, 1000 * ONE_HECTOR, {"from": user})
+    # Set rebase index for hec staking
+    yield athanasia_contract
+
+
+@pytest.fixture(scope="module", autouse=True)
+def hec_otc(athanasia, otc, deployer):
+    athanasia.initialize(otc.address, {"from": deployer})
+
+
+@pytest.fixture(scope="function", autouse=True)
+def isolation(fn_isolation):
+    # The deployment above is made once per module, each test runs in a snapshot of it that is reverted afterwards.
+    pass
+
+
+@pytest.fixture(scope="function", autouse=False)
+def v2(MockV2, deployer):
+    yield MockV2.deploy({"from": deployer})
+
+
+@pytest.fixture(scope="module", autouse=False)
+def register_and_deposit(nft, shec, deployer):
+    # Registers `nft` with a deposit of 1 sHEC for each of its first 10000 tokens on an Athanasia contract.
+    def register_and_deposit(contract):
+        shec.mint(deployer, 10000 * ONE_HECTOR, {"from": deployer})
+        shec.approve(contract.address, 10000 * ONE_HECTOR, {"from": deployer})
+        contract.registerCollectionAndDeposit(nft.address, ONE_HECTOR, 10000, {"from": deployer})
+        return contract
+    yield register_and_deposit
+
+
+@pytest.fixture(scope="function", autouse=False)
+def athanasia_rd(athanasia, register_and_deposit):
+    yield register_and_deposit(athanasia)
+
+
+@pytest.fixture(scope="function", autouse=False)
+def athanasia_otc_ftm(athanasia, otc, nft, shec, deployer):
+    otc.registerCollection(
+        nft.address,
+        "0x0000000000000000000000000000000000000000",
+        5 * ONE_FTM,
+        10_000 * ONE_HECTOR,
+        {"from": deployer})
+    athanasia.registerCollectionWithOtc(
+        nft.address,
+        "0x0000000000000000000000000000000000000000",
+        5 * ONE_FTM,
+        ONE_HECTOR,
+        {"from": deployer})
+    yield athanasia
+
+
+@pytest.fixture(scope="function", autouse=False)
+def legacy_athanasia(LegacyAthanasiaHector, hec, shec, hec_staking, otc, deployer):
+    contract = LegacyAthanasiaHector.deploy(hec.address, shec.address, hec_staking.address, {"from": deployer})
+    contract.initialize(otc.address, {"from": deployer})
+    yield contract
+
+
+@pytest.fixture(scope="function", autouse=False)
+def upgradable_athanasia(athanasia_rd, v2, deployer):
+    athanasia_rd.setUpgradeAddress(v2.address, {"from": deployer})
+    yield athanasia_rd
+
+
+@pytest.fixture(scope="function", autouse=False)
+def legacy_upgradable(legacy_athanasia, v2, nft, shec, deployer):
+    shec.approve(legacy_athanasia.address, 10000 * ONE_HECTOR, {"from": deployer})
+    shec.mint(deployer, 10000 * ONE_HECTOR, {"from": deployer})
+    legacy_athanasia.registerCollectionAndDeposit(nft.address, ONE_HECTOR, 10000, {"from": deployer})
+    legacy_athanasia.setUpgradeAddress(v2.address, {"from": deployer})
+    yield legacy_athanasia
+
+
+@pytest.fixture(scope="function", autouse=False)
+def athanasiaReg(athanasia, otc, nft, shec, deployer, user):
+    otc.registerCollection(
+        nft.address,
+        "0x0000000000000000000000000000000000000000",
+        5 * ONE_FTM,
+        10_000 * ONE_HECTOR,
+        {"from": deployer})
+    athanasia.registerCollection(nft.address, ONE_HECTOR, {"from": deployer})
+    shec.approve(athanasia.address, 100 * ONE_HECTOR, {"from": user})
+    yield athanasia
+
+
+@pytest.fixture(scope="function", autouse=False)
+def athanasia_deposited(athanasia_otc_ftm, nft, shec, user, hec_staking):
+    # Borrow some ETH/FTM from other test account
+    accounts[-1].transfer(user, accounts[-1].balance())
+    accounts[-2].transfer(user, accounts[-2].balance())
+    athanasia_otc_ftm.depositWithOtc(nft.address, [1, 18, 9272], {"from": user, "amount": 15 * ONE_FTM})
+    hec_staking.setIndex(ONE_HECTOR)
+    yield athanasia_otc_ftm
+
+
+@pytest.fixture(scope="function", autouse=False)
+def nft2(MockNFTContract, deployer, user):
+    x = MockNFTContract.deploy({"from": deployer})
+    x.mint(user, 1)
+    x.mint(user, 2)
+    x.mint(user, 3)
+    yield x
+
+
+@pytest.fixture(scope="function", autouse=False)
+def athanasia_rd2(athanasia_rd, nft2, deployer, shec):
+    shec.approve(athanasia_rd.address, 100 * ONE_HECTOR, {"from": deployer})
+    shec.mint(deployer, 100 * ONE_HECTOR, {"from": deployer})
+    athanasia_rd.registerCollectionAndDeposit(nft2.address, 2 * ONE_HECTOR, 50, {"from": deployer})
+    yield athanasia_rd
@@ -0,0 +1,68 @@
+import pytest
+import brownie
+from brownie import AthanasiaHectorClone
+from scripts.deploy import deploy_athanasia_clone, get_athanasia_factory
+
+ONE_HECTOR = 10 ** 9
+
+
+@pytest.fixture(scope="function", autouse=False)
+def clone(hec, shec, hec_staking, otc, deployer):
+    contract = deploy_athanasia_clone()
+    contract.initialize(otc.address, {"from": deployer})
+    yield contract
+
+
+def test_clone_is_initialized_with_hector_contracts(clone, hec, shec, hec_staking, otc, deployer):
+    assert clone.hecToken() == hec.address
+    assert clone.shecToken() == shec.address
+    assert clone.hecStakingContract() == hec_staking.address
+    assert clone.hectorOtcContract() == otc.address
+    assert clone.owner() == deployer.address
+
+
+def test_clone_can_not_be_initialized_twice(clone, hec, shec, hec_staking, user):
+    with brownie.reverts("Initializable: contract is already initialized"):
+        clone.initializeClone(hec.address, shec.address, hec_staking.address, user, {"from": user})
+
+
+def test_implementation_can_not_be_initialized(clone, hec, shec, hec_staking, user):
+    implementation = AthanasiaHectorClone.at(get_athanasia_factory().implementation())
+    with brownie.reverts("Initializable: contract is already initialized"):
+        implementation.initializeClone(hec.address, shec.address, hec_staking.address, user, {"from": user})
+
+
+def test_implementation_and_factory_fit_contract_size_limit(clone):
+    # EIP-170 limit on the size of deployed code
+    factory = get_athanasia_factory()
+    assert len(brownie.web3.eth.get_code(factory.implementation())) <= 24576
+    assert len(brownie.web3.eth.get_code(factory.address)) <= 24576
+
+
+def test_clone_deposit_and_claim(clone, register_and_deposit, nft, hec, hec_staking, user):
+    register_and_deposit(clone)
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+    balance_before = hec.balanceOf(user)
+
+    clone.claim(nft.address, [1, 18], {"from": user})
+
+    assert hec.balanceOf(user) - balance_before == 2 * ONE_HECTOR // 10
+
+
+def test_clone_deploy_gas_compared_to_standalone(athanasia, hec, shec, hec_staking, deployer):
+    factory = get_athanasia_factory()
+    clone_tx = factory.deployClone(hec.address, shec.address, hec_staking.address, {"from": deployer})
+    standalone_gas = athanasia.tx.gas_used
+
+    assert clone_tx.gas_used * 10 < standalone_gas
+
+
+def test_clone_call_gas_compared_to_standalone(athanasia_rd, clone, register_and_deposit, nft, hec_staking, user):
+    register_and_deposit(clone)
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+
+    standalone_gas = athanasia_rd.claim(nft.address, [1, 18], {"from": user}).gas_used
+    clone_gas = clone.claim(nft.address, [1, 18], {"from": user}).gas_used
+
+    # Clones pay for the delegatecall and read the token and staking addresses from storage.
+    assert clone_gas > standalone_gas
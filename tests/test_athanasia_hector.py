@@ -1,83 +1,20 @@
 import pytest
 import brownie
-from brownie import AthanasiaHector, accounts
-from web3 import Web3
 from scripts.deploy import deploy_athanasia
-from scripts.utilities import get_deployer_account, get_user_account
 
 ONE_HECTOR = 10 ** 9
 ONE_FTM = 10 ** 18
 ONE_TOR = 10 ** 18
 
 
-@pytest.fixture(scope="function", autouse=True)
-def user():
-    return get_user_account()
-
-
-@pytest.fixture(scope="function", autouse=True)
-def deployer():
-    return get_deployer_account()
-
-
-@pytest.fixture(scope="function", autouse=True)
-def hec(MockHEC, deployer):
-    yield MockHEC.deploy({"from": deployer})
-
-
-@pytest.fixture(scope="function", autouse=True)
-def shec(MockSHEC, deployer):
-    yield MockSHEC.deploy({"from": deployer})
-
-
-@pytest.fixture(scope="function", autouse=True)
-def otc(MockHecOtc, shec, deployer):
-    yield MockHecOtc.deploy(False, shec.address, {"from": deployer})
-
-
-@pytest.fixture(scope="function", autouse=True)
-def tor(MockTOR, deployer):
-    yield MockTOR.deploy({"from": deployer})
-
-
-@pytest.fixture(scope="function", autouse=True)
-def hec_staking(hec, shec, MockHectorStaking, deployer):
-    hs = MockHectorStaking.deploy(
-        hec.address, shec.address, {"from": deployer}
-    )
-    hec.mint(hs.address, 1000 * ONE_HECTOR)
-    hs.setIndex(ONE_HECTOR)
-    yield hs
-
-
-@pytest.fixture(scope="function", autouse=True)
-def nft(MockNFTContract, deployer, user):
-    x = MockNFTContract.deploy({"from": deployer})
-    x.mint(user, 1)
-    x.mint(user, 18)
-    x.mint(user, 9272)
-    x.mint(deployer, 1337)
-    yield x
-
-
 def test_deploy_athanasia():
     contract = deploy_athanasia()
     assert contract is not None
 
 
-@pytest.fixture(scope="function", autouse=True)
-def athanasia(hec, shec, hec_staking, tor, otc, deployer, user):
-    # Mint 1000 HEC to deployer/user account
-    hec.mint(deployer, 1000 * ONE_HECTOR, {"from": deployer})
-    hec.mint(user, 100 * ONE_HECTOR, {"from": deployer})
-    # Mint 1000 sHEC to HectorStaking account
-    shec.mint(hec_staking.address, 100 * ONE_HECTOR, {"from": deployer})
-    athanasia_contract = deploy_athanasia()
-    # Approve AthanasiaHector to spend the HEC from deployer/user
-    hec.approve(athanasia_contract.address, 1000 * ONE_HECTOR, {"from": deployer})
-    tor.approve(athanasia_contract.address, 1000 * ONE_HECTOR, {"from": user})
-    # Set rebase index for hec staking
-    yield athanasia_contract
+def test_deployed_code_fits_contract_size_limit(athanasia):
+    # EIP-170 limit on the size of deployed code
+    assert len(brownie.web3.eth.get_code(athanasia.address)) <= 24576
 
 
 def test_initialize_not_callable_by_non_owner(athanasia, user):
@@ -90,11 +27,6 @@ def test_initialize_callable_by_owner(athanasia, deployer):
     assert athanasia.hectorOtcContract() == "0xfB7849f6Bfd365e5a3966048EF865A146cf15F24"
 
 
-@pytest.fixture(scope="function", autouse=True)
-def hec_otc(athanasia, otc, deployer):
-    athanasia.initialize(otc.address, {"from": deployer})
-
-
 def test_register_with_otc_fails_for_unauthorized_caller(athanasia, nft, user):
     with brownie.reverts("Athanasia: Only collection owner may register the collection"):
         athanasia.registerCollectionWithOtc(
@@ -272,19 +204,6 @@ def test_deposit_fails_when_collection_not_registered(athanasia, nft, user):
         athanasia.deposit(nft.address, [1], {"from": user})
 
 
-@pytest.fixture(scope="function", autouse=False)
-def athanasiaReg(athanasia, otc, nft, shec, deployer, user):
-    otc.registerCollection(
-        nft.address,
-        "0x0000000000000000000000000000000000000000",
-        5 * ONE_FTM,
-        10_000 * ONE_HECTOR,
-        {"from": deployer})
-    athanasia.registerCollection(nft.address, ONE_HECTOR, {"from": deployer})
-    shec.approve(athanasia.address, 100 * ONE_HECTOR, {"from": user})
-    yield athanasia
-
-
 def test_deposit_fails_when_caller_does_not_have_shec(athanasiaReg, nft, user):
     with brownie.reverts("ERC20: transfer amount exceeds balance"):
         athanasiaReg.deposit(nft.address, [1], {"from": user})
@@ -330,23 +249,6 @@ def test_deposit_with_otc_when_not_registered(athanasia, nft, user):
         athanasia.depositWithOtc(nft.address, [1], {"from": user})
 
 
-@pytest.fixture(scope="function", autouse=False)
-def athanasia_otc_ftm(athanasia, otc, nft, shec, deployer):
-    otc.registerCollection(
-        nft.address,
-        "0x0000000000000000000000000000000000000000",
-        5 * ONE_FTM,
-        10_000 * ONE_HECTOR,
-        {"from": deployer})
-    athanasia.registerCollectionWithOtc(
-        nft.address,
-        "0x0000000000000000000000000000000000000000",
-        5 * ONE_FTM,
-        ONE_HECTOR,
-        {"from": deployer})
-    yield athanasia
-
-
 def test_deposit_with_otc_fails_when_caller_does_not_send_ftm(athanasia_otc_ftm, nft, user):
     with brownie.reverts("Athanasia: Insufficient FTM funds for OTC"):
         athanasia_otc_ftm.depositWithOtc(nft.address, [1], {"from": user})
@@ -422,16 +324,6 @@ def test_deposit_with_otc_fails_multideposit_tor(athanasia_otc_tor, nft, shec, t
         athanasia_otc_tor.depositWithOtc(nft.address, [18, 9272], {"from": user})
 
 
-@pytest.fixture(scope="function", autouse=False)
-def athanasia_deposited(athanasia_otc_ftm, nft, shec, user, hec_staking):
-    # Borrow some ETH/FTM from other test account
-    accounts[-1].transfer(user, accounts[-1].balance())
-    accounts[-2].transfer(user, accounts[-2].balance())
-    athanasia_otc_ftm.depositWithOtc(nft.address, [1, 18, 9272], {"from": user, "amount": 15 * ONE_FTM})
-    hec_staking.setIndex(ONE_HECTOR)
-    yield athanasia_otc_ftm
-
-
 def test_claimable_balance_zero_with_no_rebases(athanasia_deposited, nft):
     assert athanasia_deposited.claimableBalance(nft.address, 1) == 0
 
@@ -513,8 +405,6 @@ def test_claim_twice_rebase_between_two_nfts(athanasia_deposited, nft, hec, hec_
 
 def test_claim_thrice_rebase_between_three_nfts(athanasia_deposited, nft, hec, shec, hec_staking, user, deployer):
     balance_before = hec.balanceOf(user)
-    # NOTE that rebase does not actually update the balance of athanasia, as it should.
-    # If needed in the future, perhaps it would be wise to implement properly in the mock.
     hec_staking.rebase(1200000000)
     athanasia_deposited.claim(nft.address, [1], {"from": user})
     hec_staking.rebase(1100000000)
@@ -529,6 +419,8 @@ def test_claim_thrice_rebase_between_three_nfts(athanasia_deposited, nft, hec, s
         871617000 +\
         891617000 +\
         1074534440
+    # The contract's sHEC rebased too, so the deposits stay backed after the rewards are paid out.
+    assert shec.balanceOf(athanasia_deposited) >= 3 * ONE_HECTOR
 
 
 def test_register_and_deposit_fails_for_invalid_caller(athanasia, nft, user, deployer):
@@ -576,14 +468,6 @@ def test_register_and_deposit_fails_reregistration(athanasia, nft, deployer, she
         athanasia.registerCollectionAndDeposit(nft.address, ONE_HECTOR, 1000, {"from": deployer})
 
 
-@pytest.fixture(scope="function", autouse=False)
-def athanasia_rd(athanasia, nft, deployer, shec):
-    shec.approve(athanasia.address, 10000 * ONE_HECTOR, {"from": deployer})
-    shec.mint(deployer, 10000 * ONE_HECTOR, {"from": deployer})
-    athanasia.registerCollectionAndDeposit(nft.address, ONE_HECTOR, 10000, {"from": deployer})
-    yield athanasia
-
-
 def test_rd_claim_returns_based_on_deposited_supply(athanasia_rd, nft, user, hec, hec_staking):
     hec_staking.rebase(1.1 * ONE_HECTOR)
     balance_before = hec.balanceOf(user)
@@ -662,10 +546,6 @@ def test_rd_claim_twice_rebase_between_two_nfts(athanasia_rd, nft, hec, hec_stak
 
 
 def test_rd_claim_thrice_rebase_between_three_nfts(athanasia_rd, nft, hec, shec, hec_staking, user, deployer):
-    # NOTE that rebase does not actually update the balance of athanasia, as it should.
-    # If needed in the future, perhaps it would be wise to implement properly in the mock.
-    # athanasia_rd.claim(nft.address, [1, 18, 9272], {"from": user})
-
     balance_before = hec.balanceOf(user)
 
     hec_staking.rebase(1200000000)
@@ -685,11 +565,7 @@ def test_rd_claim_thrice_rebase_between_three_nfts(athanasia_rd, nft, hec, shec,
     # NFT #18  : (1.2*1.1/1.0 - 1) + (1.2*1.1*1.571617/(1.2*1.1) - 1) = 0.32 + 0.571617
     # NFT #9272: (1.2*1.1*1.571617/1.0 - 1) = 1.07453444
     assert hec.balanceOf(user) == balance_before + 871617000 + 891617000 + 1074534440
-
-
-@pytest.fixture(scope="function", autouse=False)
-def v2(MockV2, deployer):
-    yield MockV2.deploy({"from": deployer})
+    assert shec.balanceOf(athanasia_rd) >= 10000 * ONE_HECTOR
 
 
 def test_set_upgrade_address_not_callable_by_non_owner(athanasia_rd, v2, user):
@@ -702,12 +578,6 @@ def test_set_upgrade_address_sets_contract_address(athanasia_rd, v2, deployer):
     assert athanasia_rd.v2contract() == v2.address
 
 
-@pytest.fixture(scope="function", autouse=False)
-def upgradable_athanasia(athanasia_rd, v2, deployer):
-    athanasia_rd.setUpgradeAddress(v2.address, {"from": deployer})
-    yield athanasia_rd
-
-
 @pytest.mark.parametrize("tokens", [[1], [1, 1337], [1337, 9272], [1, 18, 9272]])
 def test_upgrade_not_callable_by_nonowners(upgradable_athanasia, nft, deployer, tokens):
     with brownie.reverts("Athanasia: Only NFT owner can upgrade"):
@@ -945,4 +815,80 @@ def test_register_and_deposit_otc_tor_fails_on_reregistration(athanasia, otc, to
             tor.address,
             15 * ONE_TOR,
             {"from": deployer}
-        )
\ No newline at end of file
+        )
+
+def test_collection_info_packed_values_are_range_checked(athanasia, nft, deployer):
+    with brownie.reverts("SafeCast: value doesn't fit in 96 bits"):
+        athanasia.registerCollection(nft.address, 2 ** 96, {"from": deployer})
+
+
+def _mint_batch(nft, owner, first_token_id, count):
+    token_ids = list(range(first_token_id, first_token_id + count))
+    for token_id in token_ids:
+        nft.mint(owner, token_id)
+    return token_ids
+
+
+def test_upgrade_status_words_do_not_leak_to_neighbours(upgradable_athanasia, nft, user):
+    tokens = _mint_batch(nft, user, 255, 3)
+    upgradable_athanasia.upgrade(nft.address, [tokens[1]], {"from": user})
+
+    assert upgradable_athanasia.upgradeStatus(nft.address, 255) == False
+    assert upgradable_athanasia.upgradeStatus(nft.address, 256) == True
+    assert upgradable_athanasia.upgradeStatus(nft.address, 257) == False
+
+
+def test_upgrade_reverts_on_duplicate_token_in_batch(upgradable_athanasia, nft, user):
+    with brownie.reverts("Athanasia: Some already upgraded"):
+        upgradable_athanasia.upgrade(nft.address, [18, 1, 18], {"from": user})
+
+
+def test_claim_does_not_checkpoint_tokens_without_deposit(athanasia_otc_ftm, nft, hec_staking, user):
+    athanasia_otc_ftm.depositWithOtc(nft.address, [1], {"from": user, "amount": 5 * ONE_FTM})
+
+    athanasia_otc_ftm.claim(nft.address, [1, 18], {"from": user})
+    hec_staking.rebase(1.2 * ONE_HECTOR)
+
+    assert athanasia_otc_ftm.stakingIndexes(nft.address, 18) == 0
+    assert athanasia_otc_ftm.claimableBalance(nft.address, 18) == 0
+    athanasia_otc_ftm.depositWithOtc(nft.address, [18], {"from": user, "amount": 5 * ONE_FTM})
+
+
+def test_deposit_counts_batch_once(athanasiaReg, nft, shec, deployer, user):
+    shec.mint(user, 3 * ONE_HECTOR, {"from": deployer})
+
+    athanasiaReg.deposit(nft.address, [1, 18], {"from": user})
+    athanasiaReg.deposit(nft.address, [9272], {"from": user})
+
+    assert athanasiaReg.collections(nft.address)[4] == 3
+
+
+def test_staking_index_history_records_distinct_indexes(athanasia_deposited, nft, hec_staking, user):
+    hec_staking.rebase(1.2 * ONE_HECTOR)
+    athanasia_deposited.claim(nft.address, [1], {"from": user})
+    athanasia_deposited.claim(nft.address, [18], {"from": user})
+
+    assert athanasia_deposited.stakingIndexHistoryLength() == 2
+    assert athanasia_deposited.stakingIndexHistory(0) == ONE_HECTOR
+    assert athanasia_deposited.stakingIndexHistory(1) == 1.2 * ONE_HECTOR
+
+
+def test_packed_checkpoints_of_neighbouring_tokens_are_independent(athanasiaReg, nft, shec, hec_staking, deployer, user):
+    tokens = _mint_batch(nft, user, 2000, 9)
+    shec.mint(user, 9 * ONE_HECTOR, {"from": deployer})
+
+    athanasiaReg.deposit(nft.address, tokens[:3], {"from": user})
+    hec_staking.rebase(1.2 * ONE_HECTOR)
+    athanasiaReg.deposit(nft.address, tokens[3:], {"from": user})
+    athanasiaReg.claim(nft.address, [tokens[1]], {"from": user})
+
+    assert [athanasiaReg.stakingIndexes(nft.address, t) for t in tokens] == \
+        [ONE_HECTOR, 1.2 * ONE_HECTOR, ONE_HECTOR] + [1.2 * ONE_HECTOR] * 6
+    assert athanasiaReg.stakingIndexes(nft.address, 2009) == 0
+
+
+def test_deposit_fails_on_duplicate_token_in_batch(athanasiaReg, nft, shec, deployer, user):
+    shec.mint(user, 3 * ONE_HECTOR, {"from": deployer})
+
+    with brownie.reverts("Athanasia: Token already deposited"):
+        athanasiaReg.deposit(nft.address, [18, 1, 18], {"from": user})
@@ -0,0 +1,77 @@
+import json
+
+import pytest
+from scripts.batch_sender import BatchSender, load_token_ids, otc_amount
+
+ONE_HECTOR = 10 ** 9
+ONE_FTM = 10 ** 18
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+TOKENS = list(range(100, 300))
+
+
+@pytest.fixture(scope="function", autouse=False)
+def minted(nft, user, deployer):
+    nft.mintBatch(user, TOKENS[0], len(TOKENS), {"from": deployer})
+
+
+def test_load_token_ids_skips_header(tmp_path):
+    path = tmp_path / "tokens.csv"
+    path.write_text("tokenId,owner\n1,0xabc\n18,0xabc\n\n9272,0xdef\n")
+
+    assert load_token_ids(path) == [1, 18, 9272]
+
+
+def test_claims_are_split_under_gas_ceiling(athanasia, minted, nft, shec, hec, hec_staking, deployer, user):
+    shec.mint(deployer, 10000 * ONE_HECTOR, {"from": deployer})
+    shec.approve(athanasia.address, 10000 * ONE_HECTOR, {"from": deployer})
+    athanasia.registerCollectionAndDeposit(nft.address, ONE_HECTOR, 10000, {"from": deployer})
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+    balance_before = hec.balanceOf(user)
+
+    txs = BatchSender(athanasia, "claim", nft.address, user, max_gas=500_000).send(TOKENS)
+
+    assert len(txs) > 1
+    assert all(tx.gas_used <= 500_000 for tx in txs)
+    assert hec.balanceOf(user) == balance_before + len(TOKENS) * ONE_HECTOR // 10
+    assert athanasia.claimableBalance(nft.address, TOKENS[-1]) == 0
+
+
+def test_deposit_with_otc_pays_exact_ftm_per_chunk(athanasia, minted, otc, nft, shec, deployer, user):
+    otc.registerCollection(nft.address, ZERO_ADDRESS, ONE_FTM // 10, 10_000 * ONE_HECTOR, {"from": deployer})
+    athanasia.registerCollectionWithOtc(nft.address, ZERO_ADDRESS, ONE_FTM // 10, ONE_HECTOR, {"from": deployer})
+
+    txs = BatchSender(athanasia, "depositWithOtc", nft.address, user, max_gas=1_000_000).send(TOKENS)
+
+    assert len(txs) > 1
+    # Each chunk pays the exact price of its tokens, as any excess would stay in the contract.
+    assert [tx.value for tx in txs] == [
+        otc_amount(athanasia.collections(nft.address), len(tx.events["Deposit"])) for tx in txs]
+    assert athanasia.balance() == 0
+    assert otc.balance() == len(TOKENS) * ONE_FTM // 10
+    assert shec.balanceOf(athanasia) == len(TOKENS) * ONE_HECTOR
+
+
+def test_sender_resumes_from_state_file(athanasia, minted, nft, shec, deployer, user, tmp_path):
+    athanasia.registerCollection(nft.address, ONE_HECTOR, {"from": deployer})
+    shec.mint(user, len(TOKENS) * ONE_HECTOR, {"from": deployer})
+    state_path = tmp_path / "state.json"
+
+    # The last token does not exist, so the run stops once the others are deposited.
+    with pytest.raises(RuntimeError):
+        BatchSender(athanasia, "deposit", nft.address, user, max_gas=1_000_000, state_path=state_path) \
+            .send(TOKENS[:150] + [99999])
+    assert set(json.loads(state_path.read_text())["done"]) == set(TOKENS[:150])
+
+    # A transaction sent by the interrupted run, but not yet confirmed in its state.
+    shec.approve(athanasia.address, 10 * ONE_HECTOR, {"from": user})
+    tx = athanasia.deposit(nft.address, TOKENS[150:160], {"from": user})
+    state = json.loads(state_path.read_text())
+    state["pending"] = [{"tx": tx.txid, "tokenIds": TOKENS[150:160]}]
+    state_path.write_text(json.dumps(state))
+
+    sender = BatchSender(athanasia, "deposit", nft.address, user, max_gas=1_000_000, state_path=state_path)
+    txs = sender.send(TOKENS)
+
+    assert sum(len(tx.events["Deposit"]) for tx in txs) == len(TOKENS) - 160
+    assert all(athanasia.stakingIndexes(nft.address, token_id) != 0 for token_id in TOKENS[::10])
+    assert set(json.loads(state_path.read_text())["done"]) == set(TOKENS)
@@ -0,0 +1,63 @@
+import brownie
+
+ONE_HECTOR = 10 ** 9
+
+
+def test_claim_all_owned_claims_every_owned_token(athanasia_rd, nft, hec, hec_staking, user):
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+    balance_before = hec.balanceOf(user)
+
+    athanasia_rd.claimAllOwned(nft.address, 0, 10, {"from": user})
+
+    assert hec.balanceOf(user) == balance_before + 3 * ONE_HECTOR // 10
+    for token_id in [1, 18, 9272]:
+        assert athanasia_rd.claimableBalance(nft.address, token_id) == 0
+
+
+def test_claim_all_owned_pages(athanasia_rd, nft, hec, hec_staking, user):
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+
+    # Tokens are enumerated in mint order: 1, 18, 9272
+    athanasia_rd.claimAllOwned(nft.address, 1, 1, {"from": user})
+
+    assert athanasia_rd.claimableBalance(nft.address, 1) == 0.1 * ONE_HECTOR
+    assert athanasia_rd.claimableBalance(nft.address, 18) == 0
+    assert athanasia_rd.claimableBalance(nft.address, 9272) == 0.1 * ONE_HECTOR
+
+
+def test_claim_all_owned_skips_upgraded(upgradable_athanasia, nft, hec, hec_staking, user):
+    upgradable_athanasia.upgrade(nft.address, [18], {"from": user})
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+    balance_before = hec.balanceOf(user)
+
+    upgradable_athanasia.claimAllOwned(nft.address, 0, 10, {"from": user})
+
+    assert hec.balanceOf(user) == balance_before + 2 * 0.1 * ONE_HECTOR
+
+
+def test_claim_all_owned_with_offset_past_balance_does_nothing(athanasia_rd, nft, hec, hec_staking, user):
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+    balance_before = hec.balanceOf(user)
+
+    athanasia_rd.claimAllOwned(nft.address, 3, 10, {"from": user})
+
+    assert hec.balanceOf(user) == balance_before
+
+
+def test_claim_all_owned_fails_for_non_enumerable_collection(athanasia_rd, hec, user):
+    with brownie.reverts("Athanasia: Collection not enumerable"):
+        athanasia_rd.claimAllOwned(hec.address, 0, 10, {"from": user})
+
+
+def test_claimable_balance_of_owner_matches_claim_all_owned(athanasia_rd, nft, hec_staking, user):
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+
+    (token_ids, withdrawable) = athanasia_rd.claimableBalanceOfOwner(nft.address, user, 0, 2)
+
+    assert list(token_ids) == [1, 18]
+    assert withdrawable == 2 * 0.1 * ONE_HECTOR
+
+
+def test_claimable_balance_of_owner_fails_for_non_enumerable_collection(athanasia_rd, hec, user):
+    with brownie.reverts("Athanasia: Collection not enumerable"):
+        athanasia_rd.claimableBalanceOfOwner(hec.address, user, 0, 10)
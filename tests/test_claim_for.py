@@ -0,0 +1,93 @@
+import pytest
+import brownie
+from brownie import accounts
+from scripts.relayer import next_batch, relay, sign_claim
+
+ONE_HECTOR = 10 ** 9
+
+
+@pytest.fixture(scope="function", autouse=False)
+def holders(nft, deployer):
+    first, second = accounts.add(), accounts.add()
+    nft.mint(first, 2000, {"from": deployer})
+    nft.mint(first, 2001, {"from": deployer})
+    nft.mint(second, 2002, {"from": deployer})
+    yield first, second
+
+
+def _signed(claim):
+    return (claim["owner"], claim["collection"], claim["tokenIds"], claim["deadline"], claim["signature"])
+
+
+def test_claim_for_pays_each_holder(athanasia_rd, nft, hec, hec_staking, holders, user):
+    first, second = holders
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+    claims = [
+        sign_claim(athanasia_rd, first, nft.address, [2000, 2001]),
+        sign_claim(athanasia_rd, second, nft.address, [2002]),
+    ]
+
+    athanasia_rd.claimFor([_signed(c) for c in claims], {"from": user})
+
+    assert hec.balanceOf(first) == 2 * ONE_HECTOR // 10
+    assert hec.balanceOf(second) == ONE_HECTOR // 10
+    assert athanasia_rd.nonces(first) == 1
+    assert athanasia_rd.nonces(second) == 1
+
+
+def test_claim_for_rejects_replay(athanasia_rd, nft, holders, user):
+    claim = _signed(sign_claim(athanasia_rd, holders[0], nft.address, [2000]))
+    athanasia_rd.claimFor([claim], {"from": user})
+
+    with brownie.reverts("Athanasia: Invalid signature"):
+        athanasia_rd.claimFor([claim], {"from": user})
+
+
+def test_claim_for_rejects_signature_of_non_owner(athanasia_rd, nft, holders, user):
+    first, second = holders
+    claim = sign_claim(athanasia_rd, second, nft.address, [2000])
+    claim["owner"] = first.address
+
+    with brownie.reverts("Athanasia: Invalid signature"):
+        athanasia_rd.claimFor([_signed(claim)], {"from": user})
+
+
+def test_claim_for_rejects_expired_signature(athanasia_rd, nft, holders, user, chain):
+    claim = sign_claim(athanasia_rd, holders[0], nft.address, [2000], deadline=chain.time() + 60)
+    chain.sleep(120)
+
+    with brownie.reverts("Athanasia: Signature expired"):
+        athanasia_rd.claimFor([_signed(claim)], {"from": user})
+
+
+def test_relay_submits_gas_bounded_batches(athanasia_rd, nft, hec, hec_staking, holders, user):
+    first, second = holders
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+    claims = [
+        sign_claim(athanasia_rd, first, nft.address, [2000]),
+        sign_claim(athanasia_rd, first, nft.address, [2001], nonce=1),
+        sign_claim(athanasia_rd, second, nft.address, [2002]),
+    ]
+    single_claim_gas = athanasia_rd.claimFor.estimate_gas([_signed(claims[2])], {"from": user})
+
+    txs = relay(athanasia_rd, claims, user, max_gas=single_claim_gas)
+
+    assert len(txs) == 3
+    assert hec.balanceOf(first) == 2 * ONE_HECTOR // 10
+    assert hec.balanceOf(second) == ONE_HECTOR // 10
+    assert relay(athanasia_rd, claims, user) == []
+
+
+def test_next_batch_takes_longest_run_within_budget(athanasia_rd, nft, hec_staking, holders, user):
+    first, second = holders
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+    claims = [
+        sign_claim(athanasia_rd, first, nft.address, [2000]),
+        sign_claim(athanasia_rd, first, nft.address, [2001], nonce=1),
+        sign_claim(athanasia_rd, second, nft.address, [2002]),
+    ]
+    two_claims_gas = athanasia_rd.claimFor.estimate_gas([_signed(c) for c in claims[:2]], {"from": user})
+
+    assert next_batch(athanasia_rd, claims, user, max_gas=two_claims_gas) == (claims[:2], [])
+    # The second claim of a holder can not go first, as its nonce is not yet current.
+    assert next_batch(athanasia_rd, claims[1:], user) == (claims[2:], claims[1:2])
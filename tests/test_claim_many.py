@@ -0,0 +1,25 @@
+import brownie
+
+ONE_HECTOR = 10 ** 9
+
+
+def test_claim_many_claims_all_collections(athanasia_rd2, nft, nft2, hec, hec_staking, user):
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+    balance_before = hec.balanceOf(user)
+
+    athanasia_rd2.claimMany([nft.address, nft2.address], [[1, 18], [1, 2, 3]], {"from": user})
+
+    assert hec.balanceOf(user) == balance_before + 2 * ONE_HECTOR // 10 + 3 * 2 * ONE_HECTOR // 10
+    for token_id in [1, 2, 3]:
+        assert athanasia_rd2.claimableBalance(nft2.address, token_id) == 0
+    assert athanasia_rd2.claimableBalance(nft.address, 9272) == ONE_HECTOR // 10
+
+
+def test_claim_many_fails_on_length_mismatch(athanasia_rd2, nft, nft2, user):
+    with brownie.reverts("Athanasia: Length mismatch"):
+        athanasia_rd2.claimMany([nft.address, nft2.address], [[1]], {"from": user})
+
+
+def test_claim_many_fails_when_caller_not_owner(athanasia_rd2, nft, nft2, user):
+    with brownie.reverts("Athanasia: Not owner"):
+        athanasia_rd2.claimMany([nft2.address, nft.address], [[1], [1337]], {"from": user})
@@ -0,0 +1,65 @@
+import brownie
+
+ONE_HECTOR = 10 ** 9
+
+
+def _assert_matches_single_token_view(athanasia, collection, token_ids, result):
+    (withdrawable, indexes, upgraded, total) = result
+    assert list(withdrawable) == [athanasia.claimableBalance(collection, token_id) for token_id in token_ids]
+    assert list(upgraded) == [athanasia.upgradeStatus(collection, token_id) for token_id in token_ids]
+    assert total == sum(withdrawable)
+    assert len(indexes) == len(token_ids)
+
+
+def test_claimable_balances_matches_single_token_view(athanasia_deposited, nft, hec_staking, user):
+    tokens = [1, 18, 9272, 1337, 100]
+    hec_staking.rebase(1.2 * ONE_HECTOR)
+    athanasia_deposited.claim(nft.address, [18], {"from": user})
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+
+    result = athanasia_deposited.claimableBalances(nft.address, tokens)
+
+    _assert_matches_single_token_view(athanasia_deposited, nft.address, tokens, result)
+    assert list(result[1]) == [ONE_HECTOR, 1.2 * ONE_HECTOR, ONE_HECTOR, 0, 0]
+
+
+def test_claimable_balances_reports_upgraded_tokens(upgradable_athanasia, nft, hec_staking, user):
+    upgradable_athanasia.upgrade(nft.address, [18], {"from": user})
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+
+    result = upgradable_athanasia.claimableBalances(nft.address, [1, 18])
+
+    _assert_matches_single_token_view(upgradable_athanasia, nft.address, [1, 18], result)
+    assert list(result[2]) == [False, True]
+
+
+def test_claimable_balances_in_range_matches_single_token_view(athanasia_rd, nft, hec_staking, user):
+    hec_staking.rebase(1.2 * ONE_HECTOR)
+    athanasia_rd.claim(nft.address, [1], {"from": user})
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+
+    result = athanasia_rd.claimableBalancesInRange(nft.address, 0, 20)
+
+    _assert_matches_single_token_view(athanasia_rd, nft.address, list(range(0, 20)), result)
+
+
+def test_claimable_balances_in_range_fails_for_inverted_range(athanasia_rd, nft):
+    with brownie.reverts("Athanasia: Invalid token range"):
+        athanasia_rd.claimableBalancesInRange(nft.address, 20, 10)
+
+
+def test_claimable_balances_many_matches_single_token_view(athanasia_rd, nft, shec, hec_staking, deployer):
+    shec.approve(athanasia_rd.address, 100 * ONE_HECTOR, {"from": deployer})
+    shec.mint(deployer, 100 * ONE_HECTOR, {"from": deployer})
+    athanasia_rd.registerCollectionAndDeposit(deployer, 2 * ONE_HECTOR, 50, {"from": deployer})
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+    collections = [nft.address, deployer.address]
+    token_ids = [[1, 18, 9272], [1, 50, 51]]
+
+    (withdrawable, totals, total) = athanasia_rd.claimableBalancesMany(collections, token_ids)
+
+    for i in range(len(collections)):
+        assert list(withdrawable[i]) == [athanasia_rd.claimableBalance(collections[i], t) for t in token_ids[i]]
+        assert totals[i] == sum(withdrawable[i])
+    assert total == sum(totals)
+    assert total == 3 * ONE_HECTOR // 10 + 2 * 2 * ONE_HECTOR // 10
@@ -0,0 +1,63 @@
+import pytest
+from scripts.claimable import claimable_balances, load_token_state
+
+ONE_HECTOR = 10 ** 9
+TOKENS = [0, 1, 18, 1337, 9272, 10000, 10001]
+
+
+@pytest.fixture(scope="function", autouse=False)
+def athanasia_deposited(athanasia, nft, shec, deployer, user):
+    athanasia.registerCollection(nft.address, ONE_HECTOR, {"from": deployer})
+    shec.mint(user, 3 * ONE_HECTOR, {"from": deployer})
+    shec.approve(athanasia.address, 3 * ONE_HECTOR, {"from": user})
+    athanasia.deposit(nft.address, [1, 18, 9272], {"from": user})
+    yield athanasia
+
+
+def _assert_matches_chain(athanasia, collection, hec_staking):
+    info, checkpoints, upgraded = load_token_state(athanasia, collection, TOKENS)
+    expected = [athanasia.claimableBalance(collection, token_id) for token_id in TOKENS]
+    assert list(claimable_balances(info, TOKENS, checkpoints, upgraded, hec_staking.index())) == expected
+
+
+def _rebase_and_claim(athanasia, nft, hec_staking, user):
+    # Same rebases and claims as the test_claim_thrice_rebase_between_three_nfts scenarios.
+    _assert_matches_chain(athanasia, nft.address, hec_staking)
+    hec_staking.rebase(1200000000)
+    _assert_matches_chain(athanasia, nft.address, hec_staking)
+    athanasia.claim(nft.address, [1], {"from": user})
+    hec_staking.rebase(1100000000)
+    _assert_matches_chain(athanasia, nft.address, hec_staking)
+    athanasia.claim(nft.address, [1, 18], {"from": user})
+    hec_staking.rebase(1571617000)
+    _assert_matches_chain(athanasia, nft.address, hec_staking)
+    athanasia.claim(nft.address, [1, 18, 9272], {"from": user})
+    _assert_matches_chain(athanasia, nft.address, hec_staking)
+
+
+def test_engine_matches_chain_for_per_token_deposits(athanasia_deposited, nft, hec_staking, user):
+    _rebase_and_claim(athanasia_deposited, nft, hec_staking, user)
+
+
+def test_engine_matches_chain_for_deposit_on_register(athanasia_rd, nft, hec_staking, user):
+    _rebase_and_claim(athanasia_rd, nft, hec_staking, user)
+
+
+def test_engine_matches_chain_for_upgraded_tokens(athanasia_rd, v2, nft, hec_staking, deployer, user):
+    athanasia_rd.setUpgradeAddress(v2.address, {"from": deployer})
+    athanasia_rd.upgrade(nft.address, [18], {"from": user})
+    hec_staking.rebase(1200000000)
+    _assert_matches_chain(athanasia_rd, nft.address, hec_staking)
+
+
+def test_engine_matches_chain_at_historical_indexes(athanasia_rd, nft, hec_staking, user):
+    hec_staking.rebase(1200000000)
+    athanasia_rd.claim(nft.address, [1], {"from": user})
+    info, checkpoints, upgraded = load_token_state(athanasia_rd, nft.address, TOKENS)
+    indexes = [ONE_HECTOR, 1100000000, 1200000000, 1500000000, 2000000000]
+
+    amounts = claimable_balances(info, TOKENS, checkpoints, upgraded, indexes)
+
+    for row, index in zip(amounts, indexes):
+        hec_staking.setIndex(index)
+        assert list(row) == [athanasia_rd.claimableBalance(nft.address, token_id) for token_id in TOKENS]
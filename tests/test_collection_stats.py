@@ -0,0 +1,86 @@
+import pytest
+
+ONE_HECTOR = 10 ** 9
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+
+@pytest.fixture(scope="function", autouse=False)
+def athanasia_stats(athanasia, v2, nft, MockNFTContract, shec, deployer, user):
+    athanasia.registerCollection(nft.address, ONE_HECTOR, {"from": deployer})
+    shec.mint(user, 3 * ONE_HECTOR, {"from": deployer})
+    shec.approve(athanasia.address, 3 * ONE_HECTOR, {"from": user})
+    athanasia.deposit(nft.address, [1, 18, 9272], {"from": user})
+
+    nft2 = MockNFTContract.deploy({"from": deployer})
+    nft2.mintBatch(user, 1, 20, {"from": deployer})
+    shec.mint(deployer, 40 * ONE_HECTOR, {"from": deployer})
+    shec.approve(athanasia.address, 40 * ONE_HECTOR, {"from": deployer})
+    athanasia.registerCollectionAndDeposit(nft2.address, 2 * ONE_HECTOR, 20, {"from": deployer})
+    athanasia.setUpgradeAddress(v2.address, {"from": deployer})
+    yield athanasia, nft2
+
+
+def _brute_force_stats(athanasia, collection, token_ids, txs):
+    deposit_amount = athanasia.collections(collection)[0]
+    withdrawable, indexes, upgraded, _ = athanasia.claimableBalances(collection, token_ids)
+    principal = outstanding = tokens_upgraded = 0
+    for amount, index, is_upgraded in zip(withdrawable, indexes, upgraded):
+        if is_upgraded:
+            tokens_upgraded += 1
+        elif index != 0:
+            principal += deposit_amount
+            outstanding += amount
+    claimed = sum(e["withdrawAmount"] for tx in txs for e in tx.events["Claim"] if e["collection"] == collection)
+    return principal, claimed, tokens_upgraded, outstanding
+
+
+def _assert_stats_match(stats, brute_force, token_count):
+    principal, claimed, tokens_upgraded, outstanding = brute_force
+    assert stats[0] == principal
+    assert stats[1] == claimed
+    assert stats[2] == tokens_upgraded
+    # Claims round each token down, the aggregate rounds its weights and then the total once.
+    assert outstanding - 1 <= stats[4] <= outstanding + token_count
+
+
+def test_collection_stats_match_brute_force(athanasia_stats, nft, hec_staking, user):
+    athanasia, nft2 = athanasia_stats
+    tokens = [1, 18, 9272]
+    tokens2 = list(range(1, 21))
+    txs = []
+
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+    txs.append(athanasia.claim(nft.address, [1], {"from": user}))
+    txs.append(athanasia.claim(nft2.address, [1, 2, 3, 4, 5], {"from": user}))
+    hec_staking.rebase(1.2345 * ONE_HECTOR)
+    txs.append(athanasia.claimStaked(nft2.address, [3, 6], {"from": user}))
+    txs.append(athanasia.claimMany([nft.address, nft2.address], [[1, 18], [7, 8]], {"from": user}))
+    athanasia.upgrade(nft.address, [1], {"from": user})
+    athanasia.upgrade(nft2.address, [7, 8], {"from": user})
+    hec_staking.rebase(1.05 * ONE_HECTOR)
+
+    brute_force = _brute_force_stats(athanasia, nft.address, tokens, txs)
+    _assert_stats_match(athanasia.collectionStats(nft.address), brute_force, len(tokens))
+    brute_force2 = _brute_force_stats(athanasia, nft2.address, tokens2, txs)
+    _assert_stats_match(athanasia.collectionStats(nft2.address), brute_force2, len(tokens2))
+
+    total = [a + b for a, b in zip(brute_force, brute_force2)]
+    _assert_stats_match(athanasia.collectionStats(ZERO_ADDRESS), total, len(tokens) + len(tokens2))
+    assert total[1] > 0 and total[2] == 3
+
+
+def test_collection_stats_are_cleared_by_migration(athanasia_stats, hec_staking, user, deployer):
+    athanasia, nft2 = athanasia_stats
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+    athanasia.claim(nft2.address, [1, 2], {"from": user})
+    athanasia.upgrade(nft2.address, [1], {"from": user})
+    hec_staking.rebase(1.2 * ONE_HECTOR)
+
+    athanasia.setMigrationEnabled(nft2.address, True, {"from": deployer})
+    athanasia.migrateCollection(nft2.address, 1, 11, {"from": deployer})
+    athanasia.migrateCollection(nft2.address, 11, 21, {"from": deployer})
+
+    principal, claimed, tokens_upgraded, weighted, outstanding = athanasia.collectionStats(nft2.address)
+    assert (principal, weighted, outstanding) == (0, 0, 0)
+    assert tokens_upgraded == 20
+    assert claimed == 2 * 2 * ONE_HECTOR // 10
@@ -0,0 +1,188 @@
+import pytest
+import brownie
+from brownie import accounts
+
+ONE_HECTOR = 10 ** 9
+ONE_FTM = 10 ** 18
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+
+@pytest.fixture(scope="function", autouse=False)
+def athanasia_otc_deferred(athanasia_otc_ftm, nft, deployer):
+    athanasia_otc_ftm.setDeferredOtc(nft.address, True, {"from": deployer})
+    yield athanasia_otc_ftm
+
+
+PENDING_OTC_INDEX = 2 ** 256 - 1
+
+
+def test_set_deferred_otc_not_callable_by_holder(athanasia_otc_ftm, nft, user):
+    with brownie.reverts("Athanasia: Only collection owner may configure OTC deferral"):
+        athanasia_otc_ftm.setDeferredOtc(nft.address, True, {"from": user})
+
+
+def test_set_deferred_otc_refused_for_collection_deposited_on_register(athanasia, otc, nft, deployer):
+    otc.registerCollection(nft.address, ZERO_ADDRESS, 0.005 * ONE_FTM, 10_000 * ONE_HECTOR, {"from": deployer})
+    athanasia.registerCollectionAndDepositWithOtc(
+        nft.address, ONE_HECTOR, 10_000, ZERO_ADDRESS, 0.005 * ONE_FTM, {"from": deployer, "amount": 50 * ONE_FTM})
+
+    # A cancelled purchase would leave its tokens with the checkpoint of the deposit on register.
+    with brownie.reverts("Athanasia: Collection deposited on register"):
+        athanasia.setDeferredOtc(nft.address, True, {"from": deployer})
+
+
+def test_deferred_deposit_collects_payment_without_purchase(athanasia_otc_deferred, otc, nft, shec, user):
+    tx = athanasia_otc_deferred.depositWithOtc(nft.address, [1, 18], {"from": user, "amount": 10 * ONE_FTM})
+
+    assert tx.events["DepositBatch"]["stakingIndex"] == PENDING_OTC_INDEX
+    assert otc.purchases(nft.address) == 0
+    assert shec.balanceOf(athanasia_otc_deferred) == 0
+    assert athanasia_otc_deferred.balance() == 10 * ONE_FTM
+    amount_to_purchase, amount_purchased, paid, epoch, collected = athanasia_otc_deferred.pendingOtc(nft.address)
+    assert (amount_to_purchase, amount_purchased, paid, collected) == (2 * ONE_HECTOR, 0, 10 * ONE_FTM, 10 * ONE_FTM)
+    assert athanasia_otc_deferred.otcPayments(epoch, user) == 10 * ONE_FTM
+    assert athanasia_otc_deferred.stakingIndexes(nft.address, 18) == PENDING_OTC_INDEX
+    # Pending deposits are not backed yet.
+    assert athanasia_otc_deferred.collectionStats(nft.address)[0] == 0
+
+
+def test_settle_otc_purchases_pending_deposits_at_once(athanasia_otc_deferred, otc, nft, shec, hec_staking, user):
+    athanasia_otc_deferred.depositWithOtc(nft.address, [1], {"from": user, "amount": 5 * ONE_FTM})
+    athanasia_otc_deferred.depositWithOtc(nft.address, [18, 9272], {"from": user, "amount": 10 * ONE_FTM})
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+
+    # Anyone may settle.
+    tx = athanasia_otc_deferred.settleOtc(nft.address, {"from": accounts[2]})
+
+    assert tx.events["OtcSettled"]["amountPurchased"] == 3 * ONE_HECTOR
+    assert tx.events["OtcSettled"]["stakingIndex"] == hec_staking.index()
+    assert otc.purchases(nft.address) == 1
+    assert otc.balance() == 15 * ONE_FTM
+    assert shec.balanceOf(athanasia_otc_deferred) == 3 * ONE_HECTOR
+    assert athanasia_otc_deferred.pendingOtc(nft.address) == (0, 0, 0, 0, 0)
+    assert athanasia_otc_deferred.stakingIndexes(nft.address, 18) == hec_staking.index()
+    assert athanasia_otc_deferred.collectionStats(nft.address)[0] == 3 * ONE_HECTOR
+    with brownie.reverts("Athanasia: No pending OTC deposits"):
+        athanasia_otc_deferred.settleOtc(nft.address, {"from": user})
+
+
+def test_partial_settlement_starts_earning_with_last_purchase(athanasia_otc_deferred, otc, nft, shec, hec_staking, user):
+    athanasia_otc_deferred.depositWithOtc(nft.address, [1, 18, 9272], {"from": user, "amount": 15 * ONE_FTM})
+
+    tx = athanasia_otc_deferred.settleOtc(nft.address, ONE_HECTOR, {"from": user})
+
+    assert tx.events["OtcSettled"]["stakingIndex"] == 0
+    assert shec.balanceOf(athanasia_otc_deferred) == ONE_HECTOR
+    assert athanasia_otc_deferred.pendingOtc(nft.address)[:3] == (3 * ONE_HECTOR, ONE_HECTOR, 10 * ONE_FTM)
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+    # Nothing is earned until all pending deposits are purchased.
+    assert athanasia_otc_deferred.claimableBalance(nft.address, 1) == 0
+
+    athanasia_otc_deferred.settleOtc(nft.address, 5 * ONE_HECTOR, {"from": user})
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+
+    assert otc.purchases(nft.address) == 2
+    assert otc.purchased(nft.address) == 3 * ONE_HECTOR
+    assert athanasia_otc_deferred.claimableBalance(nft.address, 1) == ONE_HECTOR // 10
+
+
+def test_claim_of_unsettled_deposit_waits_for_settlement(athanasia_otc_deferred, nft, hec, hec_staking, user):
+    athanasia_otc_deferred.depositWithOtc(nft.address, [1, 18], {"from": user, "amount": 10 * ONE_FTM})
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+    balance_before = hec.balanceOf(user)
+
+    tx = athanasia_otc_deferred.claim(nft.address, [1, 18], {"from": user})
+
+    assert tx.events["Claim"][0]["withdrawAmount"] == 0
+    assert hec.balanceOf(user) == balance_before
+    assert athanasia_otc_deferred.stakingIndexes(nft.address, 1) == PENDING_OTC_INDEX
+
+    # The rebase before the settlement is not earned.
+    athanasia_otc_deferred.settleOtc(nft.address, {"from": user})
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+    athanasia_otc_deferred.claim(nft.address, [1, 18], {"from": user})
+    assert hec.balanceOf(user) == balance_before + 2 * ONE_HECTOR // 10
+
+
+def test_unsettled_deposit_can_not_be_upgraded(athanasia_otc_deferred, v2, nft, deployer, user):
+    athanasia_otc_deferred.depositWithOtc(nft.address, [1], {"from": user, "amount": 5 * ONE_FTM})
+    athanasia_otc_deferred.setUpgradeAddress(v2.address, {"from": deployer})
+
+    with brownie.reverts("Athanasia: Must claim before upgrade"):
+        athanasia_otc_deferred.upgrade(nft.address, [1], {"from": user})
+
+    athanasia_otc_deferred.settleOtc(nft.address, {"from": user})
+    athanasia_otc_deferred.upgrade(nft.address, [1], {"from": user})
+
+
+def test_deferred_payments_round_up_and_keep_surplus(athanasia, otc, nft, shec, deployer, user):
+    # 1/3 HEC at a price which is not a whole number of wei per HEC unit.
+    deposit_amount = ONE_HECTOR // 3
+    otc_price = 5 * ONE_FTM + 1
+    otc.registerCollection(nft.address, ZERO_ADDRESS, otc_price, 10_000 * ONE_HECTOR, {"from": deployer})
+    athanasia.registerCollectionWithOtc(nft.address, ZERO_ADDRESS, otc_price, deposit_amount, {"from": deployer})
+    athanasia.setDeferredOtc(nft.address, True, {"from": deployer})
+    cost = -(-deposit_amount * otc_price // ONE_HECTOR)
+    for token_id in [1, 18, 9272]:
+        athanasia.depositWithOtc(nft.address, [token_id], {"from": user, "amount": cost})
+
+    # Purchases split in any way are covered by the payments.
+    athanasia.settleOtc(nft.address, 1, {"from": user})
+    athanasia.settleOtc(nft.address, {"from": user})
+
+    settled_cost = otc.balance()
+    surplus = 3 * cost - settled_cost
+    assert surplus > 0
+    assert athanasia.pendingOtc(nft.address) == (0, 0, 0, 0, 0)
+    assert athanasia.otcSurplus(nft.address) == surplus
+    assert shec.balanceOf(athanasia) == 3 * deposit_amount
+
+    # The surplus is swept by the owner.
+    with brownie.reverts("Ownable: caller is not the owner"):
+        athanasia.sweepOtcSurplus(nft.address, user, {"from": user})
+    treasury = accounts[3]
+    balance_before = treasury.balance()
+    athanasia.sweepOtcSurplus(nft.address, treasury, {"from": deployer})
+    assert treasury.balance() == balance_before + surplus
+    assert athanasia.otcSurplus(nft.address) == 0
+
+
+def test_cancel_otc_refunds_each_payer(athanasia_otc_deferred, otc, nft, shec, deployer, user):
+    payer = accounts[2]
+    deposits_done = athanasia_otc_deferred.collections(nft.address)[4]
+    athanasia_otc_deferred.depositWithOtc(nft.address, [1, 18], {"from": user, "amount": 10 * ONE_FTM})
+    athanasia_otc_deferred.depositWithOtc(nft.address, [9272], {"from": payer, "amount": 5 * ONE_FTM})
+    athanasia_otc_deferred.settleOtc(nft.address, ONE_HECTOR, {"from": user})
+    otc.setFailAlways(True, {"from": deployer})
+    with brownie.reverts("OTC"):
+        athanasia_otc_deferred.settleOtc(nft.address, {"from": user})
+
+    with brownie.reverts("Ownable: caller is not the owner"):
+        athanasia_otc_deferred.cancelOtc(nft.address, {"from": user})
+    tx = athanasia_otc_deferred.cancelOtc(nft.address, {"from": deployer})
+
+    epoch = tx.events["OtcCancelled"]["epoch"]
+    assert tx.events["OtcCancelled"]["refundable"] == 10 * ONE_FTM
+    assert tx.events["OtcCancelled"]["underlyingRefundable"] == ONE_HECTOR
+    assert athanasia_otc_deferred.collections(nft.address)[4] == deposits_done
+    assert athanasia_otc_deferred.stakingIndexes(nft.address, 1) == 0
+    with brownie.reverts("Athanasia: No pending OTC deposits"):
+        athanasia_otc_deferred.cancelOtc(nft.address, {"from": deployer})
+
+    # Each payer withdraws its share of the payments left and of the sHEC bought, once.
+    for account, paid in [(user, 10 * ONE_FTM), (payer, 5 * ONE_FTM)]:
+        balance_before = account.balance()
+        tx = athanasia_otc_deferred.withdrawOtcRefund(epoch, {"from": account, "gas_price": 0})
+        assert account.balance() - balance_before == paid * 10 * ONE_FTM // (15 * ONE_FTM)
+        assert shec.balanceOf(account) == paid * ONE_HECTOR // (15 * ONE_FTM)
+        assert tx.events["OtcRefunded"]["payer"] == account
+        with brownie.reverts("Athanasia: Nothing to refund"):
+            athanasia_otc_deferred.withdrawOtcRefund(epoch, {"from": account})
+    with brownie.reverts("Athanasia: Nothing to refund"):
+        athanasia_otc_deferred.withdrawOtcRefund(epoch, {"from": deployer})
+
+    # The tokens may be deposited again once the OTC accepts purchases.
+    otc.setFailAlways(False, {"from": deployer})
+    athanasia_otc_deferred.setDeferredOtc(nft.address, False, {"from": deployer})
+    athanasia_otc_deferred.depositWithOtc(nft.address, [1, 18], {"from": user, "amount": 10 * ONE_FTM})
+    assert athanasia_otc_deferred.collections(nft.address)[4] == deposits_done + 2
@@ -0,0 +1,89 @@
+import pytest
+import brownie
+from scripts.eligibility import EligibilityTree
+
+ONE_HECTOR = 10 ** 9
+
+
+@pytest.fixture(scope="function", autouse=False)
+def eligibility_tree():
+    # Token 1 is minted but not eligible, the others are not consecutive.
+    yield EligibilityTree([18, 1337, 9272])
+
+
+@pytest.fixture(scope="function", autouse=False)
+def athanasia_root(athanasia, eligibility_tree, nft, shec, deployer):
+    shec.mint(deployer, 3 * ONE_HECTOR, {"from": deployer})
+    shec.approve(athanasia.address, 3 * ONE_HECTOR, {"from": deployer})
+    athanasia.registerCollectionAndDepositWithRoot(nft.address, ONE_HECTOR, 3, eligibility_tree.root, {"from": deployer})
+    yield athanasia
+
+
+def test_register_with_root_deposits_for_collection_in_one_transaction(athanasia_root, nft, shec, hec_staking):
+    info = athanasia_root.collections(nft.address)
+    assert info[3] == hec_staking.index()
+    assert info[4] == 3
+    assert info[6]
+    assert athanasia_root.eligibilityRoots(nft.address)[2] == 3
+    assert shec.balanceOf(athanasia_root) == 3 * ONE_HECTOR
+    assert athanasia_root.collectionStats(nft.address)[0] == 3 * ONE_HECTOR
+
+
+def test_claim_with_proofs_pays_from_registration(athanasia_root, eligibility_tree, nft, hec, hec_staking, user):
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+    # Nothing is claimable before the tokens are proven eligible.
+    assert athanasia_root.claimableBalance(nft.address, 18) == 0
+    balance_before = hec.balanceOf(user)
+
+    tx = athanasia_root.claimWithProofs(nft.address, [18, 9272], eligibility_tree.proofs([18, 9272]), {"from": user})
+
+    assert tx.events["EligibilityProven"]["tokenIds"] == [18, 9272]
+    assert hec.balanceOf(user) == balance_before + 2 * ONE_HECTOR // 10
+    assert athanasia_root.stakingIndexes(nft.address, 18) == 11 * ONE_HECTOR // 10
+
+    # Proven tokens claim with empty proofs afterwards.
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+    tx = athanasia_root.claimWithProofs(nft.address, [18, 9272], [[], []], {"from": user})
+    assert "EligibilityProven" not in tx.events
+    assert hec.balanceOf(user) == balance_before + 4 * ONE_HECTOR // 10
+
+
+def test_prove_eligibility_is_permissionless(athanasia_root, eligibility_tree, nft, hec_staking, user):
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+    # The holder of 1337 is the deployer.
+    athanasia_root.proveEligibility(nft.address, [1337], eligibility_tree.proofs([1337]), {"from": user})
+
+    assert athanasia_root.claimableBalance(nft.address, 1337) == ONE_HECTOR // 10
+
+
+def test_prove_eligibility_rejects_token_outside_root(athanasia_root, eligibility_tree, nft, user):
+    with brownie.reverts("Athanasia: Invalid eligibility proof"):
+        athanasia_root.claimWithProofs(nft.address, [1], eligibility_tree.proofs([18]), {"from": user})
+
+
+def test_prove_eligibility_fails_for_collection_without_root(athanasia_rd, eligibility_tree, nft, user):
+    with brownie.reverts("Athanasia: Collection not registered with eligibility root"):
+        athanasia_rd.proveEligibility(nft.address, [18], eligibility_tree.proofs([18]), {"from": user})
+
+
+def test_prove_eligibility_is_capped_by_deposited_count(athanasia, eligibility_tree, nft, shec, deployer, user):
+    shec.mint(deployer, 2 * ONE_HECTOR, {"from": deployer})
+    shec.approve(athanasia.address, 2 * ONE_HECTOR, {"from": deployer})
+    # The root has three leaves, but only two deposits are paid for.
+    athanasia.registerCollectionAndDepositWithRoot(nft.address, ONE_HECTOR, 2, eligibility_tree.root, {"from": deployer})
+    athanasia.proveEligibility(nft.address, [18, 9272], eligibility_tree.proofs([18, 9272]), {"from": user})
+
+    with brownie.reverts("Athanasia: More tokens proven than deposited"):
+        athanasia.proveEligibility(nft.address, [1337], eligibility_tree.proofs([1337]), {"from": user})
+
+
+def test_upgrade_requires_proven_eligibility(athanasia_root, eligibility_tree, v2, nft, deployer, user):
+    athanasia_root.setUpgradeAddress(v2.address, {"from": deployer})
+    with brownie.reverts("Athanasia: Must claim before upgrade"):
+        athanasia_root.upgrade(nft.address, [18], {"from": user})
+
+    athanasia_root.proveEligibility(nft.address, [18], eligibility_tree.proofs([18]), {"from": user})
+    athanasia_root.upgrade(nft.address, [18], {"from": user})
+
+    principal, _, tokens_upgraded, _, _ = athanasia_root.collectionStats(nft.address)
+    assert (principal, tokens_upgraded) == (2 * ONE_HECTOR, 1)
@@ -0,0 +1,98 @@
+import brownie
+
+ONE_HECTOR = 10 ** 9
+ONE_FTM = 10 ** 18
+
+
+def test_deposit_with_otc_emits_deposit_per_token(athanasia_otc_ftm, nft, user):
+    tx = athanasia_otc_ftm.depositWithOtc(nft.address, [1, 18], {"from": user, "amount": 10 * ONE_FTM})
+
+    assert [e["tokenId"] for e in tx.events["Deposit"]] == [1, 18]
+    assert tx.events["Deposit"][0]["depositor"] == user
+    assert tx.events["Deposit"][0]["collection"] == nft.address
+    assert tx.events["Deposit"][0]["despositAmount"] == ONE_HECTOR
+    assert tx.events["StakingIndexRecorded"]["stakingIndex"] == ONE_HECTOR
+
+
+def test_deposit_emits_deposit_per_token(athanasiaReg, nft, shec, deployer, user):
+    shec.mint(user, ONE_HECTOR, {"from": deployer})
+
+    tx = athanasiaReg.deposit(nft.address, [9272], {"from": user})
+
+    assert tx.events["Deposit"]["tokenId"] == 9272
+
+
+def test_register_and_deposit_emits_collection_deposit(athanasia, nft, deployer, shec):
+    shec.approve(athanasia.address, 1000 * ONE_HECTOR, {"from": deployer})
+    shec.mint(deployer, 1000 * ONE_HECTOR, {"from": deployer})
+
+    tx = athanasia.registerCollectionAndDeposit(nft.address, ONE_HECTOR, 1000, {"from": deployer})
+
+    assert tx.events["CollectionDeposit"]["collection"] == nft.address
+    assert tx.events["CollectionDeposit"]["collectionSize"] == 1000
+    assert tx.events["CollectionDeposit"]["depositAmount"] == ONE_HECTOR
+
+
+def test_register_and_deposit_with_otc_emits_collection_deposit(athanasia, otc, nft, deployer):
+    otc.registerCollection(nft.address, "0x0000000000000000000000000000000000000000", 0.005 * ONE_FTM, 10_000 * ONE_HECTOR, {"from": deployer})
+
+    tx = athanasia.registerCollectionAndDepositWithOtc(
+        nft.address,
+        ONE_HECTOR,
+        10_000,
+        "0x0000000000000000000000000000000000000000",
+        0.005 * ONE_FTM,
+        {"from": deployer, "amount": 0.005 * ONE_FTM * 10_000}
+    )
+
+    assert tx.events["CollectionDeposit"]["collectionSize"] == 10_000
+
+
+def test_claim_emits_claim_per_token(athanasia_deposited, nft, hec_staking, user):
+    hec_staking.rebase(1.2 * ONE_HECTOR)
+    athanasia_deposited.claim(nft.address, [18], {"from": user})
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+
+    tx = athanasia_deposited.claim(nft.address, [1, 18], {"from": user})
+
+    assert [(e["tokenId"], e["withdrawAmount"]) for e in tx.events["Claim"]] == [(1, 320000000), (18, 100000000)]
+    assert tx.events["Claim"][0]["owner"] == user
+    assert tx.events["StakingIndexRecorded"]["stakingIndex"] == 1320000000
+
+
+def test_upgrade_emits_upgrade_per_token(upgradable_athanasia, nft, user):
+    tx = upgradable_athanasia.upgrade(nft.address, [9272, 1], {"from": user})
+
+    assert [e["tokenId"] for e in tx.events["Upgrade"]] == [9272, 1]
+
+
+def test_set_compact_events_not_callable_by_non_owner(athanasia, user):
+    with brownie.reverts("Ownable: caller is not the owner"):
+        athanasia.setCompactEvents(True, {"from": user})
+
+
+def test_compact_events_emit_one_log_per_batch(upgradable_athanasia, nft, shec, hec_staking, deployer, user):
+    upgradable_athanasia.setCompactEvents(True, {"from": deployer})
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+
+    claim_tx = upgradable_athanasia.claim(nft.address, [1, 18], {"from": user})
+    upgrade_tx = upgradable_athanasia.upgrade(nft.address, [1, 18], {"from": user})
+
+    assert "Claim" not in claim_tx.events
+    assert list(claim_tx.events["ClaimBatch"]["tokenIds"]) == [1, 18]
+    assert claim_tx.events["ClaimBatch"]["withdrawAmount"] == 2 * ONE_HECTOR // 10
+    assert claim_tx.events["ClaimBatch"]["stakingIndex"] == 1.1 * ONE_HECTOR
+    assert "Upgrade" not in upgrade_tx.events
+    assert list(upgrade_tx.events["UpgradeBatch"]["tokenIds"]) == [1, 18]
+
+
+def test_compact_deposit_event(athanasiaReg, nft, shec, deployer, user):
+    athanasiaReg.setCompactEvents(True, {"from": deployer})
+    shec.mint(user, 2 * ONE_HECTOR, {"from": deployer})
+
+    tx = athanasiaReg.deposit(nft.address, [1, 18], {"from": user})
+
+    assert "Deposit" not in tx.events
+    assert list(tx.events["DepositBatch"]["tokenIds"]) == [1, 18]
+    assert tx.events["DepositBatch"]["depositAmount"] == ONE_HECTOR
+    assert tx.events["DepositBatch"]["stakingIndex"] == ONE_HECTOR
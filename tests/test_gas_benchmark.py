@@ -0,0 +1,352 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+from brownie import web3
+
+ONE_HECTOR = 10 ** 9
+ONE_FTM = 10 ** 18
+ONE_TOR = 10 ** 18
+
+BATCH_SIZES = [1, 10, 100, 1000]
+FIRST_TOKEN_ID = 2000
+MINT_CHUNK = 50
+# Share of the extrapolated largest deposit batch actually deposited.
+DEPOSIT_BATCH_MARGIN = 0.9
+
+BASELINE_PATH = Path(__file__).parent / "gas_baseline.json"
+# Each pytest-xdist worker reports the benchmarks it ran in its own file
+WORKER = os.environ.get("PYTEST_XDIST_WORKER")
+REPORT_PATH = Path(__file__).parent.parent / "reports" / (f"gas_benchmark.{WORKER}.json" if WORKER else "gas_benchmark.json")
+UPDATE_BASELINE = os.environ.get("UPDATE_GAS_BASELINE") == "1"
+
+
+@pytest.fixture(scope="module")
+def gas_baseline():
+    with open(BASELINE_PATH) as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope="module")
+def batch_report():
+    # Largest batches that fit in a block, by operation, written to the gas report.
+    yield {}
+
+
+@pytest.fixture(scope="module")
+def gas_report(gas_baseline, batch_report):
+    measured = {}
+    yield measured
+
+    threshold = gas_baseline["threshold"]
+    results = {}
+    for name, gas_used in sorted(measured.items()):
+        expected = gas_baseline["gas_used"].get(name)
+        results[name] = {
+            "gas_used": gas_used,
+            "baseline": expected,
+            "change": None if expected is None else (gas_used - expected) / expected,
+        }
+    REPORT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(REPORT_PATH, "w") as f:
+        json.dump({"threshold": threshold, "results": results, "max_batch": batch_report}, f, indent=2)
+
+    if UPDATE_BASELINE:
+        gas_baseline["gas_used"].update(measured)
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(gas_baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+
+def _record(gas_report, gas_baseline, name, tx):
+    gas_report[name] = tx.gas_used
+    if UPDATE_BASELINE:
+        return
+    expected = gas_baseline["gas_used"].get(name)
+    if expected is None:
+        # Reported as skipped, so that unchecked entry points show up in every run.
+        pytest.skip(f"{name} used {tx.gas_used} gas and has no baseline in {BASELINE_PATH.name}, "
+                    f"record it with UPDATE_GAS_BASELINE=1")
+    limit = expected * (1 + gas_baseline["threshold"])
+    assert tx.gas_used <= limit, \
+        f"{name} used {tx.gas_used} gas, baseline is {expected} (+{gas_baseline['threshold']:.0%} allowed)"
+
+
+def _mint(nft, owner, count, first_token_id=FIRST_TOKEN_ID):
+    for offset in range(0, count, MINT_CHUNK):
+        nft.mintBatch(owner, first_token_id + offset, min(MINT_CHUNK, count - offset))
+    return list(range(first_token_id, first_token_id + count))
+
+
+@pytest.fixture(scope="function", autouse=False)
+def registered(athanasia, otc, nft, tor, deployer):
+    otc.registerCollection(nft.address, tor.address, 30 * ONE_TOR, 10_000 * ONE_HECTOR, {"from": deployer})
+    athanasia.registerCollectionWithOtc(nft.address, tor.address, 30 * ONE_TOR, ONE_HECTOR, {"from": deployer})
+    yield athanasia
+
+
+@pytest.fixture(scope="function", autouse=False)
+def register_deposited(athanasia, nft, shec, deployer):
+    shec.mint(deployer, 10000 * ONE_HECTOR, {"from": deployer})
+    shec.approve(athanasia.address, 10000 * ONE_HECTOR, {"from": deployer})
+    athanasia.registerCollectionAndDeposit(nft.address, ONE_HECTOR, 10000, {"from": deployer})
+    yield athanasia
+
+
+def test_benchmark_register_collection(athanasia, nft, deployer, gas_report, gas_baseline):
+    tx = athanasia.registerCollection(nft.address, ONE_HECTOR, {"from": deployer})
+    _record(gas_report, gas_baseline, "registerCollection", tx)
+
+
+def test_benchmark_register_collection_with_otc(athanasia, otc, nft, tor, deployer, gas_report, gas_baseline):
+    otc.registerCollection(nft.address, tor.address, 30 * ONE_TOR, 10_000 * ONE_HECTOR, {"from": deployer})
+    tx = athanasia.registerCollectionWithOtc(nft.address, tor.address, 30 * ONE_TOR, ONE_HECTOR, {"from": deployer})
+    _record(gas_report, gas_baseline, "registerCollectionWithOtc", tx)
+
+
+def test_benchmark_register_collection_and_deposit(athanasia, nft, shec, deployer, gas_report, gas_baseline):
+    shec.mint(deployer, 10000 * ONE_HECTOR, {"from": deployer})
+    shec.approve(athanasia.address, 10000 * ONE_HECTOR, {"from": deployer})
+    tx = athanasia.registerCollectionAndDeposit(nft.address, ONE_HECTOR, 10000, {"from": deployer})
+    _record(gas_report, gas_baseline, "registerCollectionAndDeposit", tx)
+
+
+def test_benchmark_register_collection_and_deposit_with_otc(athanasia, otc, nft, tor, deployer, gas_report,
+                                                            gas_baseline):
+    otc.registerCollection(nft.address, tor.address, 30 * ONE_TOR, 10_000 * ONE_HECTOR, {"from": deployer})
+    tor.mint(deployer, 10000 * 30 * ONE_TOR, {"from": deployer})
+    tor.approve(athanasia.address, 10000 * 30 * ONE_TOR, {"from": deployer})
+    tx = athanasia.registerCollectionAndDepositWithOtc(
+        nft.address, ONE_HECTOR, 10000, tor.address, 30 * ONE_TOR, {"from": deployer})
+    _record(gas_report, gas_baseline, "registerCollectionAndDepositWithOtc", tx)
+
+
+@pytest.mark.parametrize("batch_size", BATCH_SIZES)
+def test_benchmark_deposit(registered, nft, shec, user, batch_size, gas_report, gas_baseline):
+    tokens = _mint(nft, user, batch_size)
+    shec.mint(user, batch_size * ONE_HECTOR, {"from": user})
+    shec.approve(registered.address, batch_size * ONE_HECTOR, {"from": user})
+
+    tx = registered.deposit(nft.address, tokens, {"from": user})
+    _record(gas_report, gas_baseline, f"deposit[{batch_size}]", tx)
+
+
+@pytest.mark.parametrize("batch_size", BATCH_SIZES)
+def test_benchmark_deposit_with_otc(registered, nft, tor, user, batch_size, gas_report, gas_baseline):
+    tokens = _mint(nft, user, batch_size)
+    tor.mint(user, batch_size * 30 * ONE_TOR, {"from": user})
+    tor.approve(registered.address, batch_size * 30 * ONE_TOR, {"from": user})
+
+    tx = registered.depositWithOtc(nft.address, tokens, {"from": user})
+    _record(gas_report, gas_baseline, f"depositWithOtc[{batch_size}]", tx)
+
+
+@pytest.mark.parametrize("batch_size", BATCH_SIZES)
+def test_benchmark_claim(register_deposited, nft, hec_staking, user, batch_size, gas_report, gas_baseline):
+    tokens = _mint(nft, user, batch_size)
+    hec_staking.rebase(11 * ONE_HECTOR // 10)
+
+    tx = register_deposited.claim(nft.address, tokens, {"from": user})
+    _record(gas_report, gas_baseline, f"claim[{batch_size}]", tx)
+
+
+@pytest.mark.parametrize("batch_size", BATCH_SIZES)
+def test_benchmark_upgrade(register_deposited, v2, nft, user, deployer, batch_size, gas_report, gas_baseline):
+    tokens = _mint(nft, user, batch_size)
+    register_deposited.setUpgradeAddress(v2.address, {"from": deployer})
+
+    tx = register_deposited.upgrade(nft.address, tokens, {"from": user})
+    _record(gas_report, gas_baseline, f"upgrade[{batch_size}]", tx)
+
+
+def test_benchmark_deposit_max_batch(registered, nft, shec, user, gas_report, batch_report):
+    # The cost of a deposit is linear in the batch length, so one token and 50 tokens extrapolate the largest batch.
+    block_gas_limit = web3.eth.get_block("latest").gasLimit
+    tokens = _mint(nft, user, 51)
+    shec.approve(registered.address, 2 ** 256 - 1, {"from": user})
+    shec.mint(user, 51 * ONE_HECTOR, {"from": user})
+    single = registered.deposit(nft.address, tokens[:1], {"from": user}).gas_used
+    fifty = registered.deposit(nft.address, tokens[1:], {"from": user}).gas_used
+    max_batch = int((block_gas_limit - single) / ((fifty - single) / 49)) + 1
+    batch_report["deposit"] = {"max_batch": max_batch, "block_gas_limit": block_gas_limit}
+
+    batch = _mint(nft, user, int(DEPOSIT_BATCH_MARGIN * max_batch), FIRST_TOKEN_ID + 51)
+    shec.mint(user, len(batch) * ONE_HECTOR, {"from": user})
+    tx = registered.deposit(nft.address, batch, {"from": user})
+
+    assert tx.gas_used < block_gas_limit
+    assert registered.collections(nft.address)[4] == 51 + len(batch)
+
+
+def test_register_and_deposit_cheaper_than_legacy(athanasia, legacy_athanasia, nft, deployer, shec):
+    shec.approve(athanasia.address, 1000 * ONE_HECTOR, {"from": deployer})
+    shec.approve(legacy_athanasia.address, 1000 * ONE_HECTOR, {"from": deployer})
+    shec.mint(deployer, 2000 * ONE_HECTOR, {"from": deployer})
+
+    legacy_tx = legacy_athanasia.registerCollectionAndDeposit(nft.address, ONE_HECTOR, 1000, {"from": deployer})
+    tx = athanasia.registerCollectionAndDeposit(nft.address, ONE_HECTOR, 1000, {"from": deployer})
+
+    assert tx.gas_used < legacy_tx.gas_used
+
+
+def test_deposit_with_otc_cheaper_than_legacy(athanasia_otc_ftm, legacy_athanasia, nft, deployer, user):
+    legacy_athanasia.registerCollectionWithOtc(
+        nft.address,
+        "0x0000000000000000000000000000000000000000",
+        5 * ONE_FTM,
+        ONE_HECTOR,
+        {"from": deployer})
+
+    legacy_tx = legacy_athanasia.depositWithOtc(nft.address, [1, 18, 9272], {"from": user, "amount": 15 * ONE_FTM})
+    tx = athanasia_otc_ftm.depositWithOtc(nft.address, [1, 18, 9272], {"from": user, "amount": 15 * ONE_FTM})
+
+    assert tx.gas_used < legacy_tx.gas_used
+
+
+def test_claim_cheaper_than_legacy(athanasia_rd, legacy_athanasia, nft, shec, hec_staking, deployer, user):
+    shec.approve(legacy_athanasia.address, 10000 * ONE_HECTOR, {"from": deployer})
+    shec.mint(deployer, 10000 * ONE_HECTOR, {"from": deployer})
+    legacy_athanasia.registerCollectionAndDeposit(nft.address, ONE_HECTOR, 10000, {"from": deployer})
+    hec_staking.rebase(1.2 * ONE_HECTOR)
+
+    legacy_tx = legacy_athanasia.claim(nft.address, [1, 18, 9272], {"from": user})
+    tx = athanasia_rd.claim(nft.address, [1, 18, 9272], {"from": user})
+
+    assert tx.gas_used < legacy_tx.gas_used
+
+
+@pytest.mark.parametrize("batch_size", [1, 50])
+def test_upgrade_cheaper_than_legacy(upgradable_athanasia, legacy_upgradable, nft, user, batch_size):
+    tokens = _mint(nft, user, batch_size)
+
+    legacy_tx = legacy_upgradable.upgrade(nft.address, tokens, {"from": user})
+    tx = upgradable_athanasia.upgrade(nft.address, tokens, {"from": user})
+
+    assert tx.gas_used < legacy_tx.gas_used
+
+
+def test_upgrade_500_cheaper_than_legacy(upgradable_athanasia, legacy_upgradable, nft, user):
+    # A 500 token upgrade does not fit in a block on the legacy contract, so its cost is
+    # extrapolated from the 1 and 50 token batches, which grow linearly with the batch size.
+    tokens = _mint(nft, user, 551)
+    legacy_single = legacy_upgradable.upgrade(nft.address, tokens[:1], {"from": user}).gas_used
+    legacy_fifty = legacy_upgradable.upgrade(nft.address, tokens[1:51], {"from": user}).gas_used
+    legacy_per_token = (legacy_fifty - legacy_single) / 49
+
+    tx = upgradable_athanasia.upgrade(nft.address, tokens[51:], {"from": user})
+
+    assert tx.gas_used < legacy_single + 499 * legacy_per_token
+
+
+def test_claim_gas_per_token_curve(athanasia_rd, legacy_upgradable, nft, hec_staking, user):
+    batch_sizes = [1, 10, 50, 100, 200, 300]
+    tokens = _mint(nft, user, sum(batch_sizes) + 51)
+    hec_staking.rebase(1.2 * ONE_HECTOR)
+
+    legacy_single = legacy_upgradable.claim(nft.address, tokens[:1], {"from": user}).gas_used
+    legacy_fifty = legacy_upgradable.claim(nft.address, tokens[1:51], {"from": user}).gas_used
+    legacy_per_token = (legacy_fifty - legacy_single) / 49
+
+    curve = {}
+    offset = 51
+    for batch_size in batch_sizes:
+        batch = tokens[offset:offset + batch_size]
+        offset += batch_size
+        curve[batch_size] = athanasia_rd.claim(nft.address, batch, {"from": user}).gas_used
+
+    for smaller, larger in zip(batch_sizes, batch_sizes[1:]):
+        # Amortised cost per token only goes down as batches grow
+        assert curve[larger] / larger < curve[smaller] / smaller
+        # Marginal cost per token is below the legacy per-token cost
+        assert (curve[larger] - curve[smaller]) / (larger - smaller) < legacy_per_token
+
+
+def test_deposit_cheaper_than_legacy(athanasiaReg, legacy_athanasia, nft, shec, deployer, user):
+    tokens = _mint(nft, user, 50)
+    legacy_athanasia.registerCollection(nft.address, ONE_HECTOR, {"from": deployer})
+    shec.approve(legacy_athanasia.address, 100 * ONE_HECTOR, {"from": user})
+    shec.mint(user, 100 * ONE_HECTOR, {"from": deployer})
+
+    legacy_tx = legacy_athanasia.deposit(nft.address, tokens, {"from": user})
+    tx = athanasiaReg.deposit(nft.address, tokens, {"from": user})
+
+    assert tx.gas_used < legacy_tx.gas_used
+
+
+def test_claim_many_cheaper_than_sequential_claims(athanasia_rd2, nft, nft2, hec, hec_staking, user, chain):
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+    balance_before = hec.balanceOf(user)
+
+    sequential_gas = athanasia_rd2.claim(nft.address, [1, 18, 9272], {"from": user}).gas_used
+    sequential_gas += athanasia_rd2.claim(nft2.address, [1, 2, 3], {"from": user}).gas_used
+    sequential_balance = hec.balanceOf(user)
+    chain.undo(2)
+
+    tx = athanasia_rd2.claimMany([nft.address, nft2.address], [[1, 18, 9272], [1, 2, 3]], {"from": user})
+
+    assert tx.gas_used < sequential_gas
+    assert hec.balanceOf(user) == sequential_balance
+    assert sequential_balance > balance_before
+
+
+def _storage_writes(tx):
+    return sum(1 for step in tx.trace if step["op"] == "SSTORE")
+
+
+def test_contiguous_deposit_writes_several_times_fewer_slots_than_legacy(athanasiaReg, legacy_athanasia, nft, shec, deployer, user):
+    tokens = _mint(nft, user, 51)
+    legacy_athanasia.registerCollection(nft.address, ONE_HECTOR, {"from": deployer})
+    shec.approve(legacy_athanasia.address, 100 * ONE_HECTOR, {"from": user})
+    shec.mint(user, 102 * ONE_HECTOR, {"from": deployer})
+
+    legacy_single = _storage_writes(legacy_athanasia.deposit(nft.address, tokens[:1], {"from": user}))
+    legacy_fifty = _storage_writes(legacy_athanasia.deposit(nft.address, tokens[1:], {"from": user}))
+    single = _storage_writes(athanasiaReg.deposit(nft.address, tokens[:1], {"from": user}))
+    fifty = _storage_writes(athanasiaReg.deposit(nft.address, tokens[1:], {"from": user}))
+
+    # Legacy writes an index and the counter per token, 98 more writes for 49 more tokens. Tokens 2001-2050 add
+    # at most the 6 checkpoint words after the one of token 2000.
+    assert legacy_fifty - legacy_single == 98
+    assert fifty - single <= 6
+
+
+def test_contiguous_claim_writes_several_times_fewer_slots_than_legacy(athanasia_rd, legacy_upgradable, nft, hec_staking, user):
+    tokens = _mint(nft, user, 51)
+    hec_staking.rebase(1.2 * ONE_HECTOR)
+
+    legacy_single = _storage_writes(legacy_upgradable.claim(nft.address, tokens[:1], {"from": user}))
+    legacy_fifty = _storage_writes(legacy_upgradable.claim(nft.address, tokens[1:], {"from": user}))
+    single = _storage_writes(athanasia_rd.claim(nft.address, tokens[:1], {"from": user}))
+    fifty = _storage_writes(athanasia_rd.claim(nft.address, tokens[1:], {"from": user}))
+
+    assert (fifty - single) * 3 < legacy_fifty - legacy_single
+
+
+def test_compact_events_cheaper_than_per_token_events(athanasia_rd, nft, hec_staking, deployer, user, chain):
+    tokens = _mint(nft, user, 50)
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+
+    per_token_gas = athanasia_rd.claim(nft.address, tokens, {"from": user}).gas_used
+    chain.undo()
+    athanasia_rd.setCompactEvents(True, {"from": deployer})
+    compact_gas = athanasia_rd.claim(nft.address, tokens, {"from": user}).gas_used
+
+    assert compact_gas < per_token_gas
+
+
+def test_claims_from_float_and_staked_claims_are_cheaper(athanasia_rd, nft, shec, hec_staking, deployer, user, chain):
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+    athanasia_rd.claim(nft.address, [1], {"from": user})
+
+    unstake_gas = athanasia_rd.claim(nft.address, [18], {"from": user}).gas_used
+    chain.undo()
+    staked_gas = athanasia_rd.claimStaked(nft.address, [18], {"from": user}).gas_used
+    chain.undo()
+    athanasia_rd.setHecFloatTarget(ONE_HECTOR, {"from": deployer})
+    shec.mint(athanasia_rd, ONE_HECTOR, {"from": deployer})
+    athanasia_rd.claim(nft.address, [9272], {"from": user})
+    float_gas = athanasia_rd.claim(nft.address, [18], {"from": user}).gas_used
+
+    assert float_gas < unstake_gas
+    assert staked_gas < unstake_gas
@@ -0,0 +1,97 @@
+import brownie
+
+ONE_HECTOR = 10 ** 9
+
+
+def test_claim_staked_pays_shec(athanasia_rd, nft, hec, shec, hec_staking, user):
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+    hec_before = hec.balanceOf(user)
+
+    athanasia_rd.claimStaked(nft.address, [1, 18], {"from": user})
+
+    assert shec.balanceOf(user) == 2 * ONE_HECTOR // 10
+    assert hec.balanceOf(user) == hec_before
+    assert shec.balanceOf(athanasia_rd) == 11000 * ONE_HECTOR - 2 * ONE_HECTOR // 10
+    assert athanasia_rd.claimableBalance(nft.address, 1) == 0
+
+
+def test_set_hec_float_target_not_callable_by_non_owner(athanasia_rd, user):
+    with brownie.reverts("Ownable: caller is not the owner"):
+        athanasia_rd.setHecFloatTarget(ONE_HECTOR, {"from": user})
+
+
+def test_hec_float_is_refilled_by_one_unstake(athanasia_rd, nft, hec, shec, hec_staking, deployer, user):
+    athanasia_rd.setHecFloatTarget(ONE_HECTOR, {"from": deployer})
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+    # sHEC beyond what the deposits are owed
+    shec.mint(athanasia_rd, ONE_HECTOR, {"from": deployer})
+    hec_before = hec.balanceOf(user)
+
+    athanasia_rd.claim(nft.address, [1], {"from": user})
+
+    assert hec.balanceOf(user) - hec_before == ONE_HECTOR // 10
+    assert athanasia_rd.hecFloat() == ONE_HECTOR
+    assert hec.balanceOf(athanasia_rd) == ONE_HECTOR
+    assert shec.balanceOf(athanasia_rd) == 11000 * ONE_HECTOR - ONE_HECTOR // 10
+
+
+def test_hec_float_is_not_refilled_from_owed_shec(athanasia_rd, nft, hec, shec, hec_staking, deployer, user):
+    athanasia_rd.setHecFloatTarget(ONE_HECTOR, {"from": deployer})
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+
+    athanasia_rd.claim(nft.address, [1], {"from": user})
+
+    assert athanasia_rd.hecFloat() == 0
+    assert hec.balanceOf(athanasia_rd) == 0
+    assert shec.balanceOf(athanasia_rd) == 11000 * ONE_HECTOR - ONE_HECTOR // 10
+
+
+def test_hec_float_keeps_shec_backing(athanasia_rd, nft, hec, shec, hec_staking, deployer, user):
+    athanasia_rd.setHecFloatTarget(ONE_HECTOR, {"from": deployer})
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+    shec.mint(athanasia_rd, ONE_HECTOR, {"from": deployer})
+    athanasia_rd.claim(nft.address, [1], {"from": user})
+    shec_after_refill = shec.balanceOf(athanasia_rd)
+
+    athanasia_rd.claim(nft.address, [18], {"from": user})
+    athanasia_rd.claim(nft.address, [9272], {"from": user})
+
+    claimed = 3 * ONE_HECTOR // 10
+    assert shec.balanceOf(athanasia_rd) == shec_after_refill
+    assert athanasia_rd.hecFloat() == ONE_HECTOR - 2 * ONE_HECTOR // 10
+    assert hec.balanceOf(athanasia_rd) == athanasia_rd.hecFloat()
+    assert shec.balanceOf(athanasia_rd) + athanasia_rd.hecFloat() == 11000 * ONE_HECTOR + ONE_HECTOR - claimed
+
+
+def test_hec_float_keeps_deposits_backed_across_rebases(athanasia_rd, nft, hec, shec, hec_staking, deployer, user):
+    athanasia_rd.setHecFloatTarget(20000 * ONE_HECTOR, {"from": deployer})
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+    shec.mint(athanasia_rd, 5 * ONE_HECTOR, {"from": deployer})
+    athanasia_rd.claim(nft.address, [1], {"from": user})
+    assert athanasia_rd.hecFloat() == 5 * ONE_HECTOR
+
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+
+    principal, _, _, _, outstanding_rewards = athanasia_rd.collectionStats(brownie.ZERO_ADDRESS)
+    assert principal == 10000 * ONE_HECTOR
+    assert shec.balanceOf(athanasia_rd) >= principal + outstanding_rewards
+    # Every token can still claim its rewards, and the float pays the first ones.
+    hec_before = hec.balanceOf(user)
+    athanasia_rd.claim(nft.address, [1, 18, 9272], {"from": user})
+    assert hec.balanceOf(user) - hec_before == 21 * ONE_HECTOR // 100 + 2 * 331 * ONE_HECTOR // 1000
+    assert athanasia_rd.hecFloat() == 5 * ONE_HECTOR - 872 * ONE_HECTOR // 1000
+
+
+def test_hec_float_refill_is_capped_by_shec_surplus(athanasia_rd, nft, hec, shec, hec_staking, deployer, user):
+    athanasia_rd.setHecFloatTarget(20000 * ONE_HECTOR, {"from": deployer})
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+    shec.mint(athanasia_rd, 5 * ONE_HECTOR, {"from": deployer})
+
+    athanasia_rd.claim(nft.address, [1], {"from": user})
+
+    assert athanasia_rd.hecFloat() == 5 * ONE_HECTOR
+    # The sHEC left is what the deposits are owed, which the rounded down backing does not exceed.
+    principal, _, _, _, outstanding_rewards = athanasia_rd.collectionStats(brownie.ZERO_ADDRESS)
+    assert shec.balanceOf(athanasia_rd) == 11000 * ONE_HECTOR - ONE_HECTOR // 10
+    assert 0 <= shec.balanceOf(athanasia_rd) - (principal + outstanding_rewards) <= 1
@@ -0,0 +1,97 @@
+import pytest
+from scripts.indexer import AthanasiaIndexer
+
+ONE_HECTOR = 10 ** 9
+ONE_FTM = 10 ** 18
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+
+@pytest.fixture(scope="function", autouse=False)
+def indexer(athanasia_rd, v2, deployer, tmp_path):
+    athanasia_rd.setUpgradeAddress(v2.address, {"from": deployer})
+    yield AthanasiaIndexer(str(tmp_path / "index.db"), athanasia_rd, start_block=athanasia_rd.tx.block_number,
+                           chunk_size=3, reorg_depth=8)
+
+
+def _assert_matches_chain(indexer, athanasia, nft, owner):
+    indexer.run()
+    claimable = indexer.claimable_for_owner(owner).get(nft.address, {})
+    tokens = [nft.tokenOfOwnerByIndex(owner, i) for i in range(nft.balanceOf(owner))]
+    assert sorted(claimable) == sorted(tokens)
+    for token_id in tokens:
+        assert claimable[token_id] == athanasia.claimableBalance(nft.address, token_id)
+
+
+def test_indexer_follows_claims_upgrades_and_transfers(indexer, athanasia_rd, nft, hec_staking, deployer, user):
+    hec_staking.rebase(1.2 * ONE_HECTOR)
+    _assert_matches_chain(indexer, athanasia_rd, nft, user)
+
+    athanasia_rd.claim(nft.address, [1], {"from": user})
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+    athanasia_rd.claim(nft.address, [1, 18], {"from": user})
+    _assert_matches_chain(indexer, athanasia_rd, nft, user)
+
+    athanasia_rd.upgrade(nft.address, [1, 18], {"from": user})
+    athanasia_rd.setCompactEvents(True, {"from": deployer})
+    hec_staking.rebase(1.3 * ONE_HECTOR)
+    athanasia_rd.claim(nft.address, [9272], {"from": user})
+    nft.transferFrom(deployer, user, 1337, {"from": deployer})
+    _assert_matches_chain(indexer, athanasia_rd, nft, user)
+    assert indexer.claimable_for_owner(deployer) == {}
+
+
+def test_indexer_resumes_from_saved_block(indexer, athanasia_rd, nft, hec_staking, user, tmp_path):
+    hec_staking.rebase(1.2 * ONE_HECTOR)
+    athanasia_rd.claim(nft.address, [1], {"from": user})
+    last_block = indexer.run()
+
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+    athanasia_rd.claim(nft.address, [18], {"from": user})
+    restarted = AthanasiaIndexer(str(tmp_path / "index.db"), athanasia_rd, start_block=0, chunk_size=3)
+
+    assert restarted.last_block() == last_block
+    _assert_matches_chain(restarted, athanasia_rd, nft, user)
+
+
+def test_indexer_rereads_blocks_after_reorg(indexer, athanasia_rd, nft, hec_staking, user, chain):
+    hec_staking.rebase(1.2 * ONE_HECTOR)
+    athanasia_rd.claim(nft.address, [1], {"from": user})
+    indexer.run()
+
+    chain.undo()
+    athanasia_rd.claim(nft.address, [18], {"from": user})
+    chain.mine(2)
+
+    _assert_matches_chain(indexer, athanasia_rd, nft, user)
+    assert indexer.checkpoint(nft.address, 1) == 0
+    assert indexer.checkpoint(nft.address, 18) == 1.2 * ONE_HECTOR
+
+
+def test_indexer_follows_claims_of_nothing(indexer, athanasia_rd, nft, hec_staking, user):
+    athanasia_rd.claim(nft.address, [1], {"from": user})
+    hec_staking.rebase(1.2 * ONE_HECTOR)
+    athanasia_rd.claim(nft.address, [18], {"from": user})
+    athanasia_rd.claim(nft.address, [18], {"from": user})
+
+    _assert_matches_chain(indexer, athanasia_rd, nft, user)
+    assert indexer.checkpoint(nft.address, 1) == athanasia_rd.stakingIndexes(nft.address, 1)
+    assert indexer.checkpoint(nft.address, 18) == 1.2 * ONE_HECTOR
+
+
+def test_indexer_follows_deposits_done(indexer, athanasia_rd, otc, MockNFTContract, deployer, user):
+    collection = MockNFTContract.deploy({"from": deployer})
+    for token_id in [1, 2, 3]:
+        collection.mint(user, token_id, {"from": deployer})
+    otc.registerCollection(collection.address, ZERO_ADDRESS, 5 * ONE_FTM, 10_000 * ONE_HECTOR, {"from": deployer})
+    athanasia_rd.registerCollectionWithOtc(collection.address, ZERO_ADDRESS, 5 * ONE_FTM, ONE_HECTOR, {"from": deployer})
+    athanasia_rd.depositWithOtc(collection.address, [1], {"from": user, "amount": 5 * ONE_FTM})
+    athanasia_rd.setDeferredOtc(collection.address, True, {"from": deployer})
+    athanasia_rd.depositWithOtc(collection.address, [2, 3], {"from": user, "amount": 10 * ONE_FTM})
+    indexer.run()
+    assert indexer.collection_info(collection.address)[4] == 3
+
+    athanasia_rd.cancelOtc(collection.address, {"from": deployer})
+    indexer.run()
+
+    assert indexer.collection_info(collection.address)[4] == athanasia_rd.collections(collection.address)[4] == 1
+    assert indexer.checkpoint(collection.address, 2) == 0
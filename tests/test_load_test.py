@@ -0,0 +1,18 @@
+from scripts.load_test import run_load_test
+
+WHALE_TOKENS = 20
+
+
+def test_load_test_reports_every_operation():
+    report = run_load_test(holders=3, tokens_per_holder=2, rebases=2, claim_probability=1.0, batch_size=2,
+                           whale_tokens=WHALE_TOKENS, upgrade_fraction=0.5)
+
+    operations = report["operations"]
+    assert operations["deposit"]["tokens"] == report["config"]["tokens"]
+    # Every holder claims after both rebases, the whale after the first one and before upgrading.
+    assert operations["claim"]["tokens"] >= 2 * (report["config"]["tokens"] - WHALE_TOKENS) + 2 * WHALE_TOKENS
+    assert operations["upgrade"]["tokens"] > WHALE_TOKENS
+    for operation in ["deposit", "claim", "upgrade"]:
+        assert operations[operation]["max_gas_used"] <= report["block_gas_limit"]
+        # A small collection fits in a single block.
+        assert report["largest_batch"][operation] == {"tokens": WHALE_TOKENS, "bounded_by_tokens": True}
@@ -0,0 +1,82 @@
+import pytest
+import brownie
+
+ONE_HECTOR = 10 ** 9
+
+
+@pytest.fixture(scope="function", autouse=False)
+def migratable_athanasia(athanasia, v2, nft, shec, deployer):
+    shec.mint(deployer, 300 * ONE_HECTOR, {"from": deployer})
+    shec.approve(athanasia.address, 300 * ONE_HECTOR, {"from": deployer})
+    athanasia.registerCollectionAndDeposit(nft.address, ONE_HECTOR, 300, {"from": deployer})
+    athanasia.setUpgradeAddress(v2.address, {"from": deployer})
+    athanasia.setMigrationEnabled(nft.address, True, {"from": deployer})
+    yield athanasia
+
+
+def test_migrate_collection_not_callable_by_holder(migratable_athanasia, nft, user):
+    with brownie.reverts("Athanasia: Only owner may migrate the collection"):
+        migratable_athanasia.migrateCollection(nft.address, 1, 301, {"from": user})
+
+
+def test_migrate_collection_fails_when_upgrade_contract_not_set(athanasia_rd, nft, deployer):
+    with brownie.reverts("Athanasia: Upgrade unavailable"):
+        athanasia_rd.migrateCollection(nft.address, 1, 301, {"from": deployer})
+
+
+def test_migrate_collection_fails_when_not_enabled_by_collection_owner(migratable_athanasia, nft, deployer):
+    migratable_athanasia.setMigrationEnabled(nft.address, False, {"from": deployer})
+    with brownie.reverts("Athanasia: Migration not enabled for the collection"):
+        migratable_athanasia.migrateCollection(nft.address, 1, 301, {"from": deployer})
+
+
+def test_set_migration_enabled_not_callable_by_holder(migratable_athanasia, nft, user):
+    with brownie.reverts("Athanasia: Only collection owner may configure migration"):
+        migratable_athanasia.setMigrationEnabled(nft.address, False, {"from": user})
+
+
+def test_set_migration_enabled_fails_once_migration_started(migratable_athanasia, nft, deployer):
+    migratable_athanasia.migrateCollection(nft.address, 1, 20, {"from": deployer})
+    with brownie.reverts("Athanasia: Collection migrating"):
+        migratable_athanasia.setMigrationEnabled(nft.address, False, {"from": deployer})
+
+
+def test_migrate_collection_moves_state_and_backing_in_chunks(migratable_athanasia, v2, nft, shec, hec_staking,
+                                                             deployer, user):
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+    migratable_athanasia.claim(nft.address, [1], {"from": user})
+
+    first = migratable_athanasia.migrateCollection(nft.address, 1, 151, {"from": deployer})
+    migratable_athanasia.migrateCollection(nft.address, 151, 301, {"from": deployer})
+
+    assert first.events["CollectionMigrated"]["migratedCount"] == 150
+    assert v2.migratedCount() == 300
+    assert v2.migratedIndexes(nft.address, 1) == 1.1 * ONE_HECTOR
+    assert v2.migratedIndexes(nft.address, 18) == ONE_HECTOR
+    assert v2.migratedIndexes(nft.address, 300) == ONE_HECTOR
+    assert shec.balanceOf(v2) == 300 * ONE_HECTOR + 299 * ONE_HECTOR // 10
+    assert shec.balanceOf(migratable_athanasia) == 0
+    assert migratable_athanasia.upgradeStatus(nft.address, 256) == True
+    assert migratable_athanasia.upgradeStatus(nft.address, 301) == False
+
+
+def test_migrate_collection_skips_upgraded_tokens(migratable_athanasia, v2, nft, deployer, user):
+    migratable_athanasia.upgrade(nft.address, [18], {"from": user})
+
+    tx = migratable_athanasia.migrateCollection(nft.address, 1, 301, {"from": deployer})
+
+    assert tx.events["CollectionMigrated"]["migratedCount"] == 299
+    assert v2.migratedIndexes(nft.address, 18) == 0
+    assert migratable_athanasia.migrateCollection(nft.address, 1, 301, {"from": deployer}) \
+        .events["CollectionMigrated"]["migratedCount"] == 0
+
+
+def test_migrated_collection_refuses_claims_and_deposits(migratable_athanasia, nft, shec, deployer, user):
+    migratable_athanasia.migrateCollection(nft.address, 1, 20, {"from": deployer})
+    shec.mint(user, ONE_HECTOR, {"from": deployer})
+    shec.approve(migratable_athanasia.address, ONE_HECTOR, {"from": user})
+
+    with brownie.reverts("Athanasia: Some already upgraded"):
+        migratable_athanasia.claim(nft.address, [1], {"from": user})
+    with brownie.reverts("Athanasia: Collection migrating"):
+        migratable_athanasia.deposit(nft.address, [9272], {"from": user})
@@ -0,0 +1,60 @@
+import pytest
+from scripts.multicall import MulticallClient
+
+ONE_HECTOR = 10 ** 9
+# Tokens read at once, out of the 10000 deposited by `athanasia_rd`.
+COLLECTION_SIZE = 1000
+
+
+@pytest.fixture(scope="function", autouse=False)
+def athanasia_claimed(athanasia_rd, nft, hec_staking, user):
+    hec_staking.rebase(1.1 * ONE_HECTOR)
+    athanasia_rd.claim(nft.address, [1], {"from": user})
+    hec_staking.rebase(1.2 * ONE_HECTOR)
+    yield athanasia_rd
+
+
+def test_client_reads_whole_collection_in_few_round_trips(athanasia_claimed, nft):
+    client = MulticallClient()
+    token_ids = list(range(1, COLLECTION_SIZE + 1))
+
+    states = client.token_states(athanasia_claimed, nft.address, token_ids)
+    info = client.collections(athanasia_claimed, [nft.address])
+
+    assert client.round_trips <= 8
+    assert info[nft.address][4] == 10000
+    for token_id in [1, 18, 500, COLLECTION_SIZE]:
+        assert states[token_id] == (
+            athanasia_claimed.claimableBalance(nft.address, token_id),
+            athanasia_claimed.stakingIndexes(nft.address, token_id),
+            athanasia_claimed.upgradeStatus(nft.address, token_id),
+        )
+
+
+def test_client_splits_failing_chunks(athanasia_claimed, nft):
+    client = MulticallClient(chunk_size=10)
+    failures = {"left": 1}
+    aggregate = client._aggregate
+
+    def flaky_aggregate(calls):
+        if len(calls) == 10 and failures["left"] > 0:
+            failures["left"] -= 1
+            raise ValueError("response too large")
+        return aggregate(calls)
+
+    client._aggregate = flaky_aggregate
+    client.retries = 1
+    balances = client.claimable_balances(athanasia_claimed, nft.address, list(range(1, 21)))
+
+    assert balances == {i: athanasia_claimed.claimableBalance(nft.address, i) for i in range(1, 21)}
+
+
+def test_client_raises_transport_errors(athanasia_claimed, nft):
+    client = MulticallClient(chunk_size=10, backoff=0)
+
+    def unreachable_aggregate(calls):
+        raise ConnectionError("node unreachable")
+
+    client._aggregate = unreachable_aggregate
+    with pytest.raises(ConnectionError):
+        client.claimable_balances(athanasia_claimed, nft.address, list(range(1, 21)))
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from scripts.simulation import GasModel, calibrate_gas_model, every, hold, randomly, scheduled, simulate
+
+ONE_HECTOR = 10 ** 9
+FACTORS = [1200000000, 1100000000, 1571617000]
+CALIBRATION_TOKENS = list(range(100, 164))
+
+
+def test_simulation_matches_chain(athanasia_rd, nft, hec, hec_staking, user):
+    tokens = [1, 18, 9272]
+    # Token 1 claims after every rebase, token 18 after the last two and token 9272 after the last one.
+    schedule = [[True, False, False], [True, True, False], [True, True, True]]
+    result = simulate(ONE_HECTOR, FACTORS, scheduled(schedule), deposit_steps=[0, 0, 0])
+
+    claimed = [0, 0, 0]
+    for step, factor in enumerate(FACTORS):
+        hec_staking.rebase(factor)
+        assert hec_staking.index() == result.index[step + 1]
+        for i, token_id in enumerate(tokens):
+            if schedule[step][i]:
+                balance_before = hec.balanceOf(user)
+                athanasia_rd.claim(nft.address, [token_id], {"from": user})
+                claimed[i] += hec.balanceOf(user) - balance_before
+    assert list(result.token_claimed) == claimed
+    assert result.total_claimed == sum(claimed)
+
+
+def test_simulation_tracks_backing():
+    factors = [1_003_000_000] * 500
+    held = simulate(ONE_HECTOR, factors, hold(), token_count=2000)
+    reward = (held.index[-1] - held.index[0]) * ONE_HECTOR // held.index[0]
+    assert held.total_claimed == 0
+    assert held.required_backing == held.liability[-1] == 2000 * (ONE_HECTOR + reward)
+
+    result = simulate(ONE_HECTOR, factors, randomly(0.05), token_count=2000, owners=np.arange(2000) // 4)
+    assert 0 < result.total_claimed < 2000 * reward
+    # Rewards accrue on the deposit only, so claiming gives up the compounding of claimed rewards.
+    assert result.liability[-1] + result.total_claimed < held.liability[-1]
+    # Claims round down in favour of the contract, so its growing sHEC balance always covers the liability.
+    assert result.shortfall == 0
+
+
+def test_simulation_splits_claims_in_batches():
+    gas_model = GasModel(100_000, 10_000, 50_000)
+    result = simulate(ONE_HECTOR, [1_003_000_000] * 10, every(5, stagger=False), token_count=1000,
+                      owners=np.zeros(1000, dtype=np.int64), gas_model=gas_model, max_gas=1_000_000)
+
+    # 85 tokens fit in a claim, two rebases out of ten are followed by claims of all tokens.
+    assert gas_model.max_batch(1_000_000) == 85
+    assert result.claim_txs.sum() == 2 * 12
+    assert result.claimed_tokens.sum() == 2 * 1000
+    assert result.total_gas == 2 * (50_000 + 12 * 100_000 + 1000 * 10_000)
+
+
+def test_calibrated_gas_model_predicts_claims(athanasia_rd, nft, hec_staking, user, deployer):
+    nft.mintBatch(user, CALIBRATION_TOKENS[0], len(CALIBRATION_TOKENS) + 40, {"from": deployer})
+    gas_model = calibrate_gas_model(athanasia_rd, nft.address, hec_staking, user, CALIBRATION_TOKENS)
+
+    hec_staking.rebase(1_100_000_000)
+    tokens = list(range(CALIBRATION_TOKENS[-1] + 1, CALIBRATION_TOKENS[-1] + 41))
+    tx = athanasia_rd.claim(nft.address, tokens, {"from": user})
+    assert tx.gas_used == pytest.approx(gas_model.claim_gas([len(tokens)]), rel=0.05)